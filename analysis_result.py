@@ -0,0 +1,158 @@
+import json
+import math
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+
+# Structured output of stock_functions.compute_analysis, kept free of any formatting
+@dataclass(slots=True, frozen=True)
+class AnalysisResult:
+    ticker: str
+
+    # Technical indicators (last bar)
+    current_price: float
+    sma_50: float
+    sma_200: float
+    rsi: float
+    macd: float
+    signal: float
+    ema_15: float
+    ema_50: float
+    stochastic_k: float
+    stochastic_d: float
+    stochastic_signal: bool
+    obv: float
+    obv_short: float
+    obv_long: float
+    adx: float
+    adx_pos: float
+    adx_neg: float
+
+    # Fundamentals
+    market_cap: Optional[float]
+    pe_ratio: Optional[float]
+    dividend_yield: Optional[float]
+    cap_category: str
+    high_52w: float
+    low_52w: float
+    avg_volume: float
+
+    # Flags
+    is_bullish_trend: bool
+    is_bearish_trend: bool
+    is_strong_trend: bool
+    obv_rising: bool
+    macd_above_signal: bool
+    rsi_state: str
+    stochastic_state: str
+    valuation: str
+    buy_signal: bool
+    sell_signal: bool
+    recommendation: str
+    recommendation_reason: str
+
+
+RECOMMENDATION_BADGES = {
+    'BUY': '🟢 BUY',
+    'SELL': '🔴 SELL',
+    'HOLD': '🟡 HOLD',
+}
+
+
+# Function to convert a result into a plain dict with NaN mapped to None
+def to_dict(result):
+    return {
+        key: None if isinstance(value, float) and math.isnan(value) else value
+        for key, value in asdict(result).items()
+    }
+
+
+# Function to serialize a result as JSON
+def to_json(result):
+    return json.dumps(to_dict(result))
+
+
+# Function to flatten a result into a screener table row
+def to_row(result):
+    return {
+        'Symbol': result.ticker,
+        'Price': result.current_price,
+        'RSI': result.rsi,
+        'MACD': result.macd,
+        'MACD Signal': result.signal,
+        'EMA 15': result.ema_15,
+        'EMA 50': result.ema_50,
+        'SMA 50': result.sma_50,
+        'SMA 200': result.sma_200,
+        'Stochastic %K': result.stochastic_k,
+        'ADX': result.adx,
+        'OBV Rising': result.obv_rising,
+        'Bullish Trend': result.is_bullish_trend,
+        'Bearish Trend': result.is_bearish_trend,
+        'Strong Trend': result.is_strong_trend,
+        'Market Cap (₹bn)': result.market_cap / 1e9 if result.market_cap is not None else None,
+        'P/E': result.pe_ratio,
+        'Recommendation': result.recommendation,
+    }
+
+
+# Function to render a result as the markdown report shown in the dashboard
+def render_markdown(result):
+    ticker = result.ticker
+    pe_ratio_display = f"{result.pe_ratio:.2f}" if result.pe_ratio is not None else 'N/A'
+    dividend_yield_display = f"{result.dividend_yield * 100:.2f}%" if result.dividend_yield is not None else 'N/A'
+    market_cap_display = f"₹{result.market_cap / 1e9:.2f} billion" if result.market_cap is not None else 'N/A'
+    valuation_text = {
+        'premium': 'suggests a premium valuation',
+        'undervalued': 'indicates a potentially undervalued stock',
+    }.get(result.valuation, 'is within a normal range')
+    stochastic_text = {
+        'oversold': 'oversold conditions',
+        'overbought': 'overbought conditions',
+    }.get(result.stochastic_state, 'neutral conditions')
+
+    return f"""**Analysis for {ticker}:**
+
+### Technical Analysis:
+1. **Current Price:** ₹{result.current_price:.2f}
+2. **50-day SMA:** ₹{result.sma_50:.2f}
+3. **200-day SMA:** ₹{result.sma_200:.2f}
+4. **RSI:** {result.rsi:.2f}
+5. **MACD:** {result.macd:.2f}
+6. **MACD Signal:** {result.signal:.2f}
+7. **EMA 15:** ₹{result.ema_15:.2f}
+8. **EMA 50:** ₹{result.ema_50:.2f}
+9. **Stochastic %K:** {result.stochastic_k:.2f}
+10. **Stochastic %D:** {result.stochastic_d:.2f}
+11. **OBV:** {result.obv:.2f}
+12. **ADX:** {result.adx:.2f}
+
+### Fundamental Analysis:
+1. **Market Cap:** {market_cap_display}
+2. **P/E Ratio:** {pe_ratio_display}
+3. **Dividend Yield:** {dividend_yield_display}
+4. **52-week High:** ₹{result.high_52w:.2f}
+5. **52-week Low:** ₹{result.low_52w:.2f}
+6. **Average Daily Volume:** {result.avg_volume:.0f}
+
+### Key Insights and Recommendation:
+{ticker} is currently trading at ₹{result.current_price:.2f}.
+
+**Technical Outlook:**
+# - The stock is trading {'above' if result.is_bullish_trend else 'below'} its 50-day and 200-day moving averages, indicating a {'bullish' if result.is_bullish_trend else 'bearish'} trend.
+- The RSI at {result.rsi:.2f} suggests the stock is {result.rsi_state}.
+- The MACD ({result.macd:.2f}) is {'above' if result.macd_above_signal else 'below'} its signal line ({result.signal:.2f}), suggesting {'bullish' if result.macd_above_signal else 'bearish'} momentum.
+- The Stochastic Oscillator shows {stochastic_text}, with {'%K crossing above %D' if result.stochastic_signal else '%K crossing below %D'}.
+- OBV is {'rising, indicating accumulation.' if result.obv_rising else 'falling, indicating distribution.'}
+- The ADX at {result.adx:.2f} confirms a {'strong' if result.is_strong_trend else 'weak'} trend.
+
+**Fundamental Considerations:**
+- With a market cap of {market_cap_display}, this is a {'large' if result.cap_category == 'large' else 'mid to small'} cap stock.
+- The P/E ratio of {pe_ratio_display} {valuation_text}.
+
+**Recommendation:**
+Based on the analysis, the current recommendation for {ticker} is to **{RECOMMENDATION_BADGES[result.recommendation]}**.
+**Reason:** {result.recommendation_reason}
+
+*Note: These insights are based on historical data and technical analysis. Always conduct your own research or consult with a financial advisor before making investment decisions.*
+"""
@@ -0,0 +1,98 @@
+"""Research scan over a synthetic universe: per-ticker parquet files against ohlcv_archive.
+
+Writes --tickers synthetic histories of --bars daily bars both as per-ticker parquet files (the
+layout precompute_store keeps) and as one memory-mapped archive, then times a scan that reads the
+last --window bars of every ticker, first only reading them and then also computing RSI and ADX
+over them, reporting wall time and the peak resident memory growth of each. Run from the
+repository root:
+
+    python -m benchmarks.archive_scan --tickers 2000 --bars 5000 --window 250
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import memory_accounting
+import ohlcv_archive
+from benchmarks.synthetic_ohlcv import make_ohlcv
+from momentum import RSIIndicator
+from trend import ADXIndicator
+
+
+# Function to compute the scan's indicators over one ticker's bars
+def scan_frame(frame):
+    rsi = RSIIndicator(frame['Close']).rsi().iloc[-1]
+    adx = ADXIndicator(frame['High'], frame['Low'], frame['Close']).adx().iloc[-1]
+    return rsi, adx
+
+
+# Function to write the universe in both layouts, one ticker in memory at a time
+def write_universe(directory, tickers, bars, seed):
+    parquet_dir = os.path.join(directory, 'parquet')
+    archive_dir = os.path.join(directory, 'archive')
+    os.makedirs(parquet_dir)
+    names = [f"SYN{i:04d}.NS" for i in range(tickers)]
+    chunk = {}
+    for i, name in enumerate(names):
+        frame = make_ohlcv(bars, seed=seed * 100_003 + i)
+        frame.to_parquet(os.path.join(parquet_dir, f"{name}.parquet"))
+        chunk[name] = frame
+        if len(chunk) == ohlcv_archive.BUILD_CHUNK or i == tickers - 1:
+            ohlcv_archive.append(chunk, archive_dir)
+            chunk = {}
+    return names, parquet_dir, archive_dir
+
+
+def scan_parquet(names, parquet_dir, window, compute):
+    import pandas as pd
+
+    frames = (pd.read_parquet(os.path.join(parquet_dir, f"{name}.parquet")).iloc[-window:] for name in names)
+    return [scan_frame(frame) if compute else len(frame) for frame in frames]
+
+
+def scan_archive(names, archive_dir, window, compute):
+    archive = ohlcv_archive.Archive(archive_dir)
+    start = archive.dates()[-window]
+    frames = (archive.frame(name, start=start) for name in names)
+    return [scan_frame(frame) if compute else len(frame) for frame in frames]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tickers', type=int, default=2000)
+    parser.add_argument('--bars', type=int, default=5000, help='daily bars per ticker (5000 is about 20 years)')
+    parser.add_argument('--window', type=int, default=250, help='most recent bars each scan reads per ticker')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keep', default=None, help='write the universe to this directory and keep it')
+    args = parser.parse_args()
+
+    directory = args.keep or tempfile.mkdtemp(prefix='archive_scan_')
+    try:
+        start = time.perf_counter()
+        names, parquet_dir, archive_dir = write_universe(directory, args.tickers, args.bars, args.seed)
+        print(f"Wrote {args.tickers} tickers x {args.bars} bars in {time.perf_counter() - start:.1f}s: "
+              f"{ohlcv_archive.Archive(archive_dir).info()}")
+
+        results = {}
+        for compute in (False, True):
+            for name, scan, source in (('parquet files', scan_parquet, parquet_dir),
+                                       ('memmap archive', scan_archive, archive_dir)):
+                with memory_accounting.PeakRSS() as rss:
+                    start = time.perf_counter()
+                    results[name] = scan(names, source, args.window, compute)
+                    elapsed = time.perf_counter() - start
+                print(f"{name:<16} {'read + RSI/ADX' if compute else 'read':<15} {elapsed:>8.2f} s  "
+                      f"{args.tickers / elapsed:>9,.0f} tickers/s  peak RSS +{rss.summary()['Peak Delta (MB)']:.1f} MB")
+
+        # float32 storage moves the indicators only in their last digits
+        worst = max(abs(a - b) for pair in zip(*results.values()) for a, b in zip(*pair) if a == a and b == b)
+        print(f"Largest RSI/ADX difference between the two scans: {worst:.2e}")
+    finally:
+        if not args.keep:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
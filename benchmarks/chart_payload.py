@@ -0,0 +1,39 @@
+"""Chart payload size versus bar count, with and without downsampling.
+
+Run from the repository root:
+
+    python -m benchmarks.chart_payload --bars 1000 10000 100000 --max-points 1500
+"""
+import argparse
+import time
+
+import charts
+import downsample
+import stock_functions
+from benchmarks.synthetic_ohlcv import make_ohlcv
+
+
+# Function to build the dashboard figure and measure its JSON payload
+def measure(df, max_points):
+    start = time.perf_counter()
+    payload = charts.build_dashboard_figure(df, 'BENCH', max_points=max_points).to_json()
+    return len(payload), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bars', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--max-points', type=int, default=downsample.DEFAULT_MAX_POINTS)
+    args = parser.parse_args()
+
+    print(f"{'bars':>10} {'full KB':>10} {'full s':>8} {'lttb KB':>10} {'lttb s':>8} {'ratio':>7}")
+    for bars in args.bars:
+        df = stock_functions.calculate_indicators(make_ohlcv(bars, freq='min', start='2000-01-03 09:15'))
+        full_size, full_time = measure(df, None)
+        reduced_size, reduced_time = measure(df, args.max_points)
+        print(f"{bars:>10} {full_size / 1024:>10.0f} {full_time:>8.2f} "
+              f"{reduced_size / 1024:>10.0f} {reduced_time:>8.2f} {full_size / reduced_size:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
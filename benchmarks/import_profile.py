@@ -0,0 +1,89 @@
+"""Import-time breakdown of the Streamlit entry point and its dependencies.
+
+Each module is imported in a fresh interpreter with ``-X importtime`` so earlier imports do
+not hide its cost. Run from the repository root:
+
+    python -m benchmarks.import_profile
+    python -m benchmarks.import_profile --modules pandas textblob --top 15
+"""
+import argparse
+import re
+import subprocess
+import sys
+
+# What the app imports before the sidebar is painted, followed by what loads on first use
+STARTUP_MODULES = ('streamlit', 'downsample', 'session_cache', 'metrics')
+DEFERRED_MODULES = (
+    'pandas',
+    'plotly.graph_objs',
+    'yfinance',
+    'ta',
+    'newsapi',
+    'textblob',
+    'dotenv',
+    'stock_data',
+    'stock_functions',
+    'charts',
+    'table_view',
+    'screener',
+    'news',
+    'news_store',
+    'sentiment',
+    'sentiment_series',
+    'symbol_master',
+    'orchestrator',
+    'precompute_store',
+    'service_client',
+    'shared_ohlcv',
+    'fetch_cache',
+)
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+
+
+# Function to import a module in a fresh interpreter and parse the -X importtime report
+def profile_import(module):
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+# Function to sum the self time of every module under each top-level package
+def package_totals(rows):
+    totals = {}
+    for name, self_us, _, _ in rows:
+        package = name.split('.')[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modules', nargs='+', default=list(STARTUP_MODULES + DEFERRED_MODULES))
+    parser.add_argument('--top', type=int, default=5, help='packages listed per module')
+    args = parser.parse_args()
+
+    print(f"{'module':<20} {'total ms':>9}  heaviest packages")
+    for module in args.modules:
+        try:
+            rows = profile_import(module)
+        except RuntimeError as e:
+            print(f"{module:<20} {'failed':>9}  {e}")
+            continue
+        total_ms = sum(row[1] for row in rows) / 1000
+        heaviest = ', '.join(f"{name} {us / 1000:.0f}" for name, us in package_totals(rows)[:args.top])
+        print(f"{module:<20} {total_ms:>9.0f}  {heaviest}")
+    startup_ms = sum(row[1] for row in profile_import(', '.join(STARTUP_MODULES))) / 1000
+    print(f"\nImports before the sidebar is painted: {startup_ms:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
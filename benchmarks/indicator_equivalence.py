@@ -0,0 +1,189 @@
+"""Golden-output equivalence of indicator implementations.
+
+Runs every public indicator class of momentum.py, trend.py and volume.py (the reference) and the
+class of the same name in an alternative backend on identical inputs, and compares every output
+method. By default the alternative is the installed ta package that calculate_indicators uses; an
+optimized kernel module is checked by naming it, e.g. --backend fast_indicators, where it must
+expose the same class names and signatures (classes it lacks are reported as not implemented).
+
+Inputs: the checked-in fixture (benchmarks/fixtures/ohlcv_golden.csv, with NaN gaps), randomized
+synthetic frames with and without NaN runs, and short series of 1 to 30 bars, each with
+fillna=False and fillna=True. Outputs match when their NaN positions are identical and every other
+value is within the tolerance of the reference:
+
+    |candidate - reference| <= atol + rtol * |reference|
+
+with rtol=1e-9 and atol=1e-9 unless TOLERANCES widens it for a class. Exits non-zero on any
+mismatch. Run from the repository root:
+
+    python -m benchmarks.indicator_equivalence
+    python -m benchmarks.indicator_equivalence --backend fast_indicators --random-cases 50 --only ADX
+"""
+import argparse
+import importlib
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.indicator_suite import INDICATOR_MODULES, column_kwargs, indicator_classes
+from benchmarks.synthetic_ohlcv import make_ohlcv
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'ohlcv_golden.csv')
+DEFAULT_RTOL = 1e-9
+DEFAULT_ATOL = 1e-9
+# Per-class (rtol, atol) for outputs where a faster kernel may legitimately reorder floating point
+# work; recursive smoothers (Wilder/EMA seeded sums, PSAR's running extreme) accumulate rounding
+TOLERANCES = {
+    'trend.ADXIndicator': (1e-7, 1e-9),
+    'trend.PSARIndicator': (1e-9, 1e-7),
+    'momentum.KAMAIndicator': (1e-7, 1e-9),
+}
+SHORT_LENGTHS = (1, 2, 5, 13, 30)
+RANDOM_LENGTH = 600
+
+
+# Function to load the golden fixture frame
+def load_fixture(path=FIXTURE_PATH):
+    df = pd.read_csv(path, index_col='Date')
+    df.index = pd.to_datetime(df.index, utc=True).tz_convert('Asia/Kolkata')
+    return df
+
+
+# Function to list the (label, frame) inputs every class is checked on
+def input_frames(random_cases, seed=0):
+    frames = [('fixture', load_fixture())]
+    for case in range(random_cases):
+        nan_runs = 0 if case % 2 == 0 else 1 + case % 5
+        frames.append((f"random-{case}{'-nan' if nan_runs else ''}",
+                       make_ohlcv(RANDOM_LENGTH, seed=seed + case, nan_runs=nan_runs)))
+    for length in SHORT_LENGTHS:
+        frames.append((f"short-{length}", make_ohlcv(length, seed=seed + 7919 * length)))
+    return frames
+
+
+# Function to compute every output of a class, or the exception it raised
+def outputs_of(cls, outputs, df, fillna):
+    try:
+        indicator = cls(**column_kwargs(cls, df, fillna=fillna))
+        return {method: getattr(indicator, method)() for method in outputs}, None
+    except Exception as e:
+        return None, e
+
+
+# Function to compare one output: NaN positions must agree and values match within tolerance
+def compare_output(candidate, reference, rtol, atol):
+    candidate = np.asarray(pd.Series(candidate).astype(float), dtype=float)
+    reference = np.asarray(pd.Series(reference).astype(float), dtype=float)
+    if candidate.shape != reference.shape:
+        return {'shape_mismatch': True, 'nan_mismatches': 0, 'max_abs': np.inf, 'max_rel': np.inf, 'ok': False}
+    candidate_nan, reference_nan = np.isnan(candidate), np.isnan(reference)
+    both = ~candidate_nan & ~reference_nan
+    # Infinities must match exactly; their difference is NaN
+    infinite = both & (np.isinf(candidate) | np.isinf(reference))
+    finite = both & ~infinite
+    abs_error = np.abs(candidate[finite] - reference[finite])
+    rel_error = abs_error / np.maximum(np.abs(reference[finite]), np.finfo(float).tiny)
+    within = abs_error <= atol + rtol * np.abs(reference[finite])
+    nan_mismatches = int((candidate_nan != reference_nan).sum()) + int((candidate[infinite] != reference[infinite]).sum())
+    return {
+        'shape_mismatch': False,
+        'nan_mismatches': nan_mismatches,
+        'max_abs': float(abs_error.max()) if abs_error.size else 0.0,
+        'max_rel': float(rel_error.max()) if rel_error.size else 0.0,
+        'ok': nan_mismatches == 0 and bool(within.all()),
+    }
+
+
+# Function to find each reference class's counterpart in the backend, keyed by reference name
+def backend_classes(backend):
+    found = {}
+    for module in INDICATOR_MODULES:
+        if backend == 'ta':
+            alternative = importlib.import_module(f"ta.{module.__name__}")
+        else:
+            alternative = importlib.import_module(backend)
+        for name, cls, outputs in indicator_classes(module):
+            found[name] = getattr(alternative, name.split('.', 1)[1], None)
+    return found
+
+
+# Function to check every class on every input and return one summary row per class output
+def check(backend, random_cases, only=None, seed=0):
+    selected = re.compile(only) if only else None
+    alternatives = backend_classes(backend)
+    frames = input_frames(random_cases, seed)
+    rows = []
+    for module in INDICATOR_MODULES:
+        for name, cls, outputs in indicator_classes(module):
+            if selected is not None and not selected.search(name):
+                continue
+            candidate_cls = alternatives[name]
+            if candidate_cls is None:
+                rows.append({'class': name, 'output': '*', 'status': 'not implemented'})
+                continue
+            rtol, atol = TOLERANCES.get(name, (DEFAULT_RTOL, DEFAULT_ATOL))
+            summary = {output: {'cases': 0, 'max_abs': 0.0, 'max_rel': 0.0, 'nan_mismatches': 0, 'failures': []}
+                       for output in outputs}
+            for label, df in frames:
+                for fillna in (False, True):
+                    case = f"{label} fillna={fillna}"
+                    reference, reference_error = outputs_of(cls, outputs, df, fillna)
+                    candidate, candidate_error = outputs_of(candidate_cls, outputs, df, fillna)
+                    for output in outputs:
+                        row = summary[output]
+                        row['cases'] += 1
+                        if reference_error is not None or candidate_error is not None:
+                            # Raising is part of the contract: both must raise the same exception type
+                            if type(reference_error) is not type(candidate_error):
+                                row['failures'].append(f"{case}: reference {reference_error!r}, "
+                                                       f"candidate {candidate_error!r}")
+                            continue
+                        result = compare_output(candidate[output], reference[output], rtol, atol)
+                        row['max_abs'] = max(row['max_abs'], result['max_abs'])
+                        row['max_rel'] = max(row['max_rel'], result['max_rel'])
+                        row['nan_mismatches'] += result['nan_mismatches']
+                        if not result['ok']:
+                            row['failures'].append(case)
+            for output, row in summary.items():
+                rows.append({'class': name, 'output': output, 'rtol': rtol, 'atol': atol, **row,
+                             'status': 'ok' if not row['failures'] else 'FAIL'})
+    return rows
+
+
+def print_report(rows, backend):
+    print(f"Reference: momentum.py, trend.py, volume.py   Candidate: {backend}")
+    print(f"{'class.output':<66} {'cases':>5} {'max abs err':>12} {'max rel err':>12} {'NaN diff':>8}  status")
+    for row in rows:
+        label = f"{row['class']}.{row['output']}"
+        if row['status'] == 'not implemented':
+            print(f"{label:<66} {'':>5} {'':>12} {'':>12} {'':>8}  not implemented")
+            continue
+        print(f"{label:<66} {row['cases']:>5} {row['max_abs']:>12.3e} {row['max_rel']:>12.3e} "
+              f"{row['nan_mismatches']:>8}  {row['status']}")
+        for failure in row['failures'][:5]:
+            print(f"    mismatch: {failure}")
+    failed = [row for row in rows if row['status'] == 'FAIL']
+    checked = [row for row in rows if row['status'] != 'not implemented']
+    print(f"\n{len(checked) - len(failed)}/{len(checked)} outputs equivalent"
+          f"{f', {len(rows) - len(checked)} classes not implemented' if len(rows) > len(checked) else ''}")
+    return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--backend', default='ta', help="'ta' or an importable module with the same class names")
+    parser.add_argument('--random-cases', type=int, default=10, help='randomized frames, every other one with NaN runs')
+    parser.add_argument('--only', default=None, help='regex selecting class names, e.g. "ADX|RSI"')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with np.errstate(all='ignore'):
+        rows = check(args.backend, args.random_cases, args.only, args.seed)
+    return 0 if print_report(rows, args.backend) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
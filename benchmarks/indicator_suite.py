@@ -0,0 +1,270 @@
+"""Indicator benchmark suite with a JSON run history and run-to-run comparison.
+
+Times every public indicator class in momentum.py, trend.py and volume.py (construction plus
+every output method), calculate_indicators and analyze_stock on synthetic bars at each --sizes,
+and calculate_indicators and analyze_stock across a panel of --panel-tickers tickers. Each run is
+appended to the history file and compared with the previous run (or --compare-to). Run from the
+repository root:
+
+    python -m benchmarks.indicator_suite --label baseline
+    python -m benchmarks.indicator_suite --sizes 1000 100000 --only 'trend\\.' --label adx-rewrite
+    python -m benchmarks.indicator_suite --report baseline adx-rewrite
+"""
+import argparse
+import inspect
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import momentum
+import stock_functions
+import trend
+import volume
+from benchmarks.synthetic_ohlcv import make_ohlcv, make_panel
+
+HISTORY_PATH = os.path.join('data', 'benchmarks', 'indicator_history.json')
+INDICATOR_MODULES = (momentum, trend, volume)
+# Constructor arguments filled from the OHLCV columns; everything else keeps its default
+COLUMN_ARGUMENTS = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume'}
+# Values for constructor parameters that have no default (SMAIndicator's window)
+REQUIRED_ARGUMENTS = {'window': 20}
+STOCK_INFO = {'trailingPE': 21.0, 'marketCap': 2.5e12, 'dividendYield': 0.012}
+# Ratio bands outside which a case is flagged as slower or faster than the baseline
+DEFAULT_THRESHOLD = 0.10
+
+
+# Function to list (name, class, output methods) for every public indicator class of a module
+def indicator_classes(module):
+    classes = []
+    for name, cls in vars(module).items():
+        if not inspect.isclass(cls) or cls.__module__ != module.__name__ or name.startswith('_'):
+            continue
+        outputs = [method for method, fn in vars(cls).items() if callable(fn) and not method.startswith('_')]
+        classes.append((f"{module.__name__}.{name}", cls, outputs))
+    return classes
+
+
+# Function to build the keyword arguments that feed a class's constructor from a frame
+def column_kwargs(cls, df, **overrides):
+    parameters = inspect.signature(cls.__init__).parameters
+    kwargs = {name: df[column] for name, column in COLUMN_ARGUMENTS.items() if name in parameters}
+    kwargs.update({name: REQUIRED_ARGUMENTS[name] for name, parameter in parameters.items()
+                   if parameter.default is inspect.Parameter.empty and name in REQUIRED_ARGUMENTS})
+    kwargs.update({name: value for name, value in overrides.items() if name in parameters})
+    return kwargs
+
+
+# Function to compute every output of an indicator class on a frame
+def run_indicator(cls, outputs, df, **overrides):
+    indicator = cls(**column_kwargs(cls, df, **overrides))
+    return {method: getattr(indicator, method)() for method in outputs}
+
+
+# Function to list the single-frame cases as (name, setup, run): setup builds the timed call's input
+# from the frame outside the timer
+def frame_cases():
+    cases = []
+    for module in INDICATOR_MODULES:
+        for name, cls, outputs in indicator_classes(module):
+            cases.append((name, lambda df: df, lambda df, cls=cls, outputs=outputs: run_indicator(cls, outputs, df)))
+    cases.append(('stock_functions.calculate_indicators', lambda df: df.copy(), stock_functions.calculate_indicators))
+    cases.append(('stock_functions.analyze_stock', lambda df: stock_functions.calculate_indicators(df.copy()),
+                  lambda frame: stock_functions.analyze_stock('SYN', STOCK_INFO, frame)))
+    return cases
+
+
+# Function to list the panel cases, each timed over every ticker of the panel
+def panel_cases():
+    return [
+        ('panel.calculate_indicators', lambda panel: {t: df.copy() for t, df in panel.items()},
+         lambda panel: [stock_functions.calculate_indicators(df) for df in panel.values()]),
+        ('panel.analyze_stock',
+         lambda panel: {t: stock_functions.calculate_indicators(df.copy()) for t, df in panel.items()},
+         lambda panel: [stock_functions.analyze_stock(t, STOCK_INFO, df) for t, df in panel.items()]),
+    ]
+
+
+# Function to time a case: repeat until min_time has been spent or max_repeats reached, fresh input each time
+def time_case(setup, run, data, min_time, max_repeats):
+    samples = []
+    while not samples or (sum(samples) < min_time and len(samples) < max_repeats):
+        argument = setup(data)
+        start = time.perf_counter()
+        run(argument)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _record(name, bars, tickers, samples=None, error=None):
+    record = {'case': name, 'bars': bars, 'tickers': tickers}
+    if error is not None:
+        record['error'] = error
+        return record
+    best = min(samples)
+    record.update({'best_s': best, 'median_s': statistics.median(samples), 'repeats': len(samples),
+                   'bars_per_s': bars * tickers / best if best > 0 else None})
+    return record
+
+
+# Function to run every selected case and return the result records
+def run_suite(sizes, panel_tickers, panel_bars, only=None, min_time=0.5, max_repeats=5, nan_runs=0, seed=0):
+    selected = re.compile(only) if only else None
+    results = []
+
+    def wanted(name):
+        return selected is None or selected.search(name)
+
+    for bars in sizes:
+        df = make_ohlcv(bars, seed=seed, nan_runs=nan_runs)
+        for name, setup, run in frame_cases():
+            if not wanted(name):
+                continue
+            try:
+                results.append(_record(name, bars, 1, time_case(setup, run, df, min_time, max_repeats)))
+            except Exception as e:
+                results.append(_record(name, bars, 1, error=f"{type(e).__name__}: {e}"))
+            _print_result(results[-1])
+
+    for bars in panel_bars:
+        panel = None
+        for name, setup, run in panel_cases():
+            if not wanted(name):
+                continue
+            panel = panel or make_panel(panel_tickers, bars, seed=seed, nan_runs=nan_runs)
+            try:
+                results.append(_record(name, bars, panel_tickers, time_case(setup, run, panel, min_time, max_repeats)))
+            except Exception as e:
+                results.append(_record(name, bars, panel_tickers, error=f"{type(e).__name__}: {e}"))
+            _print_result(results[-1])
+    return results
+
+
+def _print_result(record):
+    shape = f"{record['bars']:>9,} x {record['tickers']:<4}"
+    if 'error' in record:
+        print(f"{record['case']:<50} {shape} ERROR {record['error']}")
+    else:
+        print(f"{record['case']:<50} {shape} {record['best_s'] * 1000:>11.2f} ms best "
+              f"({record['repeats']} runs)  {record['bars_per_s']:>14,.0f} bars/s")
+
+
+# Function to describe the code and machine a run was made on
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True,
+                                    text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        commit, dirty = None, None
+    return {'commit': commit, 'dirty': dirty, 'python': platform.python_version(), 'numpy': np.__version__,
+            'pandas': pd.__version__, 'machine': platform.machine(), 'processor': platform.processor(),
+            'cpu_count': os.cpu_count()}
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return {'runs': []}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_history(history, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temporary = path + '.tmp'
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=1)
+    os.replace(temporary, path)
+
+
+# Function to find a stored run by id or label, the latest match winning
+def find_run(history, reference):
+    for run in reversed(history['runs']):
+        if reference in (run['id'], run.get('label')):
+            return run
+    raise SystemExit(f"No run '{reference}' in the history")
+
+
+# Function to print current against baseline for every case both runs measured
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    before = {(r['case'], r['bars'], r['tickers']): r for r in baseline['results'] if 'best_s' in r}
+    rows = []
+    for record in current['results']:
+        key = (record['case'], record['bars'], record['tickers'])
+        if 'best_s' not in record or key not in before:
+            continue
+        ratio = record['best_s'] / before[key]['best_s']
+        verdict = 'slower' if ratio > 1 + threshold else 'faster' if ratio < 1 - threshold else ''
+        rows.append((ratio, key, before[key]['best_s'], record['best_s'], verdict))
+
+    print(f"\nComparison: {current['id']} ({current.get('label') or '-'}, {current['environment']['commit']}) "
+          f"vs {baseline['id']} ({baseline.get('label') or '-'}, {baseline['environment']['commit']})")
+    if not rows:
+        print("No cases in common.")
+        return rows
+    print(f"{'case':<50} {'bars x tickers':>16} {'base ms':>11} {'now ms':>11} {'ratio':>7}")
+    for ratio, (case, bars, tickers), base, now, verdict in sorted(rows, key=lambda row: -row[0]):
+        print(f"{case:<50} {bars:>9,} x {tickers:<4} {base * 1000:>11.2f} {now * 1000:>11.2f} {ratio:>6.2f}x {verdict}")
+    ratios = [row[0] for row in rows]
+    print(f"Geometric mean ratio {float(np.exp(np.mean(np.log(ratios)))):.3f} over {len(rows)} cases; "
+          f"{sum(row[4] == 'slower' for row in rows)} slower, {sum(row[4] == 'faster' for row in rows)} faster "
+          f"beyond ±{threshold:.0%}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 1_000_000], help='bars per frame')
+    parser.add_argument('--panel-tickers', type=int, default=500)
+    parser.add_argument('--panel-bars', type=int, nargs='*', default=[250], help='bars per panel ticker (none to skip)')
+    parser.add_argument('--only', default=None, help='regex selecting case names, e.g. "ADX|calculate"')
+    parser.add_argument('--min-time', type=float, default=0.5, help='seconds spent per case before it stops repeating')
+    parser.add_argument('--max-repeats', type=int, default=5)
+    parser.add_argument('--nan-runs', type=int, default=0, help='runs of missing bars blanked in each frame')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--label', default=None, help='name to compare against later')
+    parser.add_argument('--history', default=HISTORY_PATH)
+    parser.add_argument('--compare-to', default='previous', help="'previous', a run id or label, or 'none'")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--no-save', action='store_true', help='do not append this run to the history')
+    parser.add_argument('--report', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help='only compare two stored runs, by id or label')
+    args = parser.parse_args()
+
+    history = load_history(args.history)
+    if args.report:
+        compare(find_run(history, args.report[0]), find_run(history, args.report[1]), args.threshold)
+        return
+
+    started = datetime.now(timezone.utc)
+    results = run_suite(args.sizes, args.panel_tickers, args.panel_bars, args.only, args.min_time, args.max_repeats,
+                        args.nan_runs, args.seed)
+    run = {'id': started.strftime('%Y%m%dT%H%M%SZ'), 'label': args.label, 'started': started.isoformat(),
+           'environment': environment(),
+           'parameters': {key: getattr(args, key) for key in ('sizes', 'panel_tickers', 'panel_bars', 'only',
+                                                              'nan_runs', 'seed')},
+           'results': results}
+
+    baseline = None
+    if args.compare_to == 'previous' and history['runs']:
+        baseline = history['runs'][-1]
+    elif args.compare_to not in ('previous', 'none'):
+        baseline = find_run(history, args.compare_to)
+    if not args.no_save:
+        history['runs'].append(run)
+        save_history(history, args.history)
+        print(f"\nSaved run {run['id']} to {args.history}")
+    if baseline is not None:
+        compare(baseline, run, args.threshold)
+
+
+if __name__ == '__main__':
+    main()
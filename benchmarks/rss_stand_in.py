@@ -0,0 +1,82 @@
+"""RSS ingestion against a local HTTP stand-in serving the fixture feeds.
+
+Serves benchmarks/fixtures/feeds with ETag and Last-Modified support, runs two ingestion
+passes into a throwaway article store and prints the per-feed report of each pass. The second
+pass should be all 304s with nothing stored. Run from the repository root:
+
+    python -m benchmarks.rss_stand_in --delay-ms 50
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import news_store
+import rss_ingest
+
+FEED_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'feeds')
+CONTENT_TYPES = {'.xml': 'application/rss+xml', '.atom': 'application/atom+xml'}
+
+
+# Function to build a handler serving the fixture feeds with conditional GET and an artificial delay
+def make_handler(feed_dir, delay):
+    class FeedHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = os.path.join(feed_dir, os.path.basename(self.path))
+            if not os.path.isfile(path):
+                self.send_error(404)
+                return
+            time.sleep(delay)
+            with open(path, 'rb') as f:
+                body = f.read()
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            modified = formatdate(os.path.getmtime(path), usegmt=True)
+            if self.headers.get('If-None-Match') == etag or self.headers.get('If-Modified-Since') == modified:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPES.get(os.path.splitext(path)[1], 'application/xml'))
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', modified)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FeedHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--delay-ms', type=float, default=50, help='per-request latency added by the stand-in')
+    parser.add_argument('--workers', type=int, default=rss_ingest.MAX_WORKERS)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(FEED_DIR, args.delay_ms / 1000))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    feeds = {name: f"{base}/{name}" for name in sorted(os.listdir(FEED_DIR))}
+    feeds['missing.xml'] = f"{base}/missing.xml"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rss_ingest.init_store(os.path.join(tmp, 'articles.db'))
+        for label in ('first pass', 'second pass'):
+            start = time.perf_counter()
+            results = rss_ingest.ingest(feeds, workers=args.workers)
+            print(f"\n{label}: {(time.perf_counter() - start) * 1000:.0f} ms wall")
+            rss_ingest.print_report(results)
+        stored = news_store.Article.select().count()
+        print(f"\nArticles in store: {stored}")
+        news_store.database.close()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
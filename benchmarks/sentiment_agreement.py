@@ -0,0 +1,61 @@
+"""Agreement and throughput of the lexicon sentiment scorer against TextBlob.
+
+Scores the titles and descriptions of the fixture corpus with both scorers, reports how closely
+the lexicon fast path tracks TextBlob polarity, then times both on the corpus repeated to a
+larger batch. Run from the repository root:
+
+    python -m benchmarks.sentiment_agreement --repeat 200
+"""
+import argparse
+import csv
+import os
+import time
+
+import numpy as np
+
+import lexicon_sentiment
+import sentiment
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'headlines.tsv')
+
+
+# Function to read titles and descriptions from the fixture corpus
+def load_corpus(path=FIXTURE):
+    with open(path, encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f, delimiter='\t'))
+    return [row['title'] for row in rows] + [row['description'] for row in rows]
+
+
+# Function to time one scorer over a batch, returning texts per second
+def throughput(score, texts):
+    start = time.perf_counter()
+    score(texts)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--corpus', default=FIXTURE)
+    parser.add_argument('--repeat', type=int, default=100, help='corpus copies in the throughput batch')
+    args = parser.parse_args()
+
+    texts = load_corpus(args.corpus)
+    reference = np.array(sentiment.textblob_polarities(texts))
+    fast = np.array(lexicon_sentiment.polarities(texts))
+    error = np.abs(reference - fast)
+
+    print(f"Corpus: {len(texts)} texts")
+    print(f"Exact match (|diff| < 1e-9): {np.mean(error < 1e-9):.1%}")
+    print(f"Same sign:                   {np.mean(np.sign(reference) == np.sign(fast)):.1%}")
+    print(f"Mean / max abs difference:   {error.mean():.4f} / {error.max():.4f}")
+    print(f"Pearson correlation:         {np.corrcoef(reference, fast)[0, 1]:.4f}")
+    print(f"Average sentiment:           textblob {reference.mean():.4f}, lexicon {fast.mean():.4f}")
+
+    batch = texts * args.repeat
+    lexicon_sentiment.load_lexicon()
+    for name, score in [('textblob', sentiment.textblob_polarities), ('lexicon', lexicon_sentiment.polarities)]:
+        print(f"{name:>8}: {throughput(score, batch):,.0f} texts/sec over {len(batch)} texts")
+
+
+if __name__ == '__main__':
+    main()
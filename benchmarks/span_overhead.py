@@ -0,0 +1,68 @@
+"""Cost of the timing spans with recording off and on.
+
+Times an empty span and a traced no-op call per iteration, then calculate_indicators on a
+synthetic frame with and without an active recording. Run from the repository root:
+
+    python -m benchmarks.span_overhead --iterations 1000000 --bars 2000
+"""
+import argparse
+import time
+
+import instrumentation
+import stock_functions
+from benchmarks.synthetic_ohlcv import make_ohlcv
+
+
+@instrumentation.traced('noop')
+def noop():
+    pass
+
+
+def bare():
+    pass
+
+
+# Function to time n calls of fn and return nanoseconds per call
+def per_call_ns(fn, n):
+    start = time.perf_counter_ns()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter_ns() - start) / n
+
+
+def empty_span():
+    with instrumentation.span('empty'):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=1_000_000)
+    parser.add_argument('--bars', type=int, default=2000)
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    baseline = per_call_ns(bare, args.iterations)
+    print(f"{'plain call':>24}: {baseline:7.1f} ns")
+    print(f"{'traced call, off':>24}: {per_call_ns(noop, args.iterations):7.1f} ns")
+    print(f"{'empty span, off':>24}: {per_call_ns(empty_span, args.iterations):7.1f} ns")
+    with instrumentation.recording(log_path=False):
+        n = args.iterations // 10
+        print(f"{'traced call, recording':>24}: {per_call_ns(noop, n):7.1f} ns")
+        print(f"{'empty span, recording':>24}: {per_call_ns(empty_span, n):7.1f} ns")
+
+    frame = make_ohlcv(args.bars)
+    stock_functions.calculate_indicators(frame.copy())
+    for label, recording in [('indicators, off', False), ('indicators, recording', True)]:
+        start = time.perf_counter()
+        for _ in range(args.repeats):
+            if recording:
+                with instrumentation.recording(log_path=False):
+                    stock_functions.calculate_indicators(frame.copy())
+            else:
+                stock_functions.calculate_indicators(frame.copy())
+        print(f"{label:>24}: {(time.perf_counter() - start) / args.repeats * 1000:7.2f} ms per frame")
+
+
+if __name__ == '__main__':
+    main()
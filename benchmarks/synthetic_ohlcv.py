@@ -0,0 +1,65 @@
+"""Deterministic synthetic OHLCV bars for benchmarks and equivalence checks.
+
+Closes follow a geometric Brownian motion. Opens gap away from the previous close at random
+session breaks, volume is lognormal and rises with the size of the move, and optional runs of
+missing bars are blanked to NaN. The same arguments always give the same frame. Example:
+
+    python -m benchmarks.synthetic_ohlcv --bars 10 --seed 3
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Per-bar drift and volatility of the log price, roughly a liquid NSE large cap on daily bars
+DRIFT = 0.0003
+VOLATILITY = 0.015
+
+
+# Function to generate n bars; gap_probability is the chance a bar opens away from the previous close,
+# nan_runs blanks that many runs of up to nan_run_length consecutive bars
+def make_ohlcv(n, seed=0, start_price=1000.0, drift=DRIFT, volatility=VOLATILITY, gap_probability=0.02,
+               gap_scale=0.03, nan_runs=0, nan_run_length=5, freq='B', start='2000-01-03'):
+    rng = np.random.default_rng(seed)
+    log_returns = rng.normal(drift - 0.5 * volatility ** 2, volatility, n)
+    close = start_price * np.exp(np.cumsum(log_returns))
+
+    previous_close = np.concatenate([[start_price], close[:-1]])
+    gaps = np.where(rng.random(n) < gap_probability, rng.normal(0, gap_scale, n), 0.0)
+    intrabar = rng.normal(0, volatility / 3, n)
+    open_ = previous_close * np.exp(gaps + intrabar)
+
+    wick = np.abs(rng.normal(0, volatility / 2, (2, n)))
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+
+    move = np.abs(np.log(close / open_)) / volatility
+    volume = np.round(rng.lognormal(13, 0.4, n) * (1 + move)).astype(float)
+
+    # Long frames fall back to minute bars so the index stays inside pandas' timestamp range
+    if freq == 'B' and n > 50_000:
+        freq = 'min'
+    index = pd.date_range(start, periods=n, freq=freq, tz='Asia/Kolkata', name='Date')
+    df = pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}, index=index)
+
+    for run_start in rng.integers(0, max(n, 1), nan_runs):
+        df.iloc[run_start:run_start + int(rng.integers(1, nan_run_length + 1))] = np.nan
+    return df
+
+
+# Function to generate a panel of independent tickers, each with its own seed
+def make_panel(tickers, bars, seed=0, **options):
+    return {f"SYN{i:04d}": make_ohlcv(bars, seed=seed * 100_003 + i, **options) for i in range(tickers)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bars', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--nan-runs', type=int, default=0)
+    args = parser.parse_args()
+    print(make_ohlcv(args.bars, seed=args.seed, nan_runs=args.nan_runs).to_string())
+
+
+if __name__ == '__main__':
+    main()
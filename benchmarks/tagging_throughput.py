@@ -0,0 +1,103 @@
+"""Ticker tagging throughput of the symbol master matcher on a synthetic article corpus.
+
+Builds a corpus of headline + description pairs with known planted company mentions, tags it
+with the token Aho-Corasick matcher and with a single compiled regex alternation as the
+baseline, and reports articles per second and recall/precision against the planted tickers.
+Run from the repository root:
+
+    python -m benchmarks.tagging_throughput --articles 100000
+"""
+import argparse
+import random
+import re
+import time
+
+import symbol_master
+
+FILLER = ("markets shares stock index investors quarter profit revenue guidance outlook rally slump "
+          "analysts brokerage target rating upgrade downgrade margin demand exports imports reliance "
+          "on global cues monsoon inflation rupee bond yields crude oil prices policy rate banks auto "
+          "pharma metals it sector titanic effort sunrise steel prices").split()
+VERBS = ['gains', 'falls', 'jumps', 'slips', 'rallies', 'drops', 'surges', 'declines', 'beats estimates',
+         'misses estimates', 'announces buyback', 'wins order', 'posts record profit']
+
+
+# Function to generate articles with 0-3 planted company mentions each, returning texts and labels
+def make_corpus(n, master, seed=0):
+    rng = random.Random(seed)
+    symbols = sorted(master)
+    articles, labels = [], []
+    for _ in range(n):
+        planted = rng.sample(symbols, rng.choice([0, 1, 1, 1, 2, 2, 3]))
+        mentions = [rng.choice(master[symbol][1:] or master[symbol]) for symbol in planted]
+        title = ' and '.join(mentions) + ' ' + rng.choice(VERBS) if mentions else ' '.join(rng.sample(FILLER, 6))
+        description = ' '.join(rng.choice(FILLER) for _ in range(rng.randint(20, 45)))
+        articles.append({'title': title.capitalize() if not mentions else title, 'description': description})
+        labels.append(sorted(symbol + '.NS' for symbol in planted))
+    return articles, labels
+
+
+# Function to build the baseline: one case-insensitive regex alternation over every alias
+def regex_tagger(master):
+    lookup = {}
+    for symbol, aliases in master.items():
+        for alias in aliases:
+            tokens = symbol_master.alias_tokens(alias)
+            if tokens:
+                lookup[tokens] = lookup.get(tokens, set()) | {symbol + '.NS'}
+    patterns = sorted((r'\W+'.join(re.escape(token) for token in tokens) for tokens in lookup), key=len, reverse=True)
+    pattern = re.compile(r'(?<![\w&])(?:' + '|'.join(patterns) + r')(?![\w&])', re.IGNORECASE)
+
+    def tag(article):
+        text = f"{article.get('title') or ''}\n{article.get('description') or ''}"
+        found = set()
+        for match in pattern.finditer(text):
+            found |= lookup.get(tuple(symbol_master.tokenize(match.group(0))), set())
+        return sorted(found)
+
+    return tag
+
+
+# Function to tag every article and time it
+def run(tagger, articles):
+    start = time.perf_counter()
+    tags = [tagger(article) for article in articles]
+    return tags, time.perf_counter() - start
+
+
+# Function to score tags against the planted labels
+def accuracy(tags, labels):
+    hits = sum(len(set(t) & set(l)) for t, l in zip(tags, labels))
+    predicted = sum(len(t) for t in tags)
+    planted = sum(len(l) for l in labels)
+    return hits / max(planted, 1), hits / max(predicted, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=100_000)
+    parser.add_argument('--master', default=None, help='symbol master CSV (default: bundled)')
+    args = parser.parse_args()
+
+    master = symbol_master.load_master(args.master)
+    articles, labels = make_corpus(args.articles, master)
+    print(f"Corpus: {len(articles)} articles, {sum(len(l) for l in labels)} planted mentions, "
+          f"{len(master)} symbols, {sum(len(a) for a in master.values())} aliases")
+
+    start = time.perf_counter()
+    matcher = symbol_master.TickerMatcher(master)
+    print(f"Matcher build: {(time.perf_counter() - start) * 1000:.1f} ms, {len(matcher.goto)} states")
+
+    results = {}
+    for name, tagger in [('aho-corasick', matcher.article_tickers), ('regex', regex_tagger(master))]:
+        tags, elapsed = run(tagger, articles)
+        recall, precision = accuracy(tags, labels)
+        results[name] = tags
+        print(f"{name:>12}: {len(articles) / elapsed:>9,.0f} articles/sec ({elapsed:.2f}s)  "
+              f"recall {recall:.1%}  precision {precision:.1%}")
+    agree = sum(a == b for a, b in zip(results['aho-corasick'], results['regex'])) / len(articles)
+    print(f"Identical tag sets: {agree:.2%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+import numpy as np
+import plotly.graph_objs as go
+from plotly.subplots import make_subplots
+
+import downsample
+from instrumentation import traced
+
+# Panels of the dashboard figure, top to bottom
+PANELS = ["Price", "MACD", "RSI", "Stochastic", "ADX", "OBV"]
+PANEL_HEIGHTS = [0.4, 0.12, 0.12, 0.12, 0.12, 0.12]
+
+# Overlay lines drawn on each panel: (column, trace name, color)
+PANEL_LINES = {
+    "Price": [('SMA_50', 'SMA 50', 'blue'), ('SMA_200', 'SMA 200', 'red'),
+              ('EMA_15', 'EMA 15', 'orange'), ('EMA_50', 'EMA 50', 'green')],
+    "MACD": [('MACD', 'MACD', 'green'), ('Signal', 'Signal', 'orange')],
+    "RSI": [('RSI', 'RSI', 'purple')],
+    "Stochastic": [('Stochastic_%K', 'Stochastic %K', 'blue'), ('Stochastic_%D', 'Stochastic %D', 'orange')],
+    "ADX": [('ADX', 'ADX', 'blue')],
+    "OBV": [('OBV', 'OBV', 'green')],
+}
+
+# Reference levels drawn as layout shapes: panel -> [(level, color)]
+PANEL_LEVELS = {
+    "RSI": [(70, 'red'), (30, 'green')],
+    "Stochastic": [(20, 'red'), (80, 'green')],
+    "ADX": [(30, 'red')],
+}
+
+
+# Function to format the bar timestamps once for hover text and axis ticks
+def date_labels(index):
+    intraday = len(index) > 1 and (index.normalize() != index).any()
+    return index.strftime('%Y-%m-%d %H:%M' if intraday else '%Y-%m-%d')
+
+
+# Function to pick evenly spaced bar positions for the shared x-axis ticks
+def axis_ticks(labels, n_ticks=10):
+    positions = np.unique(np.linspace(0, len(labels) - 1, num=min(n_ticks, len(labels))).astype(int))
+    return positions.tolist(), [labels[i] for i in positions]
+
+
+# Function to give a trace plotted against bar positions hover text showing the bar's date label
+def date_hover(name, labels, value_format=',.2f'):
+    return {'customdata': labels,
+            'hovertemplate': f"{name}: %{{y:{value_format}}} (%{{customdata}})<extra></extra>"}
+
+
+# Function to slice the full-resolution frame to the date window the user zoomed into
+def visible_window(df, start_date, end_date):
+    return df.loc[str(start_date):str(end_date)]
+
+
+# Function to build the combined multi-panel dashboard figure
+@traced('build_dashboard_figure')
+def build_dashboard_figure(df, ticker, max_points=downsample.DEFAULT_MAX_POINTS):
+    # The x-axis is the bar position, so weekend and holiday gaps collapse; dates reach the hover
+    # text as per-trace labels. At full resolution traces are placed with x0/dx instead of carrying
+    # positions; above max_points they are downsampled and carry only their kept positions.
+    labels = date_labels(df.index).to_numpy()
+    positions = np.arange(len(df))
+    panel_row = {panel: row for row, panel in enumerate(PANELS, start=1)}
+    reduce = max_points is not None and len(df) > max_points
+
+    fig = make_subplots(rows=len(PANELS), cols=1, shared_xaxes=True, vertical_spacing=0.02,
+                        row_heights=PANEL_HEIGHTS, subplot_titles=PANELS)
+
+    if reduce:
+        candle_x, open_, high, low, close = downsample.ohlc_buckets(
+            df['Open'], df['High'], df['Low'], df['Close'], max_points)
+    else:
+        candle_x, open_, high, low, close = positions, df['Open'], df['High'], df['Low'], df['Close']
+    fig.add_trace(go.Candlestick(x=candle_x,
+                                 open=open_,
+                                 high=high,
+                                 low=low,
+                                 close=close,
+                                 text=labels[candle_x],
+                                 name="Candlestick"), row=1, col=1)
+
+    for panel, lines in PANEL_LINES.items():
+        for column, name, color in lines:
+            if reduce:
+                x, y = downsample.lttb(positions, df[column], max_points)
+                trace = go.Scattergl(x=x, y=y, mode='lines', name=name, line=dict(color=color),
+                                     **date_hover(name, labels[x]))
+            else:
+                trace = go.Scattergl(x0=0, dx=1, y=df[column], mode='lines', name=name, line=dict(color=color),
+                                     **date_hover(name, labels))
+            fig.add_trace(trace, row=panel_row[panel], col=1)
+
+    if reduce:
+        x, y = downsample.minmax_buckets(positions, df['MACD_Histogram'], max_points)
+        histogram = go.Bar(x=x, y=y, name='MACD Histogram', marker_color='lightblue',
+                           **date_hover('MACD Histogram', labels[x]))
+    else:
+        histogram = go.Bar(x0=0, dx=1, y=df['MACD_Histogram'], name='MACD Histogram', marker_color='lightblue',
+                           **date_hover('MACD Histogram', labels))
+    fig.add_trace(histogram, row=panel_row["MACD"], col=1)
+
+    for panel, levels in PANEL_LEVELS.items():
+        for level, color in levels:
+            fig.add_hline(y=level, line=dict(color=color, dash="dash"), row=panel_row[panel], col=1)
+
+    tickvals, ticktext = axis_ticks(labels)
+    fig.update_xaxes(tickvals=tickvals, ticktext=ticktext, rangeslider_visible=False)
+    fig.update_layout(title=f"{ticker} Technical Analysis",
+                      height=1400,
+                      hovermode='x unified',
+                      legend=dict(x=0, y=1.02, traceorder='normal', orientation='h'))
+    return fig
+
+
+# Function to build the sentiment panel: per-bar and decayed polarity over article counts
+@traced('build_sentiment_figure')
+def build_sentiment_figure(df, ticker):
+    labels = date_labels(df.index).to_numpy()
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.05, row_heights=[0.65, 0.35],
+                        subplot_titles=["Sentiment", "Articles"])
+    fig.add_trace(go.Scattergl(x0=0, dx=1, y=df['Sentiment'], mode='markers', name='Bar Sentiment',
+                               marker=dict(color='gray', size=6), **date_hover('Bar Sentiment', labels, '.3f')),
+                  row=1, col=1)
+    fig.add_trace(go.Scattergl(x0=0, dx=1, y=df['Sentiment_Decayed'], mode='lines', name='Decayed Sentiment',
+                               line=dict(color='purple'), **date_hover('Decayed Sentiment', labels, '.3f')),
+                  row=1, col=1)
+    fig.add_hline(y=0, line=dict(color='black', dash='dot'), row=1, col=1)
+    fig.add_trace(go.Bar(x0=0, dx=1, y=df['Article_Count'], name='Articles', marker_color='lightblue',
+                         **date_hover('Articles', labels, ',')), row=2, col=1)
+
+    tickvals, ticktext = axis_ticks(labels)
+    fig.update_xaxes(tickvals=tickvals, ticktext=ticktext)
+    fig.update_layout(title=f"{ticker} News Sentiment", height=500, hovermode='x unified',
+                      legend=dict(x=0, y=1.08, orientation='h'))
+    return fig
@@ -0,0 +1,95 @@
+"""Headless batch analysis: fetch, indicators and analysis for one or many NSE symbols.
+
+Runs the same pipeline as the app without importing Streamlit, spread over worker processes in
+chunks, and writes one record per symbol to Parquet, JSON or JSON Lines. Examples:
+
+    python cli.py RELIANCE TCS INFY --output results.json
+    python cli.py --universe "NIFTY 500" --workers 4 --chunk-size 20 --output nifty500.parquet
+    python cli.py --symbols-file watchlist.csv --histories-dir data/histories --output watchlist.jsonl
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+import analysis_result
+import screener
+
+OUTPUT_FORMATS = ('.parquet', '.json', '.jsonl')
+
+logger = logging.getLogger('cli')
+
+
+# Function to resolve the symbols to analyze from the command line
+def resolve_symbols(args):
+    if args.symbols:
+        return [symbol.strip().upper() for symbol in args.symbols]
+    if args.symbols_file:
+        return screener.load_universe('Custom file', args.symbols_file)
+    return screener.load_universe(args.universe)
+
+
+# Function to write the collected records in the format implied by the output extension
+def write_records(records, path):
+    extension = os.path.splitext(path)[1].lower()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    if extension == '.parquet':
+        import pandas as pd
+
+        pd.DataFrame.from_records(records).to_parquet(path, index=False)
+    elif extension == '.jsonl':
+        with open(path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(records, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('symbols', nargs='*', help='NSE symbols, e.g. RELIANCE TCS (default: --universe)')
+    parser.add_argument('--universe', default='NIFTY 50', choices=[u for u in screener.UNIVERSES if u != 'Custom file'])
+    parser.add_argument('--symbols-file', default=None, help="CSV with a 'Symbol' column or one symbol per line")
+    parser.add_argument('--period', default='1y', help='history period passed to Yahoo Finance (default 1y)')
+    parser.add_argument('--output', required=True, help=f"output file, format by extension: {', '.join(OUTPUT_FORMATS)}")
+    parser.add_argument('--histories-dir', default=None, help='also write each indicator frame here as Parquet')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='worker processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=10, help='symbols per worker task (default 10)')
+    parser.add_argument('--max-tasks-per-child', type=int, default=None,
+                        help='recycle each worker after this many chunks to bound its memory')
+    parser.add_argument('--log-level', default='INFO')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper(), format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    if os.path.splitext(args.output)[1].lower() not in OUTPUT_FORMATS:
+        parser.error(f"--output must end in one of {', '.join(OUTPUT_FORMATS)}")
+    if args.histories_dir:
+        os.makedirs(args.histories_dir, exist_ok=True)
+
+    symbols = resolve_symbols(args)
+    logger.info("Analyzing %d symbols with %d workers, %d per chunk", len(symbols), args.workers, args.chunk_size)
+
+    start = time.perf_counter()
+    records, failed = [], []
+    for rows, errors in screener.screen_universe(symbols, args.period, workers=args.workers,
+                                                 chunk_size=args.chunk_size, to_record=analysis_result.to_dict,
+                                                 history_dir=args.histories_dir,
+                                                 max_tasks_per_child=args.max_tasks_per_child):
+        records.extend(rows)
+        failed.extend(errors)
+        for symbol, error in errors:
+            logger.warning("%s failed: %s", symbol, error)
+        logger.info("%d/%d symbols done", len(records) + len(failed), len(symbols))
+
+    records.sort(key=lambda record: record['ticker'])
+    write_records(records, args.output)
+    logger.info("Wrote %d records to %s in %.1fs, %d failed", len(records), args.output,
+                time.perf_counter() - start, len(failed))
+    return 0 if records or not symbols else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+import numpy as np
+
+# Default number of points sent to the browser per trace
+DEFAULT_MAX_POINTS = 1500
+
+
+# Function to pick the indices kept by largest-triangle-three-buckets downsampling
+def lttb_indices(x, y, n_out):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # First and last points are always kept, the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    indices = np.empty(n_out, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+
+    previous = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_start, next_stop = stop, edges[i + 2] if i + 2 < len(edges) else n
+        # Average of the next bucket is the third vertex of the triangle
+        avg_x = x[next_start:next_stop].mean()
+        avg_y = y[next_start:next_stop].mean()
+        bucket_x = x[start:stop]
+        bucket_y = y[start:stop]
+        areas = np.abs((x[previous] - avg_x) * (bucket_y - y[previous])
+                       - (x[previous] - bucket_x) * (avg_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        indices[i + 1] = previous
+    return indices
+
+
+# Function to downsample one line series, skipping the NaN warm-up of indicators
+def lttb(positions, values, n_out):
+    values = np.asarray(values, dtype=float)
+    valid = np.flatnonzero(np.isfinite(values))
+    keep = valid[lttb_indices(positions[valid], values[valid], n_out)]
+    return positions[keep], values[keep]
+
+
+# Function to split n bars into n_out contiguous buckets, returning each bucket's start position
+def bucket_starts(n, n_out):
+    return np.unique(np.linspace(0, n, n_out, endpoint=False).astype(int))
+
+
+# Function to aggregate OHLC bars into buckets that preserve each bucket's true high and low
+def ohlc_buckets(open_, high, low, close, n_out):
+    open_, high, low, close = (np.asarray(a, dtype=float) for a in (open_, high, low, close))
+    n = len(close)
+    if n_out >= n:
+        return np.arange(n), open_, high, low, close
+
+    starts = bucket_starts(n, n_out)
+    ends = np.append(starts[1:], n) - 1
+    return (starts,
+            open_[starts],
+            np.fmax.reduceat(high, starts),
+            np.fmin.reduceat(low, starts),
+            close[ends])
+
+
+# Function to reduce a line to the min and max of each bucket (keeps spikes, e.g. for histograms)
+def minmax_buckets(positions, values, n_out):
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n_out >= n:
+        return positions, values
+
+    starts = bucket_starts(n, max(n_out // 2, 1))
+    filled = np.where(np.isfinite(values), values, np.nan)
+    keep = []
+    for start, stop in zip(starts, np.append(starts[1:], n)):
+        bucket = filled[start:stop]
+        if np.isnan(bucket).all():
+            continue
+        lo, hi = start + np.nanargmin(bucket), start + np.nanargmax(bucket)
+        keep.extend(sorted({lo, hi}))
+    keep = np.asarray(keep, dtype=int)
+    return positions[keep], values[keep]
@@ -0,0 +1,74 @@
+import copy
+import threading
+from concurrent.futures import Future
+
+from cachetools import TTLCache
+
+import metrics
+
+# How long fetched prices and fundamentals are reused across sessions, as the Streamlit cache did
+FETCH_TTL_SECONDS = 3600
+FETCH_CACHE_ENTRIES = 512
+
+
+class FetchCache:
+    """Process-wide TTL cache for fetches made from orchestrator worker threads, where Streamlit's
+    caches must not be called. Concurrent misses for one key share a single fetch, and every caller
+    gets its own copy because the analysis adds indicator columns to the price frame in place."""
+
+    def __init__(self, name, maxsize=FETCH_CACHE_ENTRIES, ttl=FETCH_TTL_SECONDS):
+        self.name = name
+        self.values = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def get(self, key, load):
+        with self.lock:
+            if key in self.values:
+                value, hit, owner = self.values[key], True, False
+            else:
+                hit = False
+                pending = self.pending.get(key)
+                owner = pending is None
+                if owner:
+                    pending = self.pending[key] = Future()
+        metrics.cache_lookup(self.name, hit=hit)
+        if hit:
+            return copy.deepcopy(value)
+        if not owner:
+            return copy.deepcopy(pending.result())
+
+        try:
+            value = load()
+        except BaseException as e:
+            with self.lock:
+                del self.pending[key]
+            pending.set_exception(e)
+            raise
+        with self.lock:
+            del self.pending[key]
+            self.values[key] = value
+        pending.set_result(value)
+        return copy.deepcopy(value)
+
+    def clear(self):
+        with self.lock:
+            self.values.clear()
+
+
+STOCK_INFO = FetchCache('stock_info')
+PRICE_HISTORY = FetchCache('price_history')
+
+
+# Function to fetch a ticker's fundamentals through the process-wide cache
+def stock_info(ticker):
+    import stock_data
+
+    return STOCK_INFO.get(ticker, lambda: stock_data.fetch_stock_info(ticker))
+
+
+# Function to fetch a ticker's price history through the process-wide cache
+def historical_data(ticker, time_period):
+    import stock_data
+
+    return PRICE_HISTORY.get((ticker, time_period), lambda: stock_data.fetch_historical_data(ticker, time_period))
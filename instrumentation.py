@@ -0,0 +1,124 @@
+import contextvars
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+
+# Structured span log appended to by every recording, one JSON object per span
+SPAN_LOG_PATH = os.getenv('SPAN_LOG', os.path.join('data', 'spans.jsonl'))
+
+# Recorder of the current analysis, or None when nothing is recording. Worker threads see it because
+# orchestrator stages run in a copy of the submitting thread's context.
+_recorder = contextvars.ContextVar('recorder', default=None)
+_parent = contextvars.ContextVar('parent_span', default=None)
+_NOOP = nullcontext()
+_log_lock = threading.Lock()
+
+
+class Recorder:
+    """Spans collected during one recording, with start offsets relative to its creation."""
+
+    def __init__(self, trace_id=None):
+        self.trace_id = trace_id or uuid.uuid4().hex[:12]
+        self.origin = time.perf_counter()
+        self.wall_start = time.time()
+        self.spans = []
+        # next() on a count is atomic under the GIL, so spans from worker threads get unique ids
+        self.ids = itertools.count(1)
+
+    # Function to aggregate spans by name into table rows, in order of first start
+    def summary(self):
+        rows = {}
+        for span in sorted(self.spans, key=lambda s: s['start_ms']):
+            row = rows.setdefault(span['name'], {'Span': span['name'], 'Calls': 0, 'Total (ms)': 0.0, 'Mean (ms)': 0.0,
+                                                 'Max (ms)': 0.0, 'First Start (ms)': span['start_ms']})
+            row['Calls'] += 1
+            row['Total (ms)'] += span['duration_ms']
+            row['Max (ms)'] = max(row['Max (ms)'], span['duration_ms'])
+        for row in rows.values():
+            row['Mean (ms)'] = round(row['Total (ms)'] / row['Calls'], 3)
+            row['Total (ms)'] = round(row['Total (ms)'], 3)
+            row['Max (ms)'] = round(row['Max (ms)'], 3)
+        return list(rows.values())
+
+    # Function to append every span to the JSONL log
+    def write_log(self, path=None):
+        path = path or SPAN_LOG_PATH
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        lines = [json.dumps({'trace': self.trace_id, 'trace_start': self.wall_start, **span}, default=str)
+                 for span in sorted(self.spans, key=lambda s: s['start_ms'])]
+        with _log_lock, open(path, 'a', encoding='utf-8') as f:
+            f.write(''.join(line + '\n' for line in lines))
+
+
+@contextmanager
+def _span(recorder, name, attrs):
+    span_id = next(recorder.ids)
+    parent = _parent.get()
+    token = _parent.set(span_id)
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        end = time.perf_counter()
+        _parent.reset(token)
+        span = {'id': span_id, 'parent': parent, 'name': name, 'start_ms': round((start - recorder.origin) * 1000, 3),
+                'duration_ms': round((end - start) * 1000, 3), 'thread': threading.current_thread().name}
+        if error:
+            span['error'] = error
+        if attrs:
+            span.update(attrs)
+        recorder.spans.append(span)
+
+
+# Function to time a block as a named span; a shared no-op when nothing is recording
+def span(name, **attrs):
+    recorder = _recorder.get()
+    if recorder is None:
+        return _NOOP
+    return _span(recorder, name, attrs)
+
+
+# Decorator timing every call of a function as a span, named after the function by default
+def traced(name=None):
+    def decorate(fn):
+        span_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder.get()
+            if recorder is None:
+                return fn(*args, **kwargs)
+            with _span(recorder, span_name, None):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+# Function to record every span opened in this context (and in stages it submits) until the block ends;
+# log_path=False skips the JSONL log
+@contextmanager
+def recording(log_path=None):
+    recorder = Recorder()
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+        if log_path is not False:
+            recorder.write_log(log_path)
+
+
+# Function to check whether spans opened here are being recorded
+def is_recording():
+    return _recorder.get() is not None
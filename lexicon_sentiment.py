@@ -0,0 +1,92 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Same negations as TextBlob's pattern analyzer
+NEGATIONS = ("no", "not", "n't", "never")
+TOKEN_PATTERN = re.compile(r"[a-z]+(?=n't)|n't|[a-z]+")
+
+_lexicon = None
+
+
+# Function to build the word -> (polarity, intensity, is_modifier) arrays from TextBlob's lexicon
+def load_lexicon():
+    global _lexicon
+    if _lexicon is None:
+        from textblob.en import sentiment as pattern_sentiment
+
+        words = list(pattern_sentiment.keys())
+        polarity = np.array([pattern_sentiment[w][None][0] for w in words], dtype=float)
+        intensity = np.array([pattern_sentiment[w][None][2] for w in words], dtype=float)
+        # Words with an adverb sense scale the word that follows them ("very good")
+        is_modifier = np.array(['RB' in pattern_sentiment[w] for w in words], dtype=bool)
+        _lexicon = (pd.Index(words), polarity, intensity, is_modifier)
+    return _lexicon
+
+
+# Function to tokenize a batch into flat token and document-id arrays
+def tokenize(texts):
+    tokens = [TOKEN_PATTERN.findall(text.lower()) if text else [] for text in texts]
+    lengths = np.fromiter((len(t) for t in tokens), dtype=np.int64, count=len(tokens))
+    flat = [token for doc in tokens for token in doc]
+    return flat, np.repeat(np.arange(len(texts)), lengths)
+
+
+# Function to find, for every token, the closest earlier token in the same document that passes the mask
+def _previous_index(mask, doc_ids):
+    positions = np.arange(len(mask))
+    last = np.maximum.accumulate(np.where(mask, positions, -1))
+    previous = np.empty(len(mask), dtype=np.int64)
+    previous[0] = -1
+    previous[1:] = last[:-1]
+    same_doc = previous >= 0
+    same_doc[same_doc] = doc_ids[previous[same_doc]] == doc_ids[same_doc]
+    return np.where(same_doc, previous, -1)
+
+
+# Function to score a batch of texts with array operations over the whole batch
+def polarities(texts):
+    vocabulary, lexicon_polarity, lexicon_intensity, lexicon_modifier = load_lexicon()
+    flat, doc_ids = tokenize(texts)
+    n_docs = len(texts)
+    if not flat:
+        return [0.0] * n_docs
+
+    ids = vocabulary.get_indexer(flat)
+    known = ids >= 0
+    if not known.any():
+        return [0.0] * n_docs
+    safe_ids = np.where(known, ids, 0)
+    polarity = np.where(known, lexicon_polarity[safe_ids], 0.0)
+    intensity = np.where(known, lexicon_intensity[safe_ids], 1.0)
+    modifier = known & lexicon_modifier[safe_ids]
+    negation = np.isin(np.asarray(flat, dtype=object), NEGATIONS)
+    lengths = np.fromiter((len(token) for token in flat), dtype=np.int64, count=len(flat))
+
+    # Like TextBlob, a negation carries over one-letter words ("not a good") and a modifier
+    # carries over unknown words of up to two letters ("very, so good").
+    previous_for_negation = _previous_index(known | (lengths > 1), doc_ids)
+    previous_for_modifier = _previous_index(known | (lengths > 2), doc_ids)
+    has_negation = previous_for_negation >= 0
+    has_modifier = previous_for_modifier >= 0
+
+    # A known word after a modifier merges into the modifier's assessment, so each run of
+    # modifiers plus the word they modify counts once and takes the value of its last word.
+    merged = known & has_modifier & modifier[np.maximum(previous_for_modifier, 0)]
+    head = known & ~merged
+    negated_head = head & has_negation & negation[np.maximum(previous_for_negation, 0)]
+    has_successor = np.zeros(len(flat), dtype=bool)
+    has_successor[previous_for_modifier[merged]] = True
+    tail = known & ~has_successor
+
+    # "not very good": a negated modifier divides instead of multiplies
+    scale = np.where(negated_head, 1.0 / intensity, intensity)
+    value = np.where(merged, np.clip(polarity * scale[np.maximum(previous_for_modifier, 0)], -1.0, 1.0), polarity)
+    # "not good" = slightly bad: a negated assessment is flipped and halved
+    group = np.maximum(np.cumsum(head) - 1, 0)
+    value = np.where(negated_head[head][group], value * -0.5, value)
+
+    totals = np.bincount(doc_ids[tail], weights=value[tail], minlength=n_docs)
+    counts = np.bincount(doc_ids[tail], minlength=n_docs)
+    return (totals / np.maximum(counts, 1)).tolist()
@@ -0,0 +1,82 @@
+import sys
+import threading
+
+# How often the RSS sampler polls while an Analyze run is in flight
+SAMPLE_INTERVAL = 0.01
+# Containers nested deeper than this are counted by their shallow size only
+MAX_DEPTH = 4
+
+
+# Function to read this process's resident set size
+def rss_bytes():
+    import psutil
+
+    return psutil.Process().memory_info().rss
+
+
+# Function to estimate the bytes an object keeps alive: deep memory usage for frames, the JSON payload
+# for figures and a recursive sum for plain containers
+def object_bytes(value, depth=0):
+    if hasattr(value, 'memory_usage') and hasattr(value, 'index'):
+        usage = value.memory_usage(deep=True, index=True)
+        return int(usage.sum()) if hasattr(usage, 'sum') else int(usage)
+    if hasattr(value, 'to_json') and hasattr(value, 'layout'):
+        return len(value.to_json())
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    size = sys.getsizeof(value)
+    if depth >= MAX_DEPTH:
+        return size
+    if isinstance(value, dict):
+        return size + sum(object_bytes(k, depth + 1) + object_bytes(v, depth + 1) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(object_bytes(item, depth + 1) for item in value)
+    return size
+
+
+# Function to size every value of a session cache entry by key; a value stored under several keys
+# (the price frame gains its indicator columns in place) is counted once
+def entry_bytes(entry):
+    sizes, seen = {}, set()
+    for name, value in entry.items():
+        sizes[name] = 0 if id(value) in seen else object_bytes(value)
+        seen.add(id(value))
+    return sizes
+
+
+class PeakRSS:
+    """Context manager sampling RSS on a background thread to report the before, after and peak
+    resident size of the block it wraps."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.before = self.after = self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, rss_bytes())
+
+    def __enter__(self):
+        self.before = self.peak = rss_bytes()
+        self._thread = threading.Thread(target=self._sample, name='rss-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.after = rss_bytes()
+        self.peak = max(self.peak, self.after)
+        return False
+
+    # Function to summarise the run for the sidebar, in MB
+    def summary(self):
+        mb = 2 ** 20
+        return {
+            'RSS Before (MB)': round(self.before / mb, 1),
+            'RSS After (MB)': round(self.after / mb, 1),
+            'Delta (MB)': round((self.after - self.before) / mb, 1),
+            'Peak Delta (MB)': round((self.peak - self.before) / mb, 1),
+        }
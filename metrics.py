@@ -0,0 +1,228 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Port of the scrape endpoint the Streamlit app starts; unset leaves it off. service.py serves the same
+# registry on its own /metrics route. cli.py and scheduler.py start no endpoint: their fetches and
+# indicator work run in pool worker processes, whose registries the parent cannot scrape
+METRICS_PORT = os.getenv('ANALYZER_METRICS_PORT')
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Seconds; spans sub-millisecond cache reads up to slow upstream fetches
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Bar counts the indicator timings are grouped by: intraday month, 1y daily, 10y daily, long intraday
+BAR_COUNT_BUCKETS = (100, 300, 1000, 3000, 10000)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        (REGISTRY if registry is None else registry).register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, _labels(self.labelnames, key), value) for key, value in sorted(self._values.items())]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{name}{labels} {_number(value)}" for name, labels, value in self.samples())
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(Metric):
+    """Gauge set explicitly or, with a callback, read at scrape time."""
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), registry=None, callback=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.callback = callback
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self):
+        if self.callback is not None:
+            return [(self.name, '', self.callback())]
+        return super().samples()
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), registry=None, buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    # Function to observe the duration of a block in seconds
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        rows = []
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                rows.append((f"{self.name}_bucket", _labels(self.labelnames, key, [('le', _number(float(bound)))]),
+                             cumulative))
+            rows.append((f"{self.name}_sum", _labels(self.labelnames, key), total))
+            rows.append((f"{self.name}_count", _labels(self.labelnames, key), cumulative))
+        return rows
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self.metrics.append(metric)
+
+    # Function to render every metric in the Prometheus text exposition format
+    def render(self):
+        with self._lock:
+            metrics = list(self.metrics)
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+REGISTRY = Registry()
+
+
+# Function to read this process's resident set size for the RSS gauge
+def resident_bytes():
+    import psutil
+
+    return psutil.Process().memory_info().rss
+
+
+FETCH_SECONDS = Histogram('analyzer_fetch_seconds', 'Upstream fetch latency by source.', ['source'])
+FETCH_ERRORS = Counter('analyzer_fetch_errors_total', 'Upstream fetches that raised, by source.', ['source'])
+CACHE_LOOKUPS = Counter('analyzer_cache_lookups_total', 'Cache lookups by cache and result (hit or miss).',
+                        ['cache', 'result'])
+INDICATOR_SECONDS = Histogram('analyzer_indicator_seconds', 'calculate_indicators time by bar count bucket.',
+                              ['bars'])
+NEWSAPI_CALLS = Counter('analyzer_newsapi_calls_total', 'NewsAPI requests by outcome.', ['outcome'])
+SENTIMENT_TEXTS = Counter('analyzer_sentiment_texts_total',
+                          'Texts scored by scorer and source (stored score reused or newly scored).',
+                          ['scorer', 'source'])
+SENTIMENT_SECONDS = Histogram('analyzer_sentiment_seconds', 'Time to score a batch of new texts by scorer.',
+                              ['scorer'])
+ANALYSIS_SECONDS = Histogram('analyzer_analysis_seconds', 'Wall time of a full Analyze run in the app.', ['mode'])
+RESIDENT_MEMORY = Gauge('process_resident_memory_bytes', 'Resident memory size in bytes.', callback=resident_bytes)
+
+
+# Function to label a bar count with the upper bound of its bucket
+def bar_bucket(bars):
+    for bound in BAR_COUNT_BUCKETS:
+        if bars <= bound:
+            return str(bound)
+    return f"{BAR_COUNT_BUCKETS[-1]}+"
+
+
+# Function to time an upstream fetch, counting the ones that raise
+@contextmanager
+def timed_fetch(source):
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        FETCH_ERRORS.inc(source=source)
+        raise
+    finally:
+        FETCH_SECONDS.observe(time.perf_counter() - start, source=source)
+
+
+# Function to count a cache lookup as a hit or a miss
+def cache_lookup(cache, hit):
+    CACHE_LOOKUPS.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+# Function to serve /metrics from a daemon thread; later calls in the same process reuse the server
+def start_http_server(port=None, addr='127.0.0.1'):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class ScrapeHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = REGISTRY.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((addr, int(port or METRICS_PORT)), ScrapeHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name='metrics-http', daemon=True).start()
+        return _server
@@ -0,0 +1,45 @@
+import metrics
+from instrumentation import traced
+
+# How long a ticker's stored articles are served before NewsAPI is called again
+NEWS_TTL_SECONDS = 15 * 60
+NEWS_PAGE_SIZE = 100
+# What NewsAPI returns in place of an article its source has since taken down
+REMOVED_TITLE = '[Removed]'
+REMOVED_URL = 'https://removed.com'
+
+
+# Function to drop repeated and removed articles, keeping the first occurrence of each URL
+def dedupe_articles(articles):
+    seen, unique = set(), []
+    for article in articles:
+        url = article.get('url')
+        if not url or not article.get('title') or url in seen:
+            continue
+        if article['title'] == REMOVED_TITLE or url == REMOVED_URL:
+            continue
+        seen.add(url)
+        unique.append(article)
+    return unique
+
+
+# Function to fetch the article set for a query with a single NewsAPI call, newest first;
+# with since, only articles published at or after that UTC time are requested
+@traced('newsapi.get_everything')
+def fetch_articles(client, query, since=None):
+    params = {'from_param': since.strftime('%Y-%m-%dT%H:%M:%S')} if since is not None else {}
+    try:
+        with metrics.timed_fetch('newsapi'):
+            response = client.get_everything(q=query, language='en', sort_by='publishedAt',
+                                             page_size=NEWS_PAGE_SIZE, **params)
+    except Exception:
+        metrics.NEWSAPI_CALLS.inc(outcome='error')
+        raise
+    metrics.NEWSAPI_CALLS.inc(outcome='ok')
+    articles = dedupe_articles(response.get('articles', []))
+    return sorted(articles, key=lambda article: article.get('publishedAt') or '', reverse=True)
+
+
+# Function to pick the most recent articles for the news list
+def latest_articles(articles, n=5):
+    return articles[:n]
@@ -0,0 +1,241 @@
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+from peewee import CharField, CompositeKey, DateTimeField, ForeignKeyField, Model, SqliteDatabase, TextField
+from playhouse.sqlite_ext import FTS5Model, RowIDField, SearchField
+
+import metrics
+import news
+from instrumentation import span, traced
+
+# Local article store shared by the app and ingestion jobs, so per-ticker news outlives a render
+ARTICLE_DB_PATH = os.getenv('ARTICLE_DB', os.path.join('data', 'articles.db'))
+SQLITE_MAX_VARIABLES = 500
+
+database = SqliteDatabase(None)
+
+
+class Article(Model):
+    url = CharField(unique=True)
+    title = TextField()
+    description = TextField(null=True)
+    source = CharField(null=True)
+    published_at = DateTimeField(index=True)
+    fetched_at = DateTimeField()
+
+    class Meta:
+        database = database
+        table_name = 'articles'
+
+
+class ArticleTicker(Model):
+    article = ForeignKeyField(Article, backref='ticker_tags', on_delete='CASCADE')
+    ticker = CharField()
+    # Copied from the article so a ticker's history is one index range scan, newest first
+    published_at = DateTimeField()
+
+    class Meta:
+        database = database
+        table_name = 'article_tickers'
+        primary_key = CompositeKey('ticker', 'article')
+        indexes = ((('ticker', 'published_at'), False),)
+
+
+class ArticleIndex(FTS5Model):
+    # Contentless index: rowid is Article.id and the text lives only in the articles table
+    rowid = RowIDField()
+    title = SearchField()
+    description = SearchField()
+
+    class Meta:
+        database = database
+        table_name = 'article_index'
+        options = {'content': "''", 'tokenize': 'porter unicode61'}
+
+
+class RefreshState(Model):
+    ticker = CharField(primary_key=True)
+    refreshed_at = DateTimeField()
+
+    class Meta:
+        database = database
+        table_name = 'refresh_state'
+
+
+_db_lock = threading.Lock()
+_db_ready = False
+
+
+# Function to open the article store on first use
+def init_store(path=None):
+    global _db_ready
+    with _db_lock:
+        if _db_ready and path is None:
+            return
+        path = path or ARTICLE_DB_PATH
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        database.init(path, pragmas={'journal_mode': 'wal', 'synchronous': 'normal', 'foreign_keys': 1})
+        database.create_tables([Article, ArticleTicker, ArticleIndex, RefreshState], safe=True)
+        _db_ready = True
+
+
+# Function to parse a NewsAPI-style publishedAt value into a naive UTC datetime
+def parse_published(value):
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        published = value
+    else:
+        try:
+            published = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if published.tzinfo is not None:
+        published = published.astimezone(timezone.utc).replace(tzinfo=None)
+    return published
+
+
+# Function to turn a stored article back into the NewsAPI shape the app renders
+def to_article(row):
+    return {
+        'url': row.url,
+        'title': row.title,
+        'description': row.description,
+        'source': {'name': row.source},
+        'publishedAt': row.published_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+    }
+
+
+# Function to store articles and tag them with tickers, returning how many were new
+def save_articles(articles, tickers=()):
+    init_store()
+    now = datetime.utcnow().replace(microsecond=0)
+    rows = {}
+    for article in news.dedupe_articles(articles):
+        rows[article['url']] = {
+            'url': article['url'],
+            'title': article['title'],
+            'description': article.get('description'),
+            'source': (article.get('source') or {}).get('name'),
+            'published_at': parse_published(article.get('publishedAt')) or now,
+            'fetched_at': now,
+        }
+    if not rows:
+        return 0
+
+    urls = list(rows)
+    new_count = 0
+    with database.atomic():
+        for start in range(0, len(urls), SQLITE_MAX_VARIABLES // 6):
+            chunk = urls[start:start + SQLITE_MAX_VARIABLES // 6]
+            existing = {url for (url,) in Article.select(Article.url).where(Article.url.in_(chunk)).tuples()}
+            fresh = [rows[url] for url in chunk if url not in existing]
+            if fresh:
+                Article.insert_many(fresh).execute()
+            stored = list(Article.select(Article.id, Article.url, Article.published_at).where(Article.url.in_(chunk)))
+
+            # Only new articles go into the full-text index; known ones are already there
+            index_rows = [{ArticleIndex.rowid: row.id, ArticleIndex.title: rows[row.url]['title'],
+                           ArticleIndex.description: rows[row.url]['description'] or ''}
+                          for row in stored if row.url not in existing]
+            if index_rows:
+                ArticleIndex.insert_many(index_rows).execute()
+            tag_rows = [{'article': row.id, 'ticker': ticker, 'published_at': row.published_at}
+                        for row in stored for ticker in tickers]
+            if tag_rows:
+                ArticleTicker.insert_many(tag_rows).on_conflict_ignore().execute()
+            new_count += len(fresh)
+    return new_count
+
+
+# Function to store articles tagged with whatever tickers the tagger finds in each one
+def save_tagged(articles, tagger):
+    groups = {}
+    for article in articles:
+        groups.setdefault(tuple(tagger(article)), []).append(article)
+    return sum(save_articles(group, tickers) for tickers, group in groups.items())
+
+
+# Function to find the newest stored publish time for a ticker
+def latest_published(ticker):
+    init_store()
+    newest = (ArticleTicker.select(ArticleTicker.published_at)
+              .where(ArticleTicker.ticker == ticker)
+              .order_by(ArticleTicker.published_at.desc())
+              .first())
+    return newest.published_at if newest is not None else None
+
+
+# Function to list a ticker's stored articles, newest first
+def ticker_articles(ticker, limit=news.NEWS_PAGE_SIZE, since=None):
+    init_store()
+    query = (Article.select()
+             .join(ArticleTicker)
+             .where(ArticleTicker.ticker == ticker)
+             .order_by(ArticleTicker.published_at.desc()))
+    if since is not None:
+        query = query.where(ArticleTicker.published_at >= since)
+    if limit:
+        query = query.limit(limit)
+    return [to_article(row) for row in query]
+
+
+# Function to full-text search titles and descriptions, best matches first
+def search(text, ticker=None, limit=50):
+    init_store()
+    query = (Article.select()
+             .join(ArticleIndex, on=(ArticleIndex.rowid == Article.id))
+             .where(ArticleIndex.match(text))
+             .order_by(ArticleIndex.bm25())
+             .limit(limit))
+    if ticker is not None:
+        query = query.switch(Article).join(ArticleTicker).where(ArticleTicker.ticker == ticker)
+    return [to_article(row) for row in query]
+
+
+# Function to check whether a ticker's articles were refreshed within the last ttl seconds
+def needs_refresh(ticker, ttl=news.NEWS_TTL_SECONDS):
+    init_store()
+    state = RefreshState.get_or_none(RefreshState.ticker == ticker)
+    return state is None or datetime.utcnow() - state.refreshed_at > timedelta(seconds=ttl)
+
+
+# Function to record that a ticker's articles were just refreshed
+def mark_refreshed(ticker):
+    init_store()
+    RefreshState.replace(ticker=ticker, refreshed_at=datetime.utcnow()).execute()
+
+
+# Function to fetch only articles newer than the last stored one and return the ticker's stored set;
+# every article is tagged with the queried ticker and, with a tagger, also with the tickers it mentions
+@traced('news_store.refresh_ticker')
+def refresh_ticker(client, ticker, query, ttl=news.NEWS_TTL_SECONDS, limit=news.NEWS_PAGE_SIZE, tagger=None):
+    refresh = needs_refresh(ticker, ttl)
+    metrics.cache_lookup('news_store', hit=not refresh)
+    if refresh:
+        fetched = news.fetch_articles(client, query, since=latest_published(ticker))
+        with span('news_store.save', articles=len(fetched)):
+            if tagger is None:
+                save_articles(fetched, [ticker])
+            else:
+                save_tagged(fetched, lambda article: sorted({ticker, *tagger(article)}))
+        mark_refreshed(ticker)
+    return ticker_articles(ticker, limit=limit)
+
+
+# Function to load a ticker's stored headlines with their sentiment scores, oldest first
+@traced('news_store.sentiment_history')
+def sentiment_history(ticker, scorer='textblob', since=None):
+    import pandas as pd
+
+    import sentiment
+
+    articles = ticker_articles(ticker, limit=None, since=since)[::-1]
+    titles = [article['title'] for article in articles]
+    return pd.DataFrame({
+        'published_at': pd.to_datetime([article['publishedAt'] for article in articles], utc=True),
+        'title': titles,
+        'source': [article['source']['name'] for article in articles],
+        'polarity': sentiment.score_texts(titles, scorer=scorer) if titles else [],
+    })
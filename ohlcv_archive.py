@@ -0,0 +1,376 @@
+"""Memory-mapped binary archive of daily OHLCV bars for a whole universe.
+
+The archive directory holds one contiguous little-endian column file per field (Open, High, Low and
+Close as float32, Volume as int64), a shared session calendar (int64 days since the epoch) and an
+index.json mapping each ticker to its extents: (offset, length, calendar position) runs of rows
+laid out densely along the calendar, with NaN prices on sessions the ticker did not trade. Readers
+open the files with np.memmap and touch only the pages of the tickers and sessions they ask for, so
+a scan over 20 years x 2000 symbols never loads the whole archive.
+
+Updates are append-only: new bars go to the end of every column file as new extents and the index
+is replaced last, so a reader or a crash mid-append always sees the previous consistent archive.
+A ticker whose earlier bars changed (yfinance re-adjusts its whole history after a split or
+dividend) is rewritten the same way: replace() appends its full history as fresh extents and
+the index drops the old ones, whose rows stay unreferenced until the next compaction. Daily
+appends leave each ticker in many short extents; compact() rewrites the archive ticker by ticker
+into single extents under a new generation of files. One writer at a time. Examples:
+
+    python ohlcv_archive.py build --universe "NIFTY 500"   # from the scheduler's stored bars
+    python ohlcv_archive.py append --universe "NIFTY 500"
+    python ohlcv_archive.py compact
+    python ohlcv_archive.py info RELIANCE.NS
+"""
+import argparse
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+ARCHIVE_DIR = os.getenv('OHLCV_ARCHIVE_DIR', os.path.join('data', 'archive'))
+EXCHANGE_TZ = 'Asia/Kolkata'
+FIELDS = {'Open': '<f4', 'High': '<f4', 'Low': '<f4', 'Close': '<f4', 'Volume': '<i8'}
+# Volume stored for sessions a ticker has no bar on; prices are NaN there
+MISSING_VOLUME = 0
+# Mean extents per ticker above which append_from_store compacts the archive
+COMPACT_EXTENTS = 64
+# Tickers read into memory at a time while building from the stored per-ticker bars
+BUILD_CHUNK = 100
+
+logger = logging.getLogger('ohlcv_archive')
+
+
+def _column_path(path, field, generation):
+    return os.path.join(path, f"{field}.g{generation}.{FIELDS[field][1:]}")
+
+
+def _calendar_path(path):
+    return os.path.join(path, 'calendar.i8')
+
+
+def _empty_index():
+    return {'generation': 0, 'rows': 0, 'sessions': 0, 'tickers': {}}
+
+
+def read_index(path=ARCHIVE_DIR):
+    try:
+        with open(os.path.join(path, 'index.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return _empty_index()
+
+
+# Function to commit an update: the index is the only file replaced, so it is written last and atomically
+def _write_index(path, index):
+    temporary = os.path.join(path, 'index.json.tmp')
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, os.path.join(path, 'index.json'))
+
+
+def _memmap(file_path, dtype, length):
+    if length == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(file_path, dtype=dtype, mode='r', shape=(length,))
+
+
+# Function to turn a bar index into exchange session days since the epoch
+def _session_days(index):
+    if getattr(index, 'tz', None) is not None:
+        index = index.tz_convert(EXCHANGE_TZ).tz_localize(None)
+    return index.normalize().values.astype('datetime64[D]').astype(np.int64)
+
+
+class Archive:
+    """Read-only view of the archive as committed when it was opened."""
+
+    def __init__(self, path=ARCHIVE_DIR):
+        self.path = path
+        self.index = read_index(path)
+        self.calendar = _memmap(_calendar_path(path), '<i8', self.index['sessions'])
+        self.columns = {field: _memmap(_column_path(path, field, self.index['generation']), dtype,
+                                       self.index['rows'])
+                        for field, dtype in FIELDS.items()}
+
+    @property
+    def tickers(self):
+        return list(self.index['tickers'])
+
+    def dates(self):
+        return pd.DatetimeIndex(self.calendar.astype('datetime64[D]'))
+
+    # Function to find the calendar positions [lo, hi) of a date range, either end open
+    def positions(self, start=None, end=None):
+        lo = 0 if start is None else int(np.searchsorted(self.calendar, _day(start), 'left'))
+        hi = len(self.calendar) if end is None else int(np.searchsorted(self.calendar, _day(end), 'right'))
+        return lo, hi
+
+    # Function to read a ticker's columns over a date range: views of the mapped files when one extent
+    # covers the range, otherwise gathered into new arrays with gaps filled as missing sessions
+    def arrays(self, ticker, start=None, end=None):
+        extents = self.index['tickers'].get(ticker)
+        if not extents:
+            raise KeyError(f"{ticker} is not in the archive")
+        lo, hi = self.positions(start, end)
+        lo = max(lo, extents[0][2])
+        hi = max(lo, min(hi, extents[-1][2] + extents[-1][1]))
+        for offset, length, first in extents:
+            if first <= lo and hi <= first + length:
+                rows = slice(offset + lo - first, offset + hi - first)
+                return lo, hi, {field: column[rows] for field, column in self.columns.items()}
+
+        gathered = {field: np.full(hi - lo, np.nan if dtype[1] == 'f' else MISSING_VOLUME, dtype=dtype)
+                    for field, dtype in FIELDS.items()}
+        for offset, length, first in extents:
+            begin, stop = max(lo, first), min(hi, first + length)
+            if begin >= stop:
+                continue
+            for field, column in self.columns.items():
+                gathered[field][begin - lo:stop - lo] = column[offset + begin - first:offset + stop - first]
+        return lo, hi, gathered
+
+    # Function to read a ticker as a price frame like the one stock_data returns, indexed by
+    # exchange-local session dates; sessions the ticker did not trade are dropped unless keep_missing
+    def frame(self, ticker, start=None, end=None, keep_missing=False):
+        lo, hi, columns = self.arrays(ticker, start, end)
+        index = pd.DatetimeIndex(self.calendar[lo:hi].astype('datetime64[D]'), name='Date').tz_localize(EXCHANGE_TZ)
+        frame = pd.DataFrame(columns, index=index, copy=False)
+        if not keep_missing and np.isnan(columns['Close']).any():
+            frame = frame[~np.isnan(columns['Close'])]
+        return frame
+
+    # Function to check that a ticker's archived bars agree with a price frame on every session both
+    # hold, to float32 precision; a ticker not in the archive trivially agrees
+    def matches(self, ticker, frame):
+        if ticker not in self.index['tickers'] or frame is None or not len(frame):
+            return True
+        lo, hi, columns = self.arrays(ticker)
+        _, archived, fetched = np.intersect1d(self.calendar[lo:hi], _session_days(frame.index),
+                                              assume_unique=True, return_indices=True)
+        for field, dtype in FIELDS.items():
+            values = frame[field].to_numpy(dtype=float)[fetched]
+            if dtype[1] == 'i':
+                values = np.nan_to_num(values, nan=MISSING_VOLUME)
+            if not np.allclose(columns[field][archived], values.astype(dtype), rtol=1e-6, equal_nan=True):
+                return False
+        return True
+
+    # Function to summarise the archive, or one ticker of it
+    def info(self, ticker=None):
+        tickers = self.index['tickers']
+        if ticker is not None:
+            extents = tickers[ticker]
+            return {'ticker': ticker, 'extents': len(extents), 'rows': sum(length for _, length, _ in extents),
+                    'first': str(self.dates()[extents[0][2]].date()),
+                    'last': str(self.dates()[extents[-1][2] + extents[-1][1] - 1].date())}
+        bytes_per_row = sum(np.dtype(dtype).itemsize for dtype in FIELDS.values())
+        return {'tickers': len(tickers), 'sessions': self.index['sessions'], 'rows': self.index['rows'],
+                'bytes': self.index['rows'] * bytes_per_row + self.index['sessions'] * 8,
+                'generation': self.index['generation'],
+                'mean_extents': round(sum(map(len, tickers.values())) / max(len(tickers), 1), 1),
+                'first': str(self.dates()[0].date()) if self.index['sessions'] else None,
+                'last': str(self.dates()[-1].date()) if self.index['sessions'] else None}
+
+
+def _day(value):
+    value = pd.Timestamp(value)
+    if value.tz is not None:
+        value = value.tz_convert(EXCHANGE_TZ).tz_localize(None)
+    return value.to_datetime64().astype('datetime64[D]').astype(np.int64)
+
+
+def _append_file(file_path, committed_bytes, data):
+    with open(file_path, 'ab') as f:
+        # Bytes past the committed length are the torn tail of an append that never reached the index
+        if f.tell() != committed_bytes:
+            f.truncate(committed_bytes)
+            f.seek(committed_bytes)
+        f.write(np.ascontiguousarray(data).tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# Function to add sessions after the end of the calendar; returns the new calendar
+def _extend_calendar(path, index, calendar, days):
+    days = np.unique(np.asarray(days, dtype=np.int64))
+    if len(calendar):
+        days = days[days > calendar[-1]]
+    if len(days):
+        _append_file(_calendar_path(path), index['sessions'] * 8, days.astype('<i8'))
+        calendar = np.concatenate([calendar, days])
+        index['sessions'] = len(calendar)
+    return calendar
+
+
+# Function to append bars to the archive: bars maps ticker -> price frame. Sessions after the end of
+# the calendar extend it; a ticker's bars up to its last archived session are already stored and
+# ignored, unless the ticker is in rewrite, whose archived bars are all replaced by the frame's.
+# Bars on dates the calendar lacks (inside it, or before its start) are skipped. Returns the counts
+def append(bars, path=ARCHIVE_DIR, rewrite=()):
+    os.makedirs(path, exist_ok=True)
+    index = read_index(path)
+    calendar = np.array(_memmap(_calendar_path(path), '<i8', index['sessions']))
+    days = {ticker: _session_days(frame.index) for ticker, frame in bars.items() if frame is not None and len(frame)}
+    calendar = _extend_calendar(path, index, calendar, np.concatenate(list(days.values())) if days else [])
+
+    generation, rows = index['generation'], index['rows']
+    pending = {field: [] for field in FIELDS}
+    summary = {'tickers': 0, 'bars': 0, 'skipped': 0, 'replaced': 0}
+    for ticker, ticker_days in days.items():
+        if ticker in rewrite and ticker in index['tickers']:
+            # The old extents stay in the column files, unreferenced once the index is written
+            index['tickers'][ticker] = []
+            summary['replaced'] += 1
+        extents = index['tickers'].setdefault(ticker, [])
+        stored_end = extents[-1][2] + extents[-1][1] if extents else 0
+        positions = np.searchsorted(calendar, ticker_days)
+        placed = (positions < len(calendar)) & (calendar[np.minimum(positions, len(calendar) - 1)] == ticker_days)
+        keep = placed & (positions >= stored_end)
+        summary['skipped'] += int((~placed).sum())
+        if not keep.any():
+            if not extents:
+                del index['tickers'][ticker]
+            continue
+
+        frame = bars[ticker]
+        positions = positions[keep]
+        first, length = int(positions.min()), int(positions.max() - positions.min() + 1)
+        for field, dtype in FIELDS.items():
+            values = np.full(length, np.nan if dtype[1] == 'f' else MISSING_VOLUME, dtype=dtype)
+            source = frame[field].to_numpy()[keep]
+            if dtype[1] == 'i':
+                source = np.nan_to_num(source.astype(float), nan=MISSING_VOLUME)
+            values[positions - first] = source
+            pending[field].append(values)
+        # Bars continuing the extent that ends the column files extend it instead of starting another
+        if extents and extents[-1][0] + extents[-1][1] == rows and stored_end == first:
+            extents[-1][1] += length
+        else:
+            extents.append([rows, length, first])
+        rows += length
+        summary['tickers'] += 1
+        summary['bars'] += int(keep.sum())
+
+    if summary['tickers']:
+        for field in FIELDS:
+            _append_file(_column_path(path, field, generation), index['rows'] * np.dtype(FIELDS[field]).itemsize,
+                         np.concatenate(pending[field]))
+        index['rows'] = rows
+    _write_index(path, index)
+    return summary
+
+
+# Function to replace the archived bars of each ticker in bars with its frame, e.g. after a split or
+# dividend re-adjusted the ticker's whole history
+def replace(bars, path=ARCHIVE_DIR):
+    return append(bars, path, rewrite=set(bars))
+
+
+# Function to rewrite every ticker as one extent under a new generation of column files; readers that
+# opened the old generation keep reading it until they reopen
+def compact(path=ARCHIVE_DIR):
+    archive = Archive(path)
+    before = archive.info()['mean_extents']
+    index = {'generation': archive.index['generation'] + 1, 'rows': 0, 'sessions': archive.index['sessions'],
+             'tickers': {}}
+    files = {field: open(_column_path(path, field, index['generation']), 'wb') for field in FIELDS}
+    try:
+        for ticker in archive.tickers:
+            lo, hi, columns = archive.arrays(ticker)
+            for field, f in files.items():
+                f.write(np.ascontiguousarray(columns[field]).tobytes())
+            index['tickers'][ticker] = [[index['rows'], hi - lo, lo]]
+            index['rows'] += hi - lo
+        for f in files.values():
+            f.flush()
+            os.fsync(f.fileno())
+    finally:
+        for f in files.values():
+            f.close()
+    _write_index(path, index)
+    _remove_old_generations(path, index['generation'])
+    return {'tickers': len(index['tickers']), 'mean_extents_before': before, 'generation': index['generation']}
+
+
+# Function to delete column files of earlier generations; files still mapped on Windows are left
+# for the next compaction
+def _remove_old_generations(path, generation):
+    for name in os.listdir(path):
+        parts = name.split('.')
+        if len(parts) == 3 and parts[0] in FIELDS and parts[1].startswith('g') and parts[1] != f"g{generation}":
+            try:
+                os.remove(os.path.join(path, name))
+            except OSError:
+                pass
+
+
+# Function to create the archive from the bars scheduler.py keeps per ticker: the calendar is built
+# from every ticker's sessions first, then tickers are appended a chunk at a time
+def build_from_store(tickers, path=ARCHIVE_DIR, chunk=BUILD_CHUNK):
+    import precompute_store
+
+    if read_index(path)['rows']:
+        raise FileExistsError(f"{path} already holds an archive; use append")
+    os.makedirs(path, exist_ok=True)
+    index = read_index(path)
+    sessions = [_session_days(frame.index) for frame in map(precompute_store.read_ohlcv, tickers)
+                if frame is not None and len(frame)]
+    _extend_calendar(path, index, np.empty(0, dtype=np.int64), np.concatenate(sessions) if sessions else [])
+    _write_index(path, index)
+    return append_from_store(tickers, path, chunk, compact_above=None)
+
+
+# Function to append the bars stored for each ticker since its last archived session; a ticker in
+# refetched, or whose archived bars no longer match the stored ones, is rewritten in full instead
+def append_from_store(tickers, path=ARCHIVE_DIR, chunk=BUILD_CHUNK, compact_above=COMPACT_EXTENTS, refetched=()):
+    import precompute_store
+
+    totals = {'tickers': 0, 'bars': 0, 'skipped': 0, 'replaced': 0}
+    for start in range(0, len(tickers), chunk):
+        bars = {ticker: precompute_store.read_ohlcv(ticker) for ticker in tickers[start:start + chunk]}
+        archive = Archive(path)
+        rewrite = {ticker for ticker, frame in bars.items()
+                   if ticker in refetched or not archive.matches(ticker, frame)}
+        # Unmapped before appending; Windows will not grow a file while a view of it is open
+        del archive
+        if rewrite:
+            logger.info("Rewriting re-adjusted history of %s", ', '.join(sorted(rewrite)))
+        for key, value in append(bars, path, rewrite).items():
+            totals[key] += value
+    if compact_above is not None and Archive(path).info()['mean_extents'] > compact_above:
+        compact(path)
+        totals['compacted'] = True
+    return totals
+
+
+def main():
+    import screener
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('command', choices=['build', 'append', 'compact', 'info'])
+    parser.add_argument('tickers', nargs='*', help='Yahoo tickers, e.g. RELIANCE.NS (default: --universe)')
+    parser.add_argument('--universe', default='NIFTY 50', choices=[u for u in screener.UNIVERSES if u != 'Custom file'])
+    parser.add_argument('--path', default=ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    if args.command == 'info':
+        archive = Archive(args.path)
+        print(archive.info())
+        for ticker in args.tickers:
+            print(archive.info(ticker))
+        return
+    if args.command == 'compact':
+        print(compact(args.path))
+        return
+    tickers = args.tickers or [screener.to_nse_ticker(symbol) for symbol in screener.load_universe(args.universe)]
+    if args.command == 'build':
+        print(build_from_store(tickers, args.path))
+    else:
+        print(append_from_store(tickers, args.path))
+
+
+if __name__ == '__main__':
+    main()
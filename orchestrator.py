@@ -0,0 +1,148 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from queue import Queue
+
+import instrumentation
+
+# Network stages mostly wait on sockets, so a few threads cover price, info and news fetches
+MAX_WORKERS = 4
+
+
+@dataclass(slots=True)
+class Stage:
+    name: str
+    run: object
+    deps: tuple = ()
+
+
+@dataclass(slots=True)
+class StageResult:
+    name: str
+    deps: tuple
+    value: object = None
+    error: Exception = None
+    # True when the stage never ran because one of its deps failed
+    skipped: bool = False
+    # Seconds since the run started: when the inputs were ready, when a worker picked the stage up
+    # and when it finished
+    ready: float = 0.0
+    started: float = 0.0
+    finished: float = 0.0
+    thread: str = ''
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def duration(self):
+        return self.finished - self.started
+
+
+@dataclass
+class Run:
+    """Stages of one analysis running on a thread pool, each starting as soon as its inputs land.
+
+    A stage's function receives the values of its deps in order. A stage whose dep failed is
+    not run and reports the dep's error. Results are handed back in completion order through
+    as_completed(), so the caller can render each section from its own thread as data arrives.
+    """
+    stages: list
+    max_workers: int = MAX_WORKERS
+    results: dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        self._by_name = {stage.name: stage for stage in self.stages}
+        self._dependents = {stage.name: [] for stage in self.stages}
+        for stage in self.stages:
+            for dep in stage.deps:
+                self._dependents[dep].append(stage.name)
+        self._lock = threading.Lock()
+        self._done = Queue()
+        self._start = None
+        self._executor = None
+
+    def _now(self):
+        return time.perf_counter() - self._start
+
+    def _execute(self, stage, result, args):
+        result.started = self._now()
+        result.thread = threading.current_thread().name
+        try:
+            with instrumentation.span(f"stage.{stage.name}"):
+                result.value = stage.run(*args)
+        except Exception as e:
+            result.error = e
+        result.finished = self._now()
+        self._finish(result)
+
+    def _submit(self, stage):
+        result = StageResult(stage.name, stage.deps, ready=self._now())
+        failed = [self.results[dep] for dep in stage.deps if not self.results[dep].ok]
+        if failed:
+            result.error = failed[0].error
+            result.skipped = True
+            result.started = result.finished = result.ready
+            self._finish(result)
+            return
+        args = [self.results[dep].value for dep in stage.deps]
+        # Each stage runs in a copy of the submitting thread's context, so an active span recording
+        # follows the analysis onto the worker threads
+        self._executor.submit(contextvars.copy_context().run, self._execute, stage, result, args)
+
+    def _finish(self, result):
+        with self._lock:
+            self.results[result.name] = result
+            ready = [self._by_name[name] for name in self._dependents[result.name]
+                     if name not in self.results and all(dep in self.results for dep in self._by_name[name].deps)]
+        self._done.put(result)
+        for stage in ready:
+            self._submit(stage)
+
+    # Function to start every stage that has no inputs
+    def start(self):
+        self._start = time.perf_counter()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='analysis')
+        for stage in self.stages:
+            if not stage.deps:
+                self._submit(stage)
+        return self
+
+    # Function to yield stage results in the order they finish
+    def as_completed(self):
+        try:
+            for _ in range(len(self.stages)):
+                yield self._done.get()
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # Function to list the stages on the longest chain of waits, first to last
+    def critical_path(self):
+        if not self.results:
+            return []
+        name = max(self.results, key=lambda n: self.results[n].finished)
+        path = [name]
+        while self.results[name].deps:
+            name = max(self.results[name].deps, key=lambda n: self.results[n].finished)
+            path.append(name)
+        return path[::-1]
+
+    # Function to summarise per-stage timings as rows for a table
+    def timings(self):
+        critical = set(self.critical_path())
+        rows = []
+        for result in sorted(self.results.values(), key=lambda r: r.started):
+            rows.append({
+                'Stage': result.name,
+                'Waits On': ', '.join(result.deps),
+                'Start (s)': round(result.started, 3),
+                'Duration (s)': round(result.duration, 3),
+                'End (s)': round(result.finished, 3),
+                'Queued (s)': round(result.started - result.ready, 3),
+                'Critical Path': result.name in critical,
+                'Status': 'ok' if result.ok else 'skipped' if result.skipped else f"error: {result.error}",
+            })
+        return rows
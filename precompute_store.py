@@ -0,0 +1,131 @@
+import json
+import os
+from datetime import time, timedelta
+
+import pandas as pd
+
+# Nightly outputs of scheduler.py, read by the app so a morning Analyze click skips fetch and compute
+PRECOMPUTE_DIR = os.getenv('PRECOMPUTE_DIR', os.path.join('data', 'precomputed'))
+EXCHANGE_TZ = 'Asia/Kolkata'
+MARKET_CLOSE = time(15, 30)
+# How far back each app period reaches from the last bar; 'max' keeps the whole stored history
+PERIOD_OFFSETS = {
+    '1mo': pd.DateOffset(months=1), '3mo': pd.DateOffset(months=3), '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1), '2y': pd.DateOffset(years=2), '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10), 'max': None,
+}
+PERIODS = list(PERIOD_OFFSETS)
+# A stored history starting this soon after a period's start still covers it (weekends, holidays)
+COVERAGE_SLACK = pd.Timedelta(days=7)
+
+
+def _path(*parts):
+    return os.path.join(PRECOMPUTE_DIR, *parts)
+
+
+# Function to write through a temporary file so a crash never leaves a torn output behind
+def _atomic_write(path, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = path + '.tmp'
+    write(temporary)
+    os.replace(temporary, path)
+
+
+# Function to return the date of the latest completed NSE session (weekends skipped, holidays not)
+def session_date(now=None):
+    now = now or pd.Timestamp.now(tz=EXCHANGE_TZ)
+    day = now.date()
+    if now.time() < MARKET_CLOSE:
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+
+# Function to read the stored daily bars for a ticker, or None when nothing is stored yet
+def read_ohlcv(ticker):
+    path = _path('ohlcv', f"{ticker}.parquet")
+    if not os.path.exists(path):
+        return None
+    return pd.read_parquet(path)
+
+
+def write_ohlcv(ticker, frame):
+    _atomic_write(_path('ohlcv', f"{ticker}.parquet"), frame.to_parquet)
+
+
+# Function to append freshly fetched bars to a stored history; overlapping dates take the new bar
+def merge_bars(stored, fetched):
+    if stored is None or stored.empty:
+        return fetched
+    if fetched is None or fetched.empty:
+        return stored
+    merged = pd.concat([stored, fetched.reindex(columns=stored.columns)])
+    return merged[~merged.index.duplicated(keep='last')].sort_index()
+
+
+# Function to check whether a stored history reaches back far enough for a period
+def covers(frame, period):
+    offset = PERIOD_OFFSETS[period]
+    if frame is None or frame.empty:
+        return False
+    if offset is None:
+        return True
+    return frame.index[0] <= frame.index[-1] - offset + COVERAGE_SLACK
+
+
+# Function to pick the shortest period, no shorter than the given one, whose fetch today reaches back
+# to the start of a stored history, so a full refetch can replace it without losing bars
+def covering_period(frame, period, now=None):
+    if frame is None or frame.empty:
+        return period
+    now = now or pd.Timestamp.now(tz=EXCHANGE_TZ)
+    first = frame.index[0] if frame.index.tz is not None else frame.index[0].tz_localize(EXCHANGE_TZ)
+    for candidate in PERIODS[PERIODS.index(period):]:
+        offset = PERIOD_OFFSETS[candidate]
+        if offset is None or now - offset <= first + COVERAGE_SLACK:
+            return candidate
+    return 'max'
+
+
+# Function to return the exchange-local date of a frame's last bar
+def last_bar_date(frame):
+    last = frame.index[-1]
+    return (last.tz_convert(EXCHANGE_TZ) if last.tzinfo is not None else last).date()
+
+
+# Function to cut a stored history down to the bars a period fetch would return
+def trim_period(frame, period):
+    offset = PERIOD_OFFSETS[period]
+    if offset is None or frame.empty:
+        return frame
+    return frame[frame.index >= frame.index[-1] - offset]
+
+
+# Function to persist the indicator frame and analysis of one ticker and period; as_of is the run's
+# session and last_bar the session of the newest bar the frame actually holds
+def write_result(ticker, period, frame, result, markdown, as_of):
+    _atomic_write(_path('indicators', period, f"{ticker}.parquet"), frame.to_parquet)
+    payload = {'ticker': ticker, 'period': period, 'as_of': as_of.isoformat(),
+               'last_bar': last_bar_date(frame).isoformat(), 'result': result, 'markdown': markdown}
+
+    def write(path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+
+    _atomic_write(_path('analysis', period, f"{ticker}.json"), write)
+
+
+# Function to load a precomputed indicator frame and analysis payload, or None when missing or stale:
+# a result is stale unless its last bar is the latest completed session's (so on an exchange
+# holiday the app falls back to computing live)
+def read_result(ticker, period, as_of=None):
+    analysis_path = _path('analysis', period, f"{ticker}.json")
+    frame_path = _path('indicators', period, f"{ticker}.parquet")
+    if not (os.path.exists(analysis_path) and os.path.exists(frame_path)):
+        return None
+    with open(analysis_path, encoding='utf-8') as f:
+        payload = json.load(f)
+    if payload.get('last_bar', '') < (as_of or session_date()).isoformat():
+        return None
+    return pd.read_parquet(frame_path), payload
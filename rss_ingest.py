@@ -0,0 +1,206 @@
+import argparse
+import calendar
+import html
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+
+import feedparser
+import requests
+from peewee import CharField, DateTimeField, IntegerField, Model
+
+import news_store
+import symbol_master
+
+# Indian market feeds polled when no feed list is given; override with --feeds or RSS_FEEDS
+DEFAULT_FEEDS = {
+    'Economic Times Markets': 'https://economictimes.indiatimes.com/markets/rssfeeds/1977021501.cms',
+    'Moneycontrol Market Reports': 'https://www.moneycontrol.com/rss/marketreports.xml',
+    'Livemint Markets': 'https://www.livemint.com/rss/markets',
+    'Business Standard Markets': 'https://www.business-standard.com/rss/markets-106.rss',
+    'BusinessLine Markets': 'https://www.thehindubusinessline.com/markets/feeder/default.rss',
+}
+REQUEST_TIMEOUT = 10
+MAX_WORKERS = 8
+USER_AGENT = 'IndianStockAnalyzer/1.0 (+feedparser)'
+
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+
+class FeedState(Model):
+    url = CharField(primary_key=True)
+    etag = CharField(null=True)
+    modified = CharField(null=True)
+    last_published = DateTimeField(null=True)
+    last_status = IntegerField(null=True)
+    polled_at = DateTimeField(null=True)
+
+    class Meta:
+        database = news_store.database
+        table_name = 'feed_state'
+
+
+@dataclass(slots=True)
+class FeedResult:
+    name: str
+    url: str
+    status: int = 0
+    latency_ms: float = 0.0
+    items: int = 0
+    fresh: int = 0
+    stored: int = 0
+    error: str = ''
+
+
+# Function to read a feed list: "name,url" or bare url per line, '#' starts a comment
+def read_feed_list(path):
+    feeds = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            name, _, url = line.rpartition(',')
+            feeds[name.strip() or line] = url.strip()
+    return feeds
+
+
+# Function to pick the configured feed list
+def configured_feeds(path=None):
+    path = path or os.getenv('RSS_FEEDS')
+    return read_feed_list(path) if path else dict(DEFAULT_FEEDS)
+
+
+# Function to open the article store and the per-feed conditional GET state
+def init_store(path=None):
+    news_store.init_store(path)
+    news_store.database.create_tables([FeedState], safe=True)
+
+
+# Function to strip markup from a feed summary
+def clean_text(value):
+    return html.unescape(TAG_PATTERN.sub('', value or '')).strip() or None
+
+
+# Function to read an entry's publish time as a naive UTC datetime
+def entry_published(entry):
+    parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+    return datetime.utcfromtimestamp(calendar.timegm(parsed)) if parsed else None
+
+
+# Function to convert a feed entry into the NewsAPI-style article the store takes
+def to_article(entry, source, published):
+    return {
+        'url': entry.get('link'),
+        'title': clean_text(entry.get('title')),
+        'description': clean_text(entry.get('summary')),
+        'source': {'name': source},
+        'publishedAt': published.strftime('%Y-%m-%dT%H:%M:%SZ') if published else None,
+    }
+
+
+# Function to fetch one feed with conditional GET and parse only entries newer than the last poll
+def poll_feed(name, url, state, session=None, timeout=REQUEST_TIMEOUT):
+    result = FeedResult(name=name, url=url)
+    headers = {'User-Agent': USER_AGENT}
+    if state is not None and state.etag:
+        headers['If-None-Match'] = state.etag
+    if state is not None and state.modified:
+        headers['If-Modified-Since'] = state.modified
+
+    start = time.perf_counter()
+    try:
+        response = (session or requests).get(url, headers=headers, timeout=timeout)
+        result.status = response.status_code
+        if response.status_code == 304:
+            return result, [], response.headers
+        response.raise_for_status()
+        parsed = feedparser.parse(response.content, response_headers={
+            'content-type': response.headers.get('content-type', ''),
+            'content-location': url,
+        })
+    except requests.RequestException as e:
+        result.error = str(e)
+        return result, [], {}
+    finally:
+        result.latency_ms = (time.perf_counter() - start) * 1000
+
+    if parsed.bozo and not parsed.entries:
+        result.error = str(parsed.get('bozo_exception', 'unparseable feed'))
+        return result, [], response.headers
+
+    # Entries at or before the newest one stored on an earlier poll are skipped without building rows
+    last_published = state.last_published if state is not None else None
+    articles = []
+    result.items = len(parsed.entries)
+    for entry in parsed.entries:
+        published = entry_published(entry)
+        if last_published is not None and published is not None and published <= last_published:
+            continue
+        if entry.get('link') and entry.get('title'):
+            articles.append(to_article(entry, parsed.feed.get('title') or name, published))
+    result.fresh = len(articles)
+    return result, articles, response.headers
+
+
+# Function to poll every feed concurrently and store new articles, returning per-feed results
+def ingest(feeds, workers=MAX_WORKERS, tagger=None, timeout=REQUEST_TIMEOUT):
+    init_store()
+    states = {state.url: state for state in FeedState.select().where(FeedState.url.in_(list(feeds.values())))}
+
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=max(1, min(workers, len(feeds)))) as executor:
+        futures = [executor.submit(poll_feed, name, url, states.get(url), session, timeout)
+                   for name, url in feeds.items()]
+        polled = [future.result() for future in futures]
+
+    # Writes stay on this thread; SQLite takes one writer at a time anyway
+    now = datetime.utcnow()
+    results = []
+    for result, articles, headers in polled:
+        if articles:
+            if tagger is None:
+                result.stored = news_store.save_articles(articles)
+            else:
+                result.stored = news_store.save_tagged(articles, tagger)
+        state = states.get(result.url) or FeedState(url=result.url)
+        if not result.error:
+            state.etag = headers.get('ETag', state.etag)
+            state.modified = headers.get('Last-Modified', state.modified)
+            published = [news_store.parse_published(a['publishedAt']) for a in articles if a['publishedAt']]
+            if published:
+                state.last_published = max(published + ([state.last_published] if state.last_published else []))
+        state.last_status = result.status
+        state.polled_at = now
+        state.save(force_insert=result.url not in states)
+        results.append(result)
+    return results
+
+
+# Function to print the per-feed latency and item counts of an ingestion run
+def print_report(results):
+    print(f"{'feed':<32} {'status':>6} {'ms':>8} {'items':>6} {'fresh':>6} {'stored':>6}  error")
+    for r in results:
+        print(f"{r.name[:32]:<32} {r.status:>6} {r.latency_ms:>8.0f} {r.items:>6} {r.fresh:>6} {r.stored:>6}  {r.error}")
+    print(f"{'total':<32} {'':>6} {max((r.latency_ms for r in results), default=0):>8.0f} "
+          f"{sum(r.items for r in results):>6} {sum(r.fresh for r in results):>6} {sum(r.stored for r in results):>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Poll market RSS feeds and store new articles.")
+    parser.add_argument('--feeds', default=None, help='feed list file ("name,url" per line)')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    parser.add_argument('--timeout', type=float, default=REQUEST_TIMEOUT)
+    parser.add_argument('--db', default=None, help=f'article store path (default {news_store.ARTICLE_DB_PATH})')
+    parser.add_argument('--no-tagging', action='store_true', help='store articles without ticker tags')
+    args = parser.parse_args()
+
+    init_store(args.db)
+    tagger = None if args.no_tagging else symbol_master.default_matcher().article_tickers
+    print_report(ingest(configured_feeds(args.feeds), workers=args.workers, tagger=tagger, timeout=args.timeout))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""Nightly precompute of indicator frames and analyses for a symbol universe.
+
+After NSE close, refreshes the stored daily bars of every symbol incrementally, recomputes the
+indicator frame and analysis for each requested period on a process pool and writes them to
+precompute_store, where the app picks them up. Progress is checkpointed per symbol, so a run that
+dies partway resumes where it stopped. Examples:
+
+    python scheduler.py --universe "NIFTY 50" --periods 1y 2y --workers 4
+    python scheduler.py --universe "NIFTY 500" --daemon --at 16:15
+    python scheduler.py --universe "NIFTY 500" --archive   # also append the bars to ohlcv_archive
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import analysis_result
+import precompute_store
+import screener
+import stock_data
+import stock_functions
+
+# Default start time, exchange-local; NSE closes at 15:30 and Yahoo settles the day's bar shortly after
+RUN_AT = '16:15'
+# yfinance columns recording the corporate actions behind its auto-adjusted prices
+ACTION_COLUMNS = ('Dividends', 'Stock Splits')
+
+logger = logging.getLogger('scheduler')
+
+
+class Checkpoint:
+    """Append-only log of the symbols finished in one run, keyed by session date and periods.
+
+    Each line is flushed and synced as it is written, so after a crash the log holds exactly the
+    symbols whose outputs were completely written."""
+
+    def __init__(self, as_of, periods, fresh=False):
+        self.path = precompute_store._path('runs', f"{as_of.isoformat()}_{'-'.join(periods)}.jsonl")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if fresh and os.path.exists(self.path):
+            os.remove(self.path)
+        self.done = set()
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A line torn by the crash is ignored and its symbol redone
+                        continue
+                    if record['status'] == 'ok':
+                        self.done.add(record['symbol'])
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def record(self, symbol, status, **details):
+        self._file.write(json.dumps({'symbol': symbol, 'status': status, **details}) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        if status == 'ok':
+            self.done.add(symbol)
+
+    def close(self):
+        self._file.close()
+
+
+# Function to check fetched bars for a split or dividend; yfinance then re-adjusts every earlier bar
+def has_corporate_action(bars):
+    columns = [column for column in ACTION_COLUMNS if column in bars]
+    return bool(columns) and bool(bars[columns].fillna(0).ne(0).any().any())
+
+
+# Function to bring the stored bars of a ticker up to date, fetching only the missing days when the
+# stored bars are still adjusted consistently with a fresh fetch; also reports whether the stored
+# history was replaced by a full refetch
+def refresh_ohlcv(ticker, periods):
+    stored = precompute_store.read_ohlcv(ticker)
+    longest = max(periods, key=precompute_store.PERIODS.index)
+    fetched = None
+    if all(precompute_store.covers(stored, period) for period in periods):
+        # The last stored bar is fetched again in case it was written before the day settled
+        fetched = stock_data.fetch_history_since(ticker, stored.index[-1].date().isoformat())
+        if fetched is not None and has_corporate_action(fetched[fetched.index > stored.index[-1]]):
+            logger.info("%s has a split or dividend since %s; refetching its full history",
+                        ticker, stored.index[-1].date())
+            fetched = None
+    if fetched is None:
+        # A full fetch replaces the stored bars outright, reaching back as far as they did, so the
+        # whole history is adjusted as of today
+        fetched = stock_data.fetch_historical_data(ticker, precompute_store.covering_period(stored, longest))
+        bars = fetched if fetched is not None and not fetched.empty else stored
+    else:
+        bars = precompute_store.merge_bars(stored, fetched)
+    if bars is None or bars.empty:
+        return None, 0, False
+    new_bars = len(bars) - (0 if stored is None else len(stored))
+    precompute_store.write_ohlcv(ticker, bars)
+    return bars, new_bars, bars is fetched and stored is not None
+
+
+# Function executed in a worker process: refresh one symbol and write its outputs for every period
+def precompute_symbol(symbol, periods, as_of):
+    ticker = screener.to_nse_ticker(symbol)
+    stock_info = stock_data.fetch_stock_info(ticker)
+    bars, new_bars, refetched = refresh_ohlcv(ticker, periods)
+    if bars is None:
+        raise LookupError('no price history')
+    # A period too short for the indicators is reported and left to the app to compute live
+    period_errors = {}
+    for period in periods:
+        try:
+            frame = stock_functions.calculate_indicators(precompute_store.trim_period(bars, period))
+            result = stock_functions.compute_analysis(ticker, stock_info, frame)
+        except Exception as e:
+            period_errors[period] = f"{type(e).__name__}: {e}"
+            continue
+        precompute_store.write_result(ticker, period, frame, analysis_result.to_dict(result),
+                                      analysis_result.render_markdown(result), as_of)
+    if len(period_errors) == len(periods):
+        raise RuntimeError('; '.join(f"{period}: {error}" for period, error in period_errors.items()))
+    return {'bars': len(bars), 'new_bars': new_bars, 'last_bar': bars.index[-1].date().isoformat(),
+            'refetched': refetched, 'period_errors': period_errors}
+
+
+# Function to add the refreshed bars to the memory-mapped research archive, creating it on first use;
+# symbols whose stored history was refetched in full are rewritten in the archive too
+def update_archive(symbols, refetched=()):
+    import ohlcv_archive
+
+    tickers = [screener.to_nse_ticker(symbol) for symbol in symbols]
+    if ohlcv_archive.read_index()['rows']:
+        summary = ohlcv_archive.append_from_store(
+            tickers, refetched={screener.to_nse_ticker(symbol) for symbol in refetched})
+    else:
+        summary = ohlcv_archive.build_from_store(tickers)
+    logger.info("Archive %s updated: %s", ohlcv_archive.ARCHIVE_DIR, summary)
+
+
+# Function to precompute every symbol not yet finished in this session's checkpoint
+def run(symbols, periods, workers=None, as_of=None, fresh=False, max_tasks_per_child=None, archive=False):
+    as_of = as_of or precompute_store.session_date()
+    checkpoint = Checkpoint(as_of, periods, fresh)
+    pending = [symbol for symbol in symbols if symbol not in checkpoint.done]
+    logger.info("Session %s: %d of %d symbols left, periods %s", as_of, len(pending), len(symbols), ', '.join(periods))
+
+    pool_options = {}
+    if max_tasks_per_child:
+        pool_options = {'max_tasks_per_child': max_tasks_per_child, 'mp_context': multiprocessing.get_context('spawn')}
+    start = time.perf_counter()
+    failed, refetched = [], []
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, **pool_options) as executor:
+            futures = {executor.submit(precompute_symbol, symbol, periods, as_of): symbol for symbol in pending}
+            for count, future in enumerate(as_completed(futures), 1):
+                symbol = futures[future]
+                try:
+                    details = future.result()
+                    checkpoint.record(symbol, 'ok', **details)
+                    if details['refetched']:
+                        refetched.append(symbol)
+                    for period, error in details['period_errors'].items():
+                        logger.warning("%s %s not precomputed: %s", symbol, period, error)
+                except Exception as e:
+                    checkpoint.record(symbol, 'error', error=f"{type(e).__name__}: {e}")
+                    failed.append(symbol)
+                    logger.warning("%s failed: %s", symbol, e)
+                if count % 10 == 0 or count == len(pending):
+                    logger.info("%d/%d symbols done", count, len(pending))
+    finally:
+        checkpoint.close()
+    logger.info("Session %s finished in %.1fs: %d done, %d failed", as_of, time.perf_counter() - start,
+                len(checkpoint.done), len(failed))
+    if archive:
+        update_archive(symbols, refetched)
+    return failed
+
+
+# Function to compute the next weekday start time after now, exchange-local
+def next_run(at, now=None):
+    now = now or pd.Timestamp.now(tz=precompute_store.EXCHANGE_TZ)
+    hour, minute = (int(part) for part in at.split(':'))
+    candidate = now.normalize() + pd.Timedelta(hours=hour, minutes=minute)
+    while candidate <= now or candidate.weekday() >= 5:
+        candidate = candidate.normalize() + pd.Timedelta(days=1, hours=hour, minutes=minute)
+    return candidate
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('symbols', nargs='*', help='NSE symbols, e.g. RELIANCE TCS (default: --universe)')
+    parser.add_argument('--universe', default='NIFTY 50', choices=[u for u in screener.UNIVERSES if u != 'Custom file'])
+    parser.add_argument('--symbols-file', default=None, help="CSV with a 'Symbol' column or one symbol per line")
+    parser.add_argument('--periods', nargs='+', default=['1y'], choices=precompute_store.PERIODS,
+                        help='app time periods to precompute (default 1y)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='worker processes (default: CPU count)')
+    parser.add_argument('--max-tasks-per-child', type=int, default=None,
+                        help='recycle each worker after this many symbols to bound its memory')
+    parser.add_argument('--fresh', action='store_true', help="ignore this session's checkpoint and redo every symbol")
+    parser.add_argument('--daemon', action='store_true', help='stay running and start a run every weekday at --at')
+    parser.add_argument('--at', default=RUN_AT, help=f'daemon start time, HH:MM exchange-local (default {RUN_AT})')
+    parser.add_argument('--archive', action='store_true', help='append the refreshed bars to ohlcv_archive')
+    parser.add_argument('--log-level', default='INFO')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper(), format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    if args.symbols:
+        symbols = [symbol.strip().upper() for symbol in args.symbols]
+    elif args.symbols_file:
+        symbols = screener.load_universe('Custom file', args.symbols_file)
+    else:
+        symbols = screener.load_universe(args.universe)
+
+    options = {'workers': args.workers, 'max_tasks_per_child': args.max_tasks_per_child, 'archive': args.archive}
+    if not args.daemon:
+        return 1 if run(symbols, args.periods, fresh=args.fresh, **options) else 0
+
+    # A daemon started after close first catches up on the session it missed
+    run(symbols, args.periods, fresh=args.fresh, **options)
+    while True:
+        start_at = next_run(args.at)
+        logger.info("Next run at %s", start_at)
+        time.sleep(max(0.0, (start_at - pd.Timestamp.now(tz=precompute_store.EXCHANGE_TZ)).total_seconds()))
+        run(symbols, args.periods, **options)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import analysis_result
+import stock_data
+import stock_functions
+
+# NIFTY 50 constituents (NSE symbols without the .NS suffix)
+NIFTY_50 = [
+    'ADANIENT', 'ADANIPORTS', 'APOLLOHOSP', 'ASIANPAINT', 'AXISBANK', 'BAJAJ-AUTO', 'BAJFINANCE',
+    'BAJAJFINSV', 'BEL', 'BHARTIARTL', 'BRITANNIA', 'CIPLA', 'COALINDIA', 'DRREDDY', 'EICHERMOT',
+    'GRASIM', 'HCLTECH', 'HDFCBANK', 'HDFCLIFE', 'HEROMOTOCO', 'HINDALCO', 'HINDUNILVR', 'ICICIBANK',
+    'INDUSINDBK', 'INFY', 'ITC', 'JSWSTEEL', 'KOTAKBANK', 'LT', 'LTIM', 'M&M', 'MARUTI', 'NESTLEIND',
+    'NTPC', 'ONGC', 'POWERGRID', 'RELIANCE', 'SBILIFE', 'SBIN', 'SHRIRAMFIN', 'SUNPHARMA',
+    'TATACONSUM', 'TATAMOTORS', 'TATASTEEL', 'TCS', 'TECHM', 'TITAN', 'TRENT', 'ULTRACEMCO', 'WIPRO',
+]
+
+# Constituent lists published by NSE for the broader indices
+NSE_INDEX_LISTS = {
+    'NIFTY 200': 'https://archives.nseindia.com/content/indices/ind_nifty200list.csv',
+    'NIFTY 500': 'https://archives.nseindia.com/content/indices/ind_nifty500list.csv',
+}
+
+UNIVERSES = ['NIFTY 50', 'NIFTY 200', 'NIFTY 500', 'Custom file']
+
+
+# Function to convert an NSE symbol into its Yahoo Finance ticker
+def to_nse_ticker(symbol):
+    symbol = symbol.strip().upper()
+    if not symbol.endswith('.NS'):
+        return symbol + '.NS'
+    return symbol
+
+
+# Function to read symbols from a CSV with a 'Symbol' column or a plain one-per-line list
+def read_symbol_file(path_or_buffer):
+    symbols = pd.read_csv(path_or_buffer, header=None, dtype=str)
+    header = [str(c).strip() for c in symbols.iloc[0]]
+    if 'Symbol' in header:
+        column = symbols.iloc[1:, header.index('Symbol')]
+    else:
+        column = symbols.iloc[:, 0]
+    return [s.strip().upper() for s in column.dropna() if s.strip()]
+
+
+# Function to resolve a universe name (or custom file) into a list of symbols
+def load_universe(name, path_or_buffer=None):
+    if name == 'NIFTY 50':
+        return list(NIFTY_50)
+    if name in NSE_INDEX_LISTS:
+        return read_symbol_file(NSE_INDEX_LISTS[name])
+    if path_or_buffer is None:
+        raise ValueError(f"Universe '{name}' requires a symbol file")
+    return read_symbol_file(path_or_buffer)
+
+
+# Function to run the analysis criteria for one symbol and keep only last-bar values;
+# to_record picks the output shape and history_dir, if set, receives the indicator frame as Parquet
+def screen_symbol(symbol, time_period, to_record=analysis_result.to_row, history_dir=None):
+    ticker = to_nse_ticker(symbol)
+    stock_info = stock_data.fetch_stock_info(ticker)
+    historical_data = stock_data.fetch_historical_data(ticker, time_period)
+    if historical_data is None or historical_data.empty:
+        return None
+
+    historical_data = stock_functions.calculate_indicators(historical_data)
+    if history_dir is not None:
+        historical_data.to_parquet(os.path.join(history_dir, f"{symbol}.parquet"))
+    result = stock_functions.compute_analysis(symbol, stock_info, historical_data)
+    return to_record(result)
+
+
+# Function executed in a worker process for one chunk of symbols
+def screen_chunk(symbols, time_period, to_record=analysis_result.to_row, history_dir=None):
+    rows, errors = [], []
+    for symbol in symbols:
+        try:
+            row = screen_symbol(symbol, time_period, to_record, history_dir)
+        except Exception as e:
+            errors.append((symbol, str(e)))
+            continue
+        if row is None:
+            errors.append((symbol, 'no price history'))
+        else:
+            rows.append(row)
+    return rows, errors
+
+
+# Function to split the universe into chunks of at most chunk_size symbols
+def chunk_symbols(symbols, chunk_size):
+    chunk_size = max(1, int(chunk_size))
+    return [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
+
+
+# Generator that screens the universe across worker processes, yielding each chunk as it completes;
+# max_tasks_per_child recycles workers after that many chunks to cap their memory on long runs
+def screen_universe(symbols, time_period, workers=None, chunk_size=10, to_record=analysis_result.to_row,
+                    history_dir=None, max_tasks_per_child=None):
+    workers = workers or os.cpu_count() or 1
+    chunks = chunk_symbols(symbols, chunk_size)
+    pool_options = {}
+    if max_tasks_per_child:
+        # Worker recycling is not available with fork, the Linux default
+        pool_options = {'max_tasks_per_child': max_tasks_per_child, 'mp_context': multiprocessing.get_context('spawn')}
+    with ProcessPoolExecutor(max_workers=workers, **pool_options) as executor:
+        futures = [executor.submit(screen_chunk, chunk, time_period, to_record, history_dir) for chunk in chunks]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,156 @@
+import argparse
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from peewee import CharField, FloatField, Model, SqliteDatabase
+
+import metrics
+from instrumentation import span, traced
+
+# On-disk store of scores keyed by content hash, shared by the app and backfill jobs
+SENTIMENT_DB_PATH = os.getenv('SENTIMENT_DB', os.path.join('data', 'sentiment.db'))
+BATCH_SIZE = 500
+# Below this many unscored texts a process pool costs more than it saves
+PARALLEL_THRESHOLD = 2000
+SQLITE_MAX_VARIABLES = 500
+
+database = SqliteDatabase(None)
+
+
+class SentimentScore(Model):
+    content_hash = CharField(primary_key=True, max_length=40)
+    polarity = FloatField()
+
+    class Meta:
+        database = database
+        table_name = 'sentiment_scores'
+
+
+_db_lock = threading.Lock()
+_db_ready = False
+
+
+# Function to open the score store on first use
+def init_store(path=None):
+    global _db_ready
+    with _db_lock:
+        if _db_ready and path is None:
+            return
+        path = path or SENTIMENT_DB_PATH
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        database.init(path, pragmas={'journal_mode': 'wal', 'synchronous': 'normal'})
+        database.create_tables([SentimentScore], safe=True)
+        _db_ready = True
+
+
+# Function to hash a text together with the scorer that produced its score
+def content_hash(text, scorer='textblob'):
+    return hashlib.sha1(f"{scorer}\0{text}".encode('utf-8')).hexdigest()
+
+
+# Function to score a batch of texts with TextBlob polarity
+def textblob_polarities(texts):
+    from textblob import TextBlob
+
+    return [TextBlob(text).sentiment.polarity for text in texts]
+
+
+# Function to score a batch of texts with the vectorized lexicon fast path
+def lexicon_polarities(texts):
+    import lexicon_sentiment
+
+    return lexicon_sentiment.polarities(texts)
+
+
+SCORERS = {
+    'textblob': textblob_polarities,
+    'lexicon': lexicon_polarities,
+}
+
+
+# Function executed in a worker process for one batch of texts
+def score_batch(texts, scorer='textblob'):
+    return SCORERS[scorer](texts)
+
+
+# Function to read stored scores for a list of hashes
+def load_scores(hashes):
+    init_store()
+    scores = {}
+    for start in range(0, len(hashes), SQLITE_MAX_VARIABLES):
+        chunk = hashes[start:start + SQLITE_MAX_VARIABLES]
+        query = SentimentScore.select().where(SentimentScore.content_hash.in_(chunk))
+        scores.update((row.content_hash, row.polarity) for row in query)
+    return scores
+
+
+# Function to persist newly computed scores
+def save_scores(scores):
+    init_store()
+    rows = [{'content_hash': h, 'polarity': p} for h, p in scores.items()]
+    with database.atomic():
+        for start in range(0, len(rows), SQLITE_MAX_VARIABLES // 2):
+            SentimentScore.insert_many(rows[start:start + SQLITE_MAX_VARIABLES // 2]).on_conflict_replace().execute()
+
+
+# Function to score texts, reusing stored scores and fanning misses out across processes
+@traced('sentiment.score_texts')
+def score_texts(texts, scorer='textblob', workers=None, batch_size=BATCH_SIZE):
+    hashes = [content_hash(text, scorer) for text in texts]
+    scores = load_scores(list(set(hashes)))
+
+    missing = {}
+    for h, text in zip(hashes, texts):
+        if h not in scores:
+            missing.setdefault(h, text)
+    metrics.SENTIMENT_TEXTS.inc(len(hashes) - sum(h in missing for h in hashes), scorer=scorer, source='stored')
+
+    if missing:
+        missing_hashes = list(missing)
+        missing_texts = [missing[h] for h in missing_hashes]
+        batches = [missing_texts[i:i + batch_size] for i in range(0, len(missing_texts), batch_size)]
+        workers = workers or os.cpu_count() or 1
+        metrics.SENTIMENT_TEXTS.inc(len(missing_texts), scorer=scorer, source='scored')
+        with span('sentiment.score_missing', texts=len(missing_texts)), metrics.SENTIMENT_SECONDS.time(scorer=scorer):
+            if workers > 1 and len(missing_texts) >= PARALLEL_THRESHOLD:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(score_batch, batches, [scorer] * len(batches)))
+            else:
+                results = [score_batch(batch, scorer) for batch in batches]
+        new_scores = dict(zip(missing_hashes, (p for batch in results for p in batch)))
+        save_scores(new_scores)
+        scores.update(new_scores)
+
+    return [scores[h] for h in hashes]
+
+
+# Function to average polarity scores, 0 when there is nothing to score
+def average_sentiment(scores):
+    return sum(scores) / len(scores) if scores else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill sentiment scores for a file of headlines (one per line).")
+    parser.add_argument('input', help='text file with one headline per line')
+    parser.add_argument('--scorer', default='textblob', choices=sorted(SCORERS))
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--db', default=None, help=f'score store path (default {SENTIMENT_DB_PATH})')
+    args = parser.parse_args()
+
+    init_store(args.db)
+    with open(args.input, encoding='utf-8') as f:
+        texts = [line.strip() for line in f if line.strip()]
+
+    start = time.perf_counter()
+    scores = score_texts(texts, scorer=args.scorer, workers=args.workers, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - start
+    print(f"Scored {len(scores)} headlines in {elapsed:.1f}s ({len(scores) / max(elapsed, 1e-9):.0f}/s), "
+          f"average polarity {average_sentiment(scores):.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+# Sidebar interval -> (bucket frequency, decay half-life); buckets are labelled by their end
+INTERVALS = {
+    '1m': ('1min', '15min'),
+    '5m': ('5min', '1h'),
+    '15m': ('15min', '2h'),
+    '1h': ('1h', '6h'),
+    '1D': ('1D', '3D'),
+    '1W': ('W-MON', '14D'),
+    '1M': ('MS', '60D'),
+}
+EXCHANGE_TZ = 'Asia/Kolkata'
+# Daily and coarser bars end with an NSE session close; their news is bucketed per session, from
+# one close to the next, so a headline after the close counts toward the next session
+SESSION_INTERVALS = ('1D', '1W', '1M')
+MARKET_CLOSE = pd.Timedelta(hours=15, minutes=30)
+SENTIMENT_COLUMNS = ['Sentiment', 'Sentiment_Decayed', 'Article_Count']
+
+
+# Function to look up the bucket frequency and half-life for a sidebar interval
+def interval_settings(time_interval):
+    return INTERVALS.get(time_interval, INTERVALS['1D'])
+
+
+# Function to bucket scored articles into per-interval sums and counts, optionally per ticker; with
+# session_close, daily buckets run from one close to the next and are labelled by the closing time
+def bucket_sentiment(history, freq='1D', tz=EXCHANGE_TZ, session_close=None):
+    # Day and week buckets follow the exchange calendar, so bucket in exchange local time
+    published = pd.to_datetime(history['published_at'], utc=True).dt.tz_convert(tz)
+    if session_close is not None:
+        published = published - session_close
+    frame = history.assign(published_at=published)
+    keys = [pd.Grouper(key='published_at', freq=freq, closed='left', label='right')]
+    if 'ticker' in frame:
+        keys.insert(0, 'ticker')
+    buckets = frame.groupby(keys)['polarity'].agg(['sum', 'count'])
+    buckets = buckets[buckets['count'] > 0].rename_axis(index={'published_at': 'bucket_end'}).reset_index()
+    if session_close is not None:
+        buckets['bucket_end'] = buckets['bucket_end'] + session_close
+    return buckets
+
+
+# Function to add the bucket mean and an exponentially time-decayed mean of article polarity
+def decay_weighted(buckets, half_life='3D'):
+    half_life = pd.Timedelta(half_life)
+    # ewm over irregular bucket times weights every article by 0.5 ** (age / half_life), so the
+    # ratio of the decayed polarity sum to the decayed article count is the decayed mean
+    parts = []
+    groups = buckets.groupby('ticker', sort=False) if 'ticker' in buckets else [(None, buckets)]
+    for _, group in groups:
+        times = pd.DatetimeIndex(group['bucket_end'])
+        decayed_sum = group['sum'].ewm(halflife=half_life, times=times).mean()
+        decayed_count = group['count'].ewm(halflife=half_life, times=times).mean()
+        parts.append(decayed_sum / decayed_count)
+    return buckets.assign(
+        Sentiment=buckets['sum'] / buckets['count'],
+        Sentiment_Decayed=pd.concat(parts) if parts else pd.Series(dtype=float),
+        Article_Count=buckets['count'],
+    ).drop(columns=['sum', 'count'])
+
+
+# Function to build the sentiment series for scored articles at a sidebar interval
+def sentiment_series(history, time_interval='1D', half_life=None, tz=EXCHANGE_TZ):
+    freq, default_half_life = interval_settings(time_interval)
+    if history.empty:
+        keys = ['ticker', 'bucket_end'] if 'ticker' in history else ['bucket_end']
+        return pd.DataFrame(columns=keys + SENTIMENT_COLUMNS)
+    if time_interval in SESSION_INTERVALS:
+        buckets = bucket_sentiment(history, '1D', tz, MARKET_CLOSE)
+    else:
+        buckets = bucket_sentiment(history, freq, tz)
+    return decay_weighted(buckets, half_life or default_half_life)
+
+
+# Function to infer the sidebar interval matching the spacing of a bar index
+def infer_interval(index):
+    spacing = pd.Series(index).diff().dropna()
+    spacing = spacing[spacing > pd.Timedelta(0)]
+    if spacing.empty:
+        return '1D'
+    step = spacing.min()
+    nominal = {'1m': '1min', '5m': '5min', '15m': '15min', '1h': '1h', '1D': '1D', '1W': '7D', '1M': '28D'}
+    return min(nominal, key=lambda interval: abs(pd.Timedelta(nominal[interval]) - step))
+
+
+# Function to compute when each bar closes, the time its sentiment must already be known by:
+# the session close of the bar's last weekday for daily and coarser bars, the bar's end otherwise
+def bar_ends(index, time_interval='1D'):
+    freq, _ = interval_settings(time_interval)
+    if time_interval not in SESSION_INTERVALS:
+        return index + pd.tseries.frequencies.to_offset(freq)
+    last_day = index.normalize()
+    if time_interval != '1D':
+        last_day = last_day + pd.tseries.frequencies.to_offset(freq) - pd.Timedelta(days=1)
+    last_day = last_day - pd.to_timedelta(np.maximum(last_day.weekday - 4, 0), unit='D')
+    return last_day + MARKET_CLOSE
+
+
+# Function to as-of join the sentiment series onto an indicator frame by bar close time
+def merge_sentiment(df, series, time_interval=None, by=None, tolerance=None):
+    # Every bucket counts toward the first bar closing at or after it, so weekend and after-hours
+    # news lands on the next session. Sentiment and Article_Count cover the buckets of that bar
+    # only; Sentiment_Decayed is the latest decayed value known at the bar's close.
+    time_interval = time_interval or infer_interval(df.index)
+    keys = [by] if by else []
+    index_name = df.index.name or 'index'
+    tz = df.index.tz or EXCHANGE_TZ
+    index = df.index if df.index.tz is not None else df.index.tz_localize(tz)
+    bars = df.drop(columns=SENTIMENT_COLUMNS, errors='ignore').reset_index()
+    bars['_bar_end'] = bar_ends(index, time_interval)
+    bars['_row'] = np.arange(len(bars))
+    bars = bars.sort_values('_bar_end', kind='stable')
+    right = series.assign(bucket_end=pd.to_datetime(series['bucket_end'], utc=True).dt.tz_convert(tz))
+    right = right.astype({'bucket_end': bars['_bar_end'].dtype}).sort_values('bucket_end')
+
+    assigned = pd.merge_asof(right, bars[keys + ['_bar_end', '_row']], left_on='bucket_end', right_on='_bar_end',
+                             by=by, direction='forward').dropna(subset=['_row'])
+    counts = assigned.groupby('_row')['Article_Count'].sum()
+    totals = (assigned['Sentiment'] * assigned['Article_Count']).groupby(assigned['_row']).sum()
+
+    merged = pd.merge_asof(bars, right[keys + ['bucket_end', 'Sentiment_Decayed']], left_on='_bar_end',
+                           right_on='bucket_end', by=by, direction='backward', tolerance=tolerance)
+    merged = merged.sort_values('_row')
+    rows = merged['_row'].to_numpy()
+    article_count = counts.reindex(rows, fill_value=0).to_numpy()
+    merged['Sentiment'] = np.where(article_count > 0, totals.reindex(rows).to_numpy() / np.maximum(article_count, 1),
+                                   np.nan)
+    merged['Article_Count'] = article_count.astype(int)
+    columns = [column for column in df.columns if column not in SENTIMENT_COLUMNS] + SENTIMENT_COLUMNS
+    return merged.set_index(index_name).rename_axis(df.index.name)[columns]
+
+
+# Function to load and bucket the stored headlines of many tickers as one long frame
+def universe_series(tickers, time_interval='1D', scorer='textblob', half_life=None):
+    import news_store
+
+    histories = [news_store.sentiment_history(ticker, scorer=scorer).assign(ticker=ticker) for ticker in tickers]
+    history = pd.concat(histories, ignore_index=True) if histories else \
+        pd.DataFrame(columns=['published_at', 'title', 'source', 'polarity', 'ticker'])
+    return sentiment_series(history, time_interval, half_life)
@@ -0,0 +1,385 @@
+"""HTTP JSON service exposing history, indicators, analysis and news per ticker.
+
+One process holds a warm cache shared by every caller, fetches on a bounded thread pool, computes
+indicators on a bounded process pool and streams large histories. Run from the repository root:
+
+    python service.py --port 8765 --io-workers 8 --cpu-workers 2 --warm-universe "NIFTY 50"
+
+With --shared-ohlcv, histories reach the indicator workers through shared_ohlcv segments that the
+workers map, instead of being pickled to each worker.
+
+Endpoints (symbol is an NSE symbol, e.g. RELIANCE; period defaults to 1y):
+
+    GET /v1/tickers/<symbol>/history?period=1y[&format=ndjson]
+    GET /v1/tickers/<symbol>/indicators?period=1y[&columns=RSI,MACD][&format=ndjson]
+    GET /v1/tickers/<symbol>/analysis?period=1y
+    GET /v1/tickers/<symbol>/news[?limit=20]
+    GET /health
+    GET /stats
+    GET /metrics  (Prometheus text format)
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import tornado.ioloop
+import tornado.web
+from cachetools import TTLCache
+
+import analysis_result
+import metrics
+import screener
+import stock_data
+import stock_functions
+
+DEFAULT_PORT = int(os.getenv('ANALYZER_SERVICE_PORT', '8765'))
+CACHE_TTL_SECONDS = 15 * 60
+CACHE_MAX_ENTRIES = 1024
+# Rows per streamed chunk; each chunk is flushed to the socket before the next is serialized
+STREAM_CHUNK_ROWS = 500
+# Recent request durations kept per route for the percentile counters
+LATENCY_WINDOW = 2048
+PERIODS = {'1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'max'}
+
+logger = logging.getLogger('service')
+
+
+class SharedCache:
+    """Process-wide TTL cache that also shares in-flight loads, so concurrent requests for the
+    same key trigger one fetch. Used only from the IOLoop thread, so it needs no lock."""
+
+    def __init__(self, maxsize=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS):
+        self.values = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.pending = {}
+        self.hits = 0
+        self.misses = 0
+        # Requests that joined a load already in flight instead of starting their own
+        self.shared = 0
+
+    async def get(self, key, load):
+        if key in self.values:
+            self.hits += 1
+            metrics.cache_lookup('service', hit=True)
+            return self.values[key]
+        metrics.cache_lookup('service', hit=False)
+        pending = self.pending.get(key)
+        if pending is None:
+            self.misses += 1
+            pending = asyncio.ensure_future(load())
+            self.pending[key] = pending
+            pending.add_done_callback(lambda future: self._store(key, future))
+        else:
+            self.shared += 1
+        return await pending
+
+    def _store(self, key, future):
+        self.pending.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self.values[key] = future.result()
+
+
+class LatencyCounters:
+    """Per-route request counts, error counts and a rolling window of durations."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self.durations = {}
+        self.counts = {}
+        self.errors = {}
+        self.lock = threading.Lock()
+
+    def record(self, route, seconds, status):
+        with self.lock:
+            self.durations.setdefault(route, deque(maxlen=self.window)).append(seconds)
+            self.counts[route] = self.counts.get(route, 0) + 1
+            if status >= 500:
+                self.errors[route] = self.errors.get(route, 0) + 1
+
+    def summary(self):
+        with self.lock:
+            snapshot = {route: np.array(durations) for route, durations in self.durations.items()}
+            counts, errors = dict(self.counts), dict(self.errors)
+        return {
+            route: {
+                'count': counts[route],
+                'errors': errors.get(route, 0),
+                'p50_ms': round(float(np.percentile(values, 50)) * 1000, 2),
+                'p99_ms': round(float(np.percentile(values, 99)) * 1000, 2),
+                'max_ms': round(float(values.max()) * 1000, 2),
+            }
+            for route, values in snapshot.items()
+        }
+
+
+# Function run in a pool worker: map a published history and compute the indicator frame over it
+def indicators_from_segment(name):
+    import shared_ohlcv
+
+    history = shared_ohlcv.attach_frame(name)
+    if history is None:
+        raise LookupError(f"Shared history {name} is no longer published")
+    return stock_functions.calculate_indicators(history)
+
+
+class Analyzer:
+    """Loads and caches the per-ticker data behind every endpoint."""
+
+    def __init__(self, io_workers=8, cpu_workers=2, cache_ttl=CACHE_TTL_SECONDS, shared_ohlcv=False):
+        self.io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix='service-io')
+        self.cpu_pool = ProcessPoolExecutor(max_workers=cpu_workers)
+        self.cache = SharedCache(ttl=cache_ttl)
+        self.io_workers = io_workers
+        self.cpu_workers = cpu_workers
+        self.cache_ttl = cache_ttl
+        self.shared_ohlcv = shared_ohlcv
+
+    async def _io(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.io_pool, fn, *args)
+
+    async def _cpu(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.cpu_pool, fn, *args)
+
+    async def info(self, ticker):
+        return await self.cache.get(('info', ticker), lambda: self._io(stock_data.fetch_stock_info, ticker))
+
+    async def history(self, ticker, period):
+        return await self.cache.get(('history', ticker, period),
+                                    lambda: self._io(stock_data.fetch_historical_data, ticker, period))
+
+    async def indicators(self, ticker, period):
+        async def load():
+            history = await self.history(ticker, period)
+            if history is None or history.empty:
+                raise LookupError(f"No price history for {ticker}")
+            if self.shared_ohlcv:
+                import shared_ohlcv
+
+                name = await self._io(shared_ohlcv.publish, ('service', ticker, period), history, self.cache_ttl)
+                return await self._cpu(indicators_from_segment, name)
+            return await self._cpu(stock_functions.calculate_indicators, history)
+        return await self.cache.get(('indicators', ticker, period), load)
+
+    async def analysis(self, ticker, period):
+        async def load():
+            info, frame = await asyncio.gather(self.info(ticker), self.indicators(ticker, period))
+            return stock_functions.compute_analysis(ticker, info, frame)
+        return await self.cache.get(('analysis', ticker, period), load)
+
+    async def news(self, ticker, limit):
+        import news_store
+
+        api_key = os.getenv('api_key')
+        if api_key:
+            import symbol_master
+            from newsapi import NewsApiClient
+
+            matcher = symbol_master.default_matcher()
+            known = matcher.knows(ticker)
+            query = matcher.news_query(ticker) if known else ticker.removesuffix('.NS')
+            tagger = matcher.article_tickers if known else None
+            return await self._io(lambda: news_store.refresh_ticker(NewsApiClient(api_key=api_key), ticker, query,
+                                                                    limit=limit, tagger=tagger))
+        return await self._io(news_store.ticker_articles, ticker, limit)
+
+    def shutdown(self):
+        self.io_pool.shutdown(wait=False, cancel_futures=True)
+        self.cpu_pool.shutdown(wait=False, cancel_futures=True)
+
+
+class BaseHandler(tornado.web.RequestHandler):
+    route = 'other'
+
+    def initialize(self, analyzer, counters):
+        self.analyzer = analyzer
+        self.counters = counters
+
+    def set_default_headers(self):
+        self.set_header('Content-Type', 'application/json; charset=utf-8')
+
+    def on_finish(self):
+        self.counters.record(self.route, self.request.request_time(), self.get_status())
+
+    def write_error(self, status_code, **kwargs):
+        error = kwargs.get('exc_info', (None, None))[1]
+        message = error.log_message if isinstance(error, tornado.web.HTTPError) and error.log_message else \
+            str(error) if error is not None else self._reason
+        self.finish(json.dumps({'error': message}))
+
+    def ticker_and_period(self, symbol):
+        period = self.get_argument('period', '1y')
+        if period not in PERIODS:
+            raise tornado.web.HTTPError(400, f"period must be one of {sorted(PERIODS)}")
+        return screener.to_nse_ticker(symbol), period
+
+    def positive_int(self, name, default):
+        value = self.get_argument(name, str(default))
+        try:
+            number = int(value)
+        except ValueError:
+            number = 0
+        if number < 1:
+            raise tornado.web.HTTPError(400, f"{name} must be a positive integer, got {value!r}")
+        return number
+
+    async def load(self, coroutine):
+        try:
+            return await coroutine
+        except LookupError as e:
+            raise tornado.web.HTTPError(404, str(e))
+        except tornado.web.HTTPError:
+            raise
+        except Exception as e:
+            logger.exception("Upstream failure for %s", self.request.path)
+            raise tornado.web.HTTPError(502, f"{type(e).__name__}: {e}")
+
+    async def stream_frame(self, frame):
+        # Large frames go out in flushed chunks, as a JSON array or one JSON object per line
+        ndjson = self.get_argument('format', 'json') == 'ndjson'
+        if ndjson:
+            self.set_header('Content-Type', 'application/x-ndjson')
+        frame = frame.reset_index()
+        self.write('' if ndjson else '[')
+        for start in range(0, len(frame), STREAM_CHUNK_ROWS):
+            chunk = frame.iloc[start:start + STREAM_CHUNK_ROWS]
+            if ndjson:
+                self.write(chunk.to_json(orient='records', lines=True, date_format='iso').rstrip('\n') + '\n')
+            else:
+                self.write((',' if start else '') + chunk.to_json(orient='records', date_format='iso')[1:-1])
+            await self.flush()
+        self.finish('' if ndjson else ']')
+
+
+class HistoryHandler(BaseHandler):
+    route = 'history'
+
+    async def get(self, symbol):
+        ticker, period = self.ticker_and_period(symbol)
+        history = await self.load(self.analyzer.history(ticker, period))
+        if history is None or history.empty:
+            raise tornado.web.HTTPError(404, f"No price history for {ticker}")
+        await self.stream_frame(history)
+
+
+class IndicatorsHandler(BaseHandler):
+    route = 'indicators'
+
+    async def get(self, symbol):
+        ticker, period = self.ticker_and_period(symbol)
+        frame = await self.load(self.analyzer.indicators(ticker, period))
+        columns = [c for c in self.get_argument('columns', '').split(',') if c]
+        unknown = [c for c in columns if c not in frame.columns]
+        if unknown:
+            raise tornado.web.HTTPError(400, f"Unknown columns: {', '.join(unknown)}")
+        await self.stream_frame(frame[columns] if columns else frame)
+
+
+class AnalysisHandler(BaseHandler):
+    route = 'analysis'
+
+    async def get(self, symbol):
+        ticker, period = self.ticker_and_period(symbol)
+        result = await self.load(self.analyzer.analysis(ticker, period))
+        self.finish(json.dumps({'result': analysis_result.to_dict(result),
+                                'markdown': analysis_result.render_markdown(result)}))
+
+
+class NewsHandler(BaseHandler):
+    route = 'news'
+
+    async def get(self, symbol):
+        ticker = screener.to_nse_ticker(symbol)
+        limit = self.positive_int('limit', 20)
+        articles = await self.load(self.analyzer.news(ticker, limit))
+        self.finish(json.dumps({'ticker': ticker, 'articles': articles}))
+
+
+class HealthHandler(BaseHandler):
+    route = 'health'
+
+    def get(self):
+        self.finish(json.dumps({'status': 'ok'}))
+
+
+class MetricsHandler(BaseHandler):
+    route = 'metrics'
+
+    def get(self):
+        self.set_header('Content-Type', metrics.CONTENT_TYPE)
+        self.finish(metrics.REGISTRY.render())
+
+
+class StatsHandler(BaseHandler):
+    route = 'stats'
+
+    def get(self):
+        cache = self.analyzer.cache
+        self.finish(json.dumps({
+            'latency': self.counters.summary(),
+            'cache': {'entries': len(cache.values), 'in_flight': len(cache.pending),
+                      'hits': cache.hits, 'misses': cache.misses, 'shared': cache.shared},
+            'pools': {'io_workers': self.analyzer.io_workers, 'cpu_workers': self.analyzer.cpu_workers},
+        }))
+
+
+# Function to build the tornado application around one shared analyzer
+def make_app(analyzer, counters=None):
+    options = {'analyzer': analyzer, 'counters': counters or LatencyCounters()}
+    symbol = r'([A-Za-z0-9&\-\.]+)'
+    return tornado.web.Application([
+        (rf'/v1/tickers/{symbol}/history', HistoryHandler, options),
+        (rf'/v1/tickers/{symbol}/indicators', IndicatorsHandler, options),
+        (rf'/v1/tickers/{symbol}/analysis', AnalysisHandler, options),
+        (rf'/v1/tickers/{symbol}/news', NewsHandler, options),
+        (r'/health', HealthHandler, options),
+        (r'/stats', StatsHandler, options),
+        (r'/metrics', MetricsHandler, options),
+    ])
+
+
+# Function to preload analyses for a universe so the first callers hit a warm cache
+async def warm(analyzer, symbols, period):
+    start = time.perf_counter()
+    results = await asyncio.gather(*(analyzer.analysis(screener.to_nse_ticker(s), period) for s in symbols),
+                                   return_exceptions=True)
+    failed = sum(isinstance(r, Exception) for r in results)
+    logger.info("Warmed %d symbols in %.1fs, %d failed", len(symbols) - failed, time.perf_counter() - start, failed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--io-workers', type=int, default=8, help='threads for price, info and news fetches')
+    parser.add_argument('--cpu-workers', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help='processes for indicator computation')
+    parser.add_argument('--cache-ttl', type=int, default=CACHE_TTL_SECONDS, help='seconds a cached value is served')
+    parser.add_argument('--warm-universe', default=None, choices=[u for u in screener.UNIVERSES if u != 'Custom file'])
+    parser.add_argument('--warm-period', default='1y')
+    parser.add_argument('--shared-ohlcv', action='store_true',
+                        help='hand histories to the indicator workers through shared memory')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    # The NewsAPI key is read from .env, as the Streamlit app does when it has no secrets file
+    from dotenv import load_dotenv
+    load_dotenv()
+    analyzer = Analyzer(args.io_workers, args.cpu_workers, args.cache_ttl, args.shared_ohlcv)
+    make_app(analyzer).listen(args.port)
+    logger.info("Listening on http://127.0.0.1:%d", args.port)
+    loop = tornado.ioloop.IOLoop.current()
+    if args.warm_universe:
+        loop.spawn_callback(warm, analyzer, screener.load_universe(args.warm_universe), args.warm_period)
+    try:
+        loop.start()
+    finally:
+        analyzer.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+import io
+
+import requests
+
+REQUEST_TIMEOUT = 30
+EXCHANGE_TZ = 'Asia/Kolkata'
+
+_session = requests.Session()
+
+
+def _get(base_url, path, **params):
+    response = _session.get(f"{base_url.rstrip('/')}{path}", params=params, timeout=REQUEST_TIMEOUT)
+    if not response.ok:
+        try:
+            message = response.json()['error']
+        except (ValueError, KeyError):
+            message = response.reason
+        raise RuntimeError(f"Analyzer service returned {response.status_code}: {message}")
+    return response
+
+
+# Function to read a streamed frame back into a DataFrame indexed by exchange-local timestamps; the
+# service streams the index as each record's first field, 'Date' for daily bars and 'Datetime' intraday
+def _read_frame(response):
+    import pandas as pd
+
+    frame = pd.read_json(io.StringIO(response.text), orient='records', lines=True, convert_dates=False)
+    if frame.empty:
+        return frame
+    index = frame.columns[0]
+    frame[index] = pd.to_datetime(frame[index], utc=True).dt.tz_convert(EXCHANGE_TZ)
+    return frame.set_index(index)
+
+
+# Function to fetch the OHLCV history for a ticker
+def history(base_url, ticker, period='1y'):
+    return _read_frame(_get(base_url, f"/v1/tickers/{ticker}/history", period=period, format='ndjson'))
+
+
+# Function to fetch the price frame with every indicator column, optionally only some columns
+def indicators(base_url, ticker, period='1y', columns=None):
+    params = {'period': period, 'format': 'ndjson'}
+    if columns:
+        params['columns'] = ','.join(columns)
+    return _read_frame(_get(base_url, f"/v1/tickers/{ticker}/indicators", **params))
+
+
+# Function to fetch the analysis as a dict with 'result' (plain values) and 'markdown' (the report)
+def analysis(base_url, ticker, period='1y'):
+    return _get(base_url, f"/v1/tickers/{ticker}/analysis", period=period).json()
+
+
+# Function to fetch the stored (and, when the service has a NewsAPI key, refreshed) articles
+def news(base_url, ticker, limit=20):
+    return _get(base_url, f"/v1/tickers/{ticker}/news", limit=limit).json()['articles']
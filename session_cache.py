@@ -0,0 +1,180 @@
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from datetime import date
+
+import streamlit as st
+
+import memory_accounting
+import metrics
+
+# Number of analysed input combinations kept per browser session
+MAX_SESSION_ENTRIES = 5
+# Session state keys owned by this module; widget values live alongside them and are left alone
+STATE_KEYS = ('analysis_cache', 'active_analysis')
+# Bytes of cached frames, figures and articles the whole server process may hold across sessions;
+# above it the least recently used entries of any session are dropped and recomputed on next use
+MEMORY_BUDGET_BYTES = int(float(os.getenv('SESSION_MEMORY_BUDGET_MB', '1024')) * 2 ** 20)
+
+# Process-wide ledger of every session's entries, least recently used first:
+# (session id, key) -> {'entries': weak ref to the session's OrderedDict, 'sizes': {name: bytes}}
+_ledger = OrderedDict()
+_ledger_lock = threading.Lock()
+_evictions = 0
+
+
+def _ledger_bytes():
+    return sum(sum(record['sizes'].values()) for record in _ledger.values())
+
+
+# Function to read the tracked total from the scrape thread
+def _tracked_bytes():
+    with _ledger_lock:
+        return _ledger_bytes()
+
+
+SESSION_BYTES = metrics.Gauge('analyzer_session_cache_bytes', 'Bytes held by cached analyses across sessions.',
+                              callback=_tracked_bytes)
+SESSION_EVICTIONS = metrics.Counter('analyzer_session_evictions_total',
+                                    'Cached analyses dropped to stay within the memory budget.')
+
+
+# Function to build the cache key for the current inputs; the data version rolls over daily
+def make_key(ticker, time_period, time_interval, data_version=None):
+    return ticker, time_period, time_interval, data_version or date.today().isoformat()
+
+
+def _session_id():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else 'local'
+
+
+def _entries():
+    if 'analysis_cache' not in st.session_state:
+        st.session_state['analysis_cache'] = OrderedDict()
+    return st.session_state['analysis_cache']
+
+
+# Function to mark a key as the analysis shown on every rerun
+def activate(key):
+    st.session_state['active_analysis'] = key
+
+
+# Function to check whether the current inputs match the analysis last requested
+def is_active(key):
+    return st.session_state.get('active_analysis') == key
+
+
+# Function to look up the cached frames and results for a key
+def get_entry(key):
+    entries = _entries()
+    entry = entries.get(key)
+    metrics.cache_lookup('session', hit=entry is not None)
+    if entry is None:
+        return None
+    ledger_key = (_session_id(), key)
+    # Other sessions may evict from this dict under the ledger lock
+    with _ledger_lock:
+        if key in entries:
+            entries.move_to_end(key)
+        if ledger_key in _ledger:
+            _ledger.move_to_end(ledger_key)
+    return entry
+
+
+# Function to drop ledger rows whose session is gone or whose entry the session already dropped
+def _prune():
+    for ledger_key, record in list(_ledger.items()):
+        entries = record['entries']()
+        if entries is None or ledger_key[1] not in entries:
+            del _ledger[ledger_key]
+
+
+# Function to evict least recently used entries of any session until the process is within budget;
+# the entry just stored is never the one evicted
+def _enforce_budget(keep):
+    global _evictions
+    _prune()
+    total = _ledger_bytes()
+    for ledger_key in list(_ledger):
+        if total <= MEMORY_BUDGET_BYTES:
+            break
+        if ledger_key == keep:
+            continue
+        record = _ledger.pop(ledger_key)
+        total -= sum(record['sizes'].values())
+        entries = record['entries']()
+        if entries is not None:
+            entries.pop(ledger_key[1], None)
+        _evictions += 1
+        SESSION_EVICTIONS.inc()
+
+
+# Function to store the frames and results for a key, dropping the oldest entries
+def put_entry(key, entry):
+    entries = _entries()
+    ledger_key = (_session_id(), key)
+    sizes = memory_accounting.entry_bytes(entry)
+    with _ledger_lock:
+        entries[key] = entry
+        entries.move_to_end(key)
+        while len(entries) > MAX_SESSION_ENTRIES:
+            entries.popitem(last=False)
+        _ledger[ledger_key] = {'entries': weakref.ref(entries), 'sizes': sizes}
+        _ledger.move_to_end(ledger_key)
+        _enforce_budget(ledger_key)
+    return entry
+
+
+# Function to return a value memoized inside an entry, building it on first use
+def memo(entry, name, build):
+    if name not in entry:
+        entry[name] = build()
+        shared = any(value is entry[name] for key, value in entry.items() if key != name)
+        size = 0 if shared else memory_accounting.object_bytes(entry[name])
+        with _ledger_lock:
+            for ledger_key, record in _ledger.items():
+                entries = record['entries']()
+                if entries is not None and entries.get(ledger_key[1]) is entry:
+                    record['sizes'][name] = size
+                    _enforce_budget(ledger_key)
+                    break
+    return entry[name]
+
+
+# Function to list the bytes held by each cached analysis of this session, by component
+def session_report():
+    session_id = _session_id()
+    with _ledger_lock:
+        records = [(key, dict(record['sizes'])) for (sid, key), record in _ledger.items() if sid == session_id]
+    rows = []
+    for key, sizes in records:
+        for name, size in sorted(sizes.items(), key=lambda item: -item[1]):
+            rows.append({'Analysis': ' / '.join(str(part) for part in key), 'Component': str(name), 'Bytes': size})
+    return rows
+
+
+# Function to summarise what the process holds across sessions against the budget
+def process_report():
+    with _ledger_lock:
+        _prune()
+        return {
+            'sessions': len({sid for sid, _ in _ledger}),
+            'entries': len(_ledger),
+            'tracked_bytes': _ledger_bytes(),
+            'budget_bytes': MEMORY_BUDGET_BYTES,
+            'evictions': _evictions,
+        }
+
+
+# Function to drop every cached analysis of this session, keeping the user's inputs
+def clear():
+    session_id = _session_id()
+    with _ledger_lock:
+        for ledger_key in [k for k in _ledger if k[0] == session_id]:
+            del _ledger[ledger_key]
+    for name in STATE_KEYS:
+        st.session_state.pop(name, None)
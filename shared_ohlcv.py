@@ -0,0 +1,380 @@
+"""Shared-memory OHLCV columns published once per process tree and mapped zero-copy by readers.
+
+A publisher copies a price frame into one multiprocessing.shared_memory segment: the UTC index as
+int64 nanoseconds followed by each column as a contiguous array. A small JSON record per segment
+(columns, dtypes, offsets, rows, timezone, expiry) and a pointer per key live in SHARED_OHLCV_DIR,
+so any session or pool worker on the machine can find the segment by key and wrap it as read-only
+NumPy arrays or a pandas frame whose value columns are views of the segment. Only the index is
+rebuilt per reader (pandas copies it when attaching the timezone).
+
+Each process that maps a segment holds a lease file named by its pid and start time for as long as
+any array over the segment is alive. sweep() drops leases of processes that have exited, including
+crashed readers, and unlinks segments that are expired, superseded or orphaned by an exited
+publisher once no live process leases them, as well as segments a crashed publisher left half
+written. Inspect or clean up from the command line:
+
+    python shared_ohlcv.py --list
+    python shared_ohlcv.py --sweep
+"""
+import argparse
+import hashlib
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import metrics
+
+SHARED_OHLCV_DIR = os.getenv('SHARED_OHLCV_DIR', os.path.join('data', 'shared_ohlcv'))
+# Matches the st.cache_data ttl of the price fetch it stands in for
+DEFAULT_TTL = 3600
+# Column offsets are aligned so every array starts on a cache line
+ALIGNMENT = 64
+# A process start time read back within this many seconds is the same process, not a reused pid
+START_TIME_TOLERANCE = 1.0
+
+# Segments this process created (kept open so they survive on platforms that free a segment with
+# its last handle) and segments it has mapped for readers: name -> [SharedMemory, live arrays, lease].
+# Reentrant because a release can run from garbage collection while the lock is held
+_owned = {}
+_attached = {}
+_lock = threading.RLock()
+# One publish per key at a time within the process; other sessions wait and map the result
+_publishing = {}
+
+
+def _path(*parts):
+    return os.path.join(SHARED_OHLCV_DIR, *parts)
+
+
+def _write_json(path, value):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(value, f)
+    os.replace(temporary, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# Function to name the pointer file of a key; keys are tuples of strings such as (ticker, period, day)
+def _key_id(key):
+    return hashlib.sha1(json.dumps([str(part) for part in key]).encode()).hexdigest()[:20]
+
+
+# Function to identify this process in lease files so a reused pid is not mistaken for it
+def _process_id(pid=None):
+    import psutil
+
+    pid = pid or os.getpid()
+    return pid, psutil.Process(pid).create_time()
+
+
+def _alive(pid, started):
+    import psutil
+
+    try:
+        return abs(psutil.Process(pid).create_time() - started) < START_TIME_TOLERANCE
+    except psutil.Error:
+        return False
+
+
+# Function to open or create a segment whose lifetime the registry manages rather than the resource
+# tracker, which would otherwise unlink it when the process that created or mapped it exits
+def _segment(name, create=False, size=0):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+    segment = shared_memory.SharedMemory(name=name, create=create, size=size)
+    if os.name == 'posix':
+        from multiprocessing import resource_tracker
+
+        resource_tracker.unregister(segment._name, 'shared_memory')
+    return segment
+
+
+def _aligned(size):
+    return -(-size // ALIGNMENT) * ALIGNMENT
+
+
+# Function to place the index and every column in the segment; returns the column records and size
+def _layout(frame):
+    columns, offset = [], _aligned(len(frame) * 8)
+    for name in frame.columns:
+        dtype = frame[name].dtype
+        if dtype.kind not in 'fiub':
+            raise TypeError(f"Column {name!r} has dtype {dtype}; only numeric columns can be shared")
+        columns.append({'name': str(name), 'dtype': dtype.str, 'offset': offset})
+        offset += _aligned(len(frame) * dtype.itemsize)
+    return columns, max(offset, 1)
+
+
+# Function to copy a frame into a new segment and point the key at it; returns the segment name
+def publish(key, frame, ttl=DEFAULT_TTL):
+    columns, size = _layout(frame)
+    name = f"ohlcv_{secrets.token_hex(8)}"
+    pid, started = _process_id()
+    tz = getattr(frame.index, 'tz', None)
+    record = {'name': name, 'key': [str(part) for part in key], 'rows': len(frame), 'bytes': size,
+              'columns': columns, 'tz': str(tz) if tz is not None else None, 'index_name': frame.index.name,
+              'publisher': [pid, started], 'created': time.time(), 'expires': time.time() + ttl,
+              'state': 'publishing'}
+    # The record goes down first so a publisher that dies mid-copy leaves something sweep can find
+    _write_json(_path('segments', f"{name}.json"), record)
+    try:
+        segment = _segment(name, create=True, size=size)
+    except OSError:
+        _remove(_path('segments', f"{name}.json"))
+        raise
+    with _lock:
+        _owned[name] = segment
+
+    index = (frame.index.tz_convert('UTC') if tz is not None else frame.index).as_unit('ns')
+    np.ndarray(len(frame), dtype='<i8', buffer=segment.buf)[:] = index.asi8
+    for column in columns:
+        np.ndarray(len(frame), dtype=column['dtype'], buffer=segment.buf,
+                   offset=column['offset'])[:] = frame[column['name']].to_numpy()
+
+    record['state'] = 'ready'
+    _write_json(_path('segments', f"{name}.json"), record)
+    _write_json(_path('keys', f"{_key_id(key)}.json"), {'key': record['key'], 'segment': name})
+    sweep()
+    return name
+
+
+# Function to release a mapping once the last array over it has been collected
+def _release(name):
+    with _lock:
+        attachment = _attached.get(name)
+        if attachment is None:
+            return
+        attachment[1] -= 1
+        if attachment[1] > 0:
+            return
+        del _attached[name]
+        attachment[0].close()
+        _remove(attachment[2])
+
+
+def _attach(name):
+    with _lock:
+        attachment = _attached.get(name)
+        if attachment is None:
+            segment = _segment(name)
+            pid, started = _process_id()
+            lease = _path('leases', name, f"{pid}-{started!r}")
+            os.makedirs(os.path.dirname(lease), exist_ok=True)
+            open(lease, 'w').close()
+            attachment = _attached[name] = [segment, 0, lease]
+        attachment[1] += 1
+        return attachment[0]
+
+
+# Function to map a segment by name as read-only arrays: 'index' (int64 UTC nanoseconds) and one
+# array per column, all views of the shared buffer
+def attach_arrays(name):
+    record = _read_json(_path('segments', f"{name}.json"))
+    if record is None or record['state'] != 'ready':
+        return None, None
+    try:
+        segment = _attach(name)
+    except FileNotFoundError:
+        return None, None
+    # Every view hangs off this base array; the lease is released when the last of them is collected
+    base = np.ndarray(record['bytes'], dtype=np.uint8, buffer=segment.buf)
+    base.flags.writeable = False
+    weakref.finalize(base, _release, name)
+    rows = record['rows']
+    arrays = {'index': base[:rows * 8].view('<i8')}
+    for column in record['columns']:
+        itemsize = np.dtype(column['dtype']).itemsize
+        arrays[column['name']] = base[column['offset']:column['offset'] + rows * itemsize].view(column['dtype'])
+    return arrays, record
+
+
+# Function to map a segment by name as a pandas frame over the shared columns
+def attach_frame(name):
+    import pandas as pd
+
+    arrays, record = attach_arrays(name)
+    if arrays is None:
+        return None
+    index = pd.DatetimeIndex(arrays.pop('index').view('M8[ns]'), name=record['index_name'])
+    if record['tz'] is not None:
+        index = index.tz_localize('UTC').tz_convert(record['tz'])
+    return pd.DataFrame(arrays, index=index, copy=False)
+
+
+# Function to find the live segment published for a key, or None when it is missing or expired
+def lookup(key):
+    pointer = _read_json(_path('keys', f"{_key_id(key)}.json"))
+    if pointer is None:
+        return None
+    record = _read_json(_path('segments', f"{pointer['segment']}.json"))
+    if record is None or record['state'] != 'ready' or record['expires'] < time.time():
+        return None
+    return record['name']
+
+
+def open_arrays(key):
+    name = lookup(key)
+    return attach_arrays(name)[0] if name else None
+
+
+def open_frame(key):
+    name = lookup(key)
+    return attach_frame(name) if name else None
+
+
+# Function to map the frame for a key, loading and publishing it first if no live segment exists;
+# falls back to the loaded frame itself when it cannot be shared
+def get_or_publish(key, load, ttl=DEFAULT_TTL):
+    frame = open_frame(key)
+    metrics.cache_lookup('shared_ohlcv', hit=frame is not None)
+    if frame is not None:
+        return frame
+    with _lock:
+        key_lock = _publishing.setdefault(_key_id(key), threading.Lock())
+    with key_lock:
+        frame = open_frame(key)
+        if frame is not None:
+            return frame
+        loaded = load()
+        if loaded is None or loaded.empty:
+            return loaded
+        try:
+            name = publish(key, loaded, ttl)
+        except (TypeError, OSError):
+            return loaded
+        return attach_frame(name) if name else loaded
+
+
+def _leases(name):
+    try:
+        entries = os.listdir(_path('leases', name))
+    except FileNotFoundError:
+        return []
+    leases = []
+    for entry in entries:
+        pid, _, started = entry.partition('-')
+        leases.append((entry, int(pid), float(started)))
+    return leases
+
+
+def _unlink(name):
+    with _lock:
+        segment = _owned.pop(name, None)
+    try:
+        segment = segment or _segment(name)
+    except FileNotFoundError:
+        return
+    segment.close()
+    # Before 3.13 unlink() also unregisters from the resource tracker, which must know the name
+    if sys.version_info < (3, 13) and os.name == 'posix':
+        from multiprocessing import resource_tracker
+
+        resource_tracker.register(segment._name, 'shared_memory')
+    try:
+        segment.unlink()
+    except FileNotFoundError:
+        pass
+
+
+# Function to drop leases of exited processes and unlink segments nobody can still be reading:
+# expired, superseded or orphaned ones without live leases, and half-written ones whose publisher is gone
+def sweep(now=None):
+    now = now or time.time()
+    current = {pointer['segment'] for pointer in map(_read_json, _files('keys')) if pointer}
+    removed = {'leases': 0, 'segments': 0}
+    for path in _files('segments'):
+        record = _read_json(path)
+        if record is None:
+            continue
+        name = record['name']
+        live = 0
+        for entry, pid, started in _leases(name):
+            if _alive(pid, started):
+                live += 1
+            else:
+                _remove(_path('leases', name, entry))
+                removed['leases'] += 1
+        if record['state'] == 'publishing':
+            stale = not _alive(*record['publisher'])
+        else:
+            stale = (record['expires'] < now or name not in current or not _alive(*record['publisher'])) and not live
+        if stale:
+            _unlink(name)
+            _remove(path)
+            try:
+                os.rmdir(_path('leases', name))
+            except OSError:
+                pass
+            removed['segments'] += 1
+    # Pointers to segments that are gone would only send readers to a missing record
+    for path in _files('keys'):
+        pointer = _read_json(path)
+        if pointer and not os.path.exists(_path('segments', f"{pointer['segment']}.json")):
+            _remove(path)
+    return removed
+
+
+def _files(kind):
+    try:
+        return [_path(kind, entry) for entry in os.listdir(_path(kind)) if entry.endswith('.json')]
+    except FileNotFoundError:
+        return []
+
+
+# Function to list every published segment with its size and the processes reading it
+def report():
+    current = {pointer['segment'] for pointer in map(_read_json, _files('keys')) if pointer}
+    rows = []
+    for record in filter(None, map(_read_json, _files('segments'))):
+        readers = [pid for _, pid, started in _leases(record['name']) if _alive(pid, started)]
+        rows.append({'Segment': record['name'], 'Key': ' / '.join(record['key']), 'Rows': record['rows'],
+                     'Bytes': record['bytes'], 'State': record['state'], 'Current': record['name'] in current,
+                     'Expires In (s)': round(record['expires'] - time.time()), 'Readers': len(readers)})
+    return rows
+
+
+# Function to total the bytes of every published segment, for the metrics scrape
+def published_bytes():
+    return sum(record['bytes'] for record in filter(None, map(_read_json, _files('segments'))))
+
+
+SHARED_BYTES = metrics.Gauge('analyzer_shared_ohlcv_bytes', 'Bytes of OHLCV published to shared memory segments.',
+                             callback=published_bytes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--list', action='store_true', help='list published segments')
+    parser.add_argument('--sweep', action='store_true', help='drop dead leases and unlink unused segments')
+    args = parser.parse_args()
+    if args.sweep:
+        print(sweep())
+    if args.list or not args.sweep:
+        for row in report():
+            print(row)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,31 @@
 # stock_analyzer_app.py
-import streamlit as st
-import yfinance as yf
+import logging
 
+import instrumentation
+import metrics
 
+logger = logging.getLogger(__name__)
+
+
+@instrumentation.traced('fetch_stock_info')
 def fetch_stock_info(ticker):
+    import yfinance as yf
+
     stock = yf.Ticker(ticker)
-    return stock.info
+    with metrics.timed_fetch('yahoo_info'):
+        return stock.info
 
 
+@instrumentation.traced('fetch_historical_data')
 def fetch_historical_data(ticker, time_period):
+    import yfinance as yf
+
     stock = yf.Ticker(ticker)
-    return stock.history(period=time_period)
+    with metrics.timed_fetch('yahoo_history'):
+        return stock.history(period=time_period)
 
 
-@st.cache_data
+@instrumentation.traced('get_stock_data')
 def get_stock_data(ticker, time_period):
     try:
         stock_info = fetch_stock_info(ticker)
@@ -21,5 +33,15 @@ def get_stock_data(ticker, time_period):
         return stock_info, historical_data
 
     except Exception as e:
-        st.error(f"Error fetching stock data: {e}")
+        logger.error("Error fetching stock data for %s: %s", ticker, e)
         return None, None
+
+
+# Function to fetch daily bars from a start date onward, for incremental refreshes of a stored history
+@instrumentation.traced('fetch_history_since')
+def fetch_history_since(ticker, start):
+    import yfinance as yf
+
+    stock = yf.Ticker(ticker)
+    with metrics.timed_fetch('yahoo_history_since'):
+        return stock.history(start=start)
@@ -1,9 +1,14 @@
-import streamlit as st
-from ta import momentum
-from ta import volume
-from ta import trend
+import logging
+import time
+
 import numpy as np
 
+from analysis_result import AnalysisResult, render_markdown
+import metrics
+from instrumentation import span, traced
+
+logger = logging.getLogger(__name__)
+
 
 # Function to categorize market cap
 def get_cap_category(market_cap_value):
@@ -16,43 +21,59 @@ def get_cap_category(market_cap_value):
     return 'unknown'
 
 
-# Function to calculate technical indicators
+# Function to calculate technical indicators; each indicator is its own span when timings are recorded
+@traced('calculate_indicators')
 def calculate_indicators(df):
+    # ta pulls in its whole indicator library, so it is imported on first use
+    from ta import momentum
+    from ta import volume
+    from ta import trend
+
+    start = time.perf_counter()
+
     # Existing indicators
-    df['SMA_50'] = df['Close'].rolling(window=50).mean()
-    df['SMA_200'] = df['Close'].rolling(window=200).mean()
-    df['RSI'] = calculate_rsi(df['Close'])
-    df = calculate_macd(df)
+    with span('indicator.sma'):
+        df['SMA_50'] = df['Close'].rolling(window=50).mean()
+        df['SMA_200'] = df['Close'].rolling(window=200).mean()
+    with span('indicator.rsi'):
+        df['RSI'] = calculate_rsi(df['Close'])
+    with span('indicator.macd'):
+        df = calculate_macd(df)
 
     # New Indicators
 
     # 1. EMA Crossovers
-    df['EMA_15'] = df['Close'].ewm(span=15, adjust=False).mean()
-    df['EMA_50'] = df['Close'].ewm(span=50, adjust=False).mean()
-    df['EMA_Crossover'] = df['EMA_15'] > df['EMA_50']
+    with span('indicator.ema'):
+        df['EMA_15'] = df['Close'].ewm(span=15, adjust=False).mean()
+        df['EMA_50'] = df['Close'].ewm(span=50, adjust=False).mean()
+        df['EMA_Crossover'] = df['EMA_15'] > df['EMA_50']
 
     # 2. Stochastic Oscillator
-    stochastic = momentum.StochasticOscillator(
-        high=df['High'],
-        low=df['Low'],
-        close=df['Close'],
-        window=14,
-        smooth_window=3
-    )
-    df['Stochastic_%K'] = stochastic.stoch()
-    df['Stochastic_%D'] = stochastic.stoch_signal()
-    df['Stochastic_Signal'] = df['Stochastic_%K'] > df['Stochastic_%D']
+    with span('indicator.stochastic'):
+        stochastic = momentum.StochasticOscillator(
+            high=df['High'],
+            low=df['Low'],
+            close=df['Close'],
+            window=14,
+            smooth_window=3
+        )
+        df['Stochastic_%K'] = stochastic.stoch()
+        df['Stochastic_%D'] = stochastic.stoch_signal()
+        df['Stochastic_Signal'] = df['Stochastic_%K'] > df['Stochastic_%D']
 
     # 3. On-Balance Volume (OBV)
-    obv = volume.OnBalanceVolumeIndicator(close=df['Close'], volume=df['Volume'])
-    df['OBV'] = obv.on_balance_volume()
+    with span('indicator.obv'):
+        obv = volume.OnBalanceVolumeIndicator(close=df['Close'], volume=df['Volume'])
+        df['OBV'] = obv.on_balance_volume()
 
     # 4. Average Directional Index (ADX)
-    adx = trend.ADXIndicator(high=df['High'], low=df['Low'], close=df['Close'], window=14)
-    df['ADX'] = adx.adx()
-    df['ADX_Pos'] = adx.adx_pos()
-    df['ADX_Neg'] = adx.adx_neg()
+    with span('indicator.adx'):
+        adx = trend.ADXIndicator(high=df['High'], low=df['Low'], close=df['Close'], window=14)
+        df['ADX'] = adx.adx()
+        df['ADX_Pos'] = adx.adx_pos()
+        df['ADX_Neg'] = adx.adx_neg()
 
+    metrics.INDICATOR_SECONDS.observe(time.perf_counter() - start, bars=metrics.bar_bucket(len(df)))
     return df
 
 
@@ -82,125 +103,144 @@ def avg_obv_last_n_days(obv_series, n):
     return avg_obv_last_n_days
 
 
-def analyze_stock(ticker, stock, df):
-    try:
-        # Current Indicators
-        current_price = df['Close'].iloc[-1]
-        sma_50 = df['SMA_50'].iloc[-1]
-        sma_200 = df['SMA_200'].iloc[-1]
-        rsi = df['RSI'].iloc[-1]
-        macd = df['MACD'].iloc[-1]
-        signal = df['Signal'].iloc[-1]
-        ema_15 = df['EMA_15'].iloc[-1]
-        ema_50 = df['EMA_50'].iloc[-1]
-        stochastic_k = df['Stochastic_%K'].iloc[-1]
-        stochastic_d = df['Stochastic_%D'].iloc[-1]
-        stochastic_signal = df['Stochastic_Signal'].iloc[-1]
-        obv = df['OBV'].iloc[-1]
-        obv_short = avg_obv_last_n_days(df['OBV'], 50)
-        obv_long = avg_obv_last_n_days(df['OBV'], 200)
-        adx = df['ADX'].iloc[-1]
-
-        adx_pos = df['ADX_Pos'].iloc[-1]
-        adx_neg = df['ADX_Neg'].iloc[-1]
-
-        # Fundamental Indicators
-        pe_ratio = stock.get('trailingPE', None)
-        dividend_yield = stock.get('dividendYield', None)
-        market_cap_value = stock.get('marketCap', None)
-
-        pe_ratio_display = f"{pe_ratio:.2f}" if isinstance(pe_ratio, (int, float)) else 'N/A'
-        dividend_yield_display = f"{dividend_yield * 100:.2f}%" if isinstance(dividend_yield, (int, float)) else 'N/A'
-        market_cap_display = f"₹{market_cap_value / 1e9:.2f} billion" if isinstance(market_cap_value, (int, float)) else 'N/A'
-
-        cap_category = get_cap_category(market_cap_value)
-
-        # Determine Trend and Momentum
-        is_bullish_trend = ema_15 > ema_50 and sma_50 > sma_200
-        is_bearish_trend = ema_15 < ema_50 and sma_50 < sma_200
-        is_strong_trend = adx > 25
-
-        # Buy Signal Criteria
-        buy_signal = (
-                is_bullish_trend and
-                obv_short > obv_long and  # OBV is rising
-                is_strong_trend
-        )
+# Function to collect the last-bar indicator values used by the analysis
+def get_latest_values(df):
+    return {
+        'current_price': df['Close'].iloc[-1],
+        'sma_50': df['SMA_50'].iloc[-1],
+        'sma_200': df['SMA_200'].iloc[-1],
+        'rsi': df['RSI'].iloc[-1],
+        'macd': df['MACD'].iloc[-1],
+        'signal': df['Signal'].iloc[-1],
+        'ema_15': df['EMA_15'].iloc[-1],
+        'ema_50': df['EMA_50'].iloc[-1],
+        'stochastic_k': df['Stochastic_%K'].iloc[-1],
+        'stochastic_d': df['Stochastic_%D'].iloc[-1],
+        'stochastic_signal': df['Stochastic_Signal'].iloc[-1],
+        'obv': df['OBV'].iloc[-1],
+        'obv_short': avg_obv_last_n_days(df['OBV'], 50),
+        'obv_long': avg_obv_last_n_days(df['OBV'], 200),
+        'adx': df['ADX'].iloc[-1],
+        'adx_pos': df['ADX_Pos'].iloc[-1],
+        'adx_neg': df['ADX_Neg'].iloc[-1],
+    }
+
+
+# Function to apply the buy/sell criteria to the last-bar values
+def evaluate_signals(values):
+    # Determine Trend and Momentum
+    is_bullish_trend = values['ema_15'] > values['ema_50'] and values['sma_50'] > values['sma_200']
+    is_bearish_trend = values['ema_15'] < values['ema_50'] and values['sma_50'] < values['sma_200']
+    is_strong_trend = values['adx'] > 25
+
+    # Buy Signal Criteria
+    buy_signal = (
+            is_bullish_trend and
+            values['obv_short'] > values['obv_long'] and  # OBV is rising
+            is_strong_trend
+    )
 
-        # Sell Signal Criteria
-        sell_signal = (
-                is_bearish_trend and
-                obv_short < obv_long and  # OBV is falling
-                is_strong_trend
-        )
+    # Sell Signal Criteria
+    sell_signal = (
+            is_bearish_trend and
+            values['obv_short'] < values['obv_long'] and  # OBV is falling
+            is_strong_trend
+    )
 
-        # Recommendation Logic
-        if buy_signal:
-            recommendation = "BUY"
-            recommendation_reason = "All buy signal criteria met."
-        elif sell_signal:
-            recommendation = "SELL"
-            recommendation_reason = "All sell signal criteria met."
-        else:
-            recommendation = "HOLD"
-            recommendation_reason = "No clear buy or sell signal."
-
-        # Recommendation Badge
-        if recommendation == "BUY":
-            recommendation_badge = '🟢 BUY'
-        elif recommendation == "SELL":
-            recommendation_badge = '🔴 SELL'
-        else:
-            recommendation_badge = '🟡 HOLD'
-
-        insights: str = f"""**Analysis for {ticker}:**
-
-### Technical Analysis:
-1. **Current Price:** ₹{current_price:.2f}
-2. **50-day SMA:** ₹{sma_50:.2f}
-3. **200-day SMA:** ₹{sma_200:.2f}
-4. **RSI:** {rsi:.2f}
-5. **MACD:** {macd:.2f}
-6. **MACD Signal:** {signal:.2f}
-7. **EMA 15:** ₹{ema_15:.2f}
-8. **EMA 50:** ₹{ema_50:.2f}
-9. **Stochastic %K:** {stochastic_k:.2f}
-10. **Stochastic %D:** {stochastic_d:.2f}
-11. **OBV:** {obv:.2f}
-12. **ADX:** {adx:.2f}
-
-### Fundamental Analysis:
-1. **Market Cap:** {market_cap_display}
-2. **P/E Ratio:** {pe_ratio_display}
-3. **Dividend Yield:** {dividend_yield_display}
-4. **52-week High:** ₹{df['Close'].max():.2f}
-5. **52-week Low:** ₹{df['Close'].min():.2f}
-6. **Average Daily Volume:** {df['Volume'].mean():.0f}
-
-### Key Insights and Recommendation:
-{ticker} is currently trading at ₹{current_price:.2f}.
-
-**Technical Outlook:**
-# - The stock is trading {'above' if is_bullish_trend else 'below'} its 50-day and 200-day moving averages, indicating a {'bullish' if is_bullish_trend else 'bearish'} trend.
-- The RSI at {rsi:.2f} suggests the stock is {'overbought' if rsi > 70 else 'oversold' if rsi < 30 else 'neutral'}.
-- The MACD ({macd:.2f}) is {'above' if macd > signal else 'below'} its signal line ({signal:.2f}), suggesting {'bullish' if macd > signal else 'bearish'} momentum.
-- The Stochastic Oscillator shows {'oversold conditions' if stochastic_k < 20 else 'overbought conditions' if stochastic_k > 80 else 'neutral conditions'}, with {'%K crossing above %D' if stochastic_signal else '%K crossing below %D'}.
-- OBV is {'rising, indicating accumulation.' if obv_short > obv_long else 'falling, indicating distribution.'}
-- The ADX at {adx:.2f} confirms a {'strong' if is_strong_trend else 'weak'} trend.
-
-**Fundamental Considerations:**
-- With a market cap of {market_cap_display}, this is a {'large' if cap_category == 'large' else 'mid to small'} cap stock.
-- The P/E ratio of {pe_ratio_display} {'suggests a premium valuation' if pe_ratio != 'N/A' and float(pe_ratio_display) > 25 else 'indicates a potentially undervalued stock' if pe_ratio != 'N/A' and float(pe_ratio_display) < 15 else 'is within a normal range'}.
-
-**Recommendation:**
-Based on the analysis, the current recommendation for {ticker} is to **{recommendation_badge}**.
-**Reason:** {recommendation_reason}
-
-*Note: These insights are based on historical data and technical analysis. Always conduct your own research or consult with a financial advisor before making investment decisions.*
-"""
-
-        return insights
+    # Recommendation Logic
+    if buy_signal:
+        recommendation = "BUY"
+        recommendation_reason = "All buy signal criteria met."
+    elif sell_signal:
+        recommendation = "SELL"
+        recommendation_reason = "All sell signal criteria met."
+    else:
+        recommendation = "HOLD"
+        recommendation_reason = "No clear buy or sell signal."
+
+    return {
+        'is_bullish_trend': is_bullish_trend,
+        'is_bearish_trend': is_bearish_trend,
+        'is_strong_trend': is_strong_trend,
+        'buy_signal': buy_signal,
+        'sell_signal': sell_signal,
+        'recommendation': recommendation,
+        'recommendation_reason': recommendation_reason,
+    }
+
+
+# Function to read a numeric fundamental from the yfinance info dict
+def _numeric_info(stock, key):
+    value = stock.get(key, None)
+    return float(value) if isinstance(value, (int, float)) else None
+
+
+# Function to compute every metric and flag of the analysis without any formatting
+@traced('compute_analysis')
+def compute_analysis(ticker, stock, df):
+    values = get_latest_values(df)
+    signals = evaluate_signals(values)
+
+    rsi = float(values['rsi'])
+    stochastic_k = float(values['stochastic_k'])
+    pe_ratio = _numeric_info(stock, 'trailingPE')
+    market_cap_value = _numeric_info(stock, 'marketCap')
+
+    if pe_ratio is None:
+        valuation = 'unknown'
+    elif pe_ratio > 25:
+        valuation = 'premium'
+    elif pe_ratio < 15:
+        valuation = 'undervalued'
+    else:
+        valuation = 'normal'
+
+    return AnalysisResult(
+        ticker=ticker,
+        current_price=float(values['current_price']),
+        sma_50=float(values['sma_50']),
+        sma_200=float(values['sma_200']),
+        rsi=rsi,
+        macd=float(values['macd']),
+        signal=float(values['signal']),
+        ema_15=float(values['ema_15']),
+        ema_50=float(values['ema_50']),
+        stochastic_k=stochastic_k,
+        stochastic_d=float(values['stochastic_d']),
+        stochastic_signal=bool(values['stochastic_signal']),
+        obv=float(values['obv']),
+        obv_short=float(values['obv_short']),
+        obv_long=float(values['obv_long']),
+        adx=float(values['adx']),
+        adx_pos=float(values['adx_pos']),
+        adx_neg=float(values['adx_neg']),
+        market_cap=market_cap_value,
+        pe_ratio=pe_ratio,
+        dividend_yield=_numeric_info(stock, 'dividendYield'),
+        cap_category=get_cap_category(market_cap_value),
+        high_52w=float(df['Close'].max()),
+        low_52w=float(df['Close'].min()),
+        avg_volume=float(df['Volume'].mean()),
+        is_bullish_trend=bool(signals['is_bullish_trend']),
+        is_bearish_trend=bool(signals['is_bearish_trend']),
+        is_strong_trend=bool(signals['is_strong_trend']),
+        obv_rising=bool(values['obv_short'] > values['obv_long']),
+        macd_above_signal=bool(values['macd'] > values['signal']),
+        rsi_state='overbought' if rsi > 70 else 'oversold' if rsi < 30 else 'neutral',
+        stochastic_state='oversold' if stochastic_k < 20 else 'overbought' if stochastic_k > 80 else 'neutral',
+        valuation=valuation,
+        buy_signal=bool(signals['buy_signal']),
+        sell_signal=bool(signals['sell_signal']),
+        recommendation=signals['recommendation'],
+        recommendation_reason=signals['recommendation_reason'],
+    )
+
+
+@traced('analyze_stock')
+def analyze_stock(ticker, stock, df):
+    try:
+        return render_markdown(compute_analysis(ticker, stock, df))
 
     except Exception as e:
-        st.error(f"Error in analysis: {str(e)}")
-        return str(e)
+        logger.exception("Error in analysis for %s", ticker)
+        return f"Error in analysis: {e}"
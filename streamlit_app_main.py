@@ -1,21 +1,70 @@
-import stock_functions
-import streamlit as st
-import yfinance as yf
-import stock_data
+# Only lightweight modules are imported before the sidebar is painted. The data, charting,
+# news and sentiment stacks are imported on first use further down the script; see
+# benchmarks/import_profile.py for the import-time breakdown.
 import os
-import pandas as pd
-import numpy as np
-import plotly.graph_objs as go
 from datetime import datetime
-from newsapi import NewsApiClient
-from textblob import TextBlob
-from dotenv import load_dotenv
+
+import streamlit as st
+
+import downsample
+import metrics
+import session_cache
 
 st.set_page_config(page_title="Comprehensive Indian Stock Analyzer", layout="wide")
 
+# Prometheus scrape endpoint, started once per server process when ANALYZER_METRICS_PORT is set
+if metrics.METRICS_PORT:
+    metrics.start_http_server()
+
 # Sidebar Inputs
 st.sidebar.title("Stock Analyzer Inputs")
 
+mode = st.sidebar.radio("Mode", options=["Single Stock", "Screener"], horizontal=True)
+
+if mode == "Screener":
+    import pandas as pd
+    import screener
+
+    st.title("🔎 Indian Stock Screener")
+
+    universe = st.sidebar.selectbox("Select Universe", options=screener.UNIVERSES, index=0)
+    symbol_file = None
+    if universe == "Custom file":
+        symbol_file = st.sidebar.file_uploader("Upload symbol list (CSV with a 'Symbol' column or one per line)", type=["csv", "txt"])
+    screener_period = st.sidebar.selectbox(
+        "Select Time Period",
+        options=["1y", "2y", "5y"],
+        index=0  # 200-day SMA needs at least 1y of daily bars
+    )
+    workers = st.sidebar.slider("Worker processes", min_value=1, max_value=max(os.cpu_count() or 1, 1) * 2, value=os.cpu_count() or 1)
+    chunk_size = st.sidebar.slider("Symbols per chunk", min_value=1, max_value=50, value=10)
+
+    if st.sidebar.button("Run Screener"):
+        try:
+            symbols = screener.load_universe(universe, symbol_file)
+        except Exception as e:
+            st.error(f"Error loading universe: {e}")
+            st.stop()
+
+        st.subheader(f"Screening {len(symbols)} symbols from {universe}")
+        progress = st.progress(0.0)
+        results_table = st.empty()
+        rows, failed = [], []
+
+        # Results are streamed into the table as each chunk of symbols completes
+        for chunk_rows, chunk_errors in screener.screen_universe(symbols, screener_period, workers=workers, chunk_size=chunk_size):
+            rows.extend(chunk_rows)
+            failed.extend(chunk_errors)
+            progress.progress((len(rows) + len(failed)) / len(symbols))
+            if rows:
+                results_table.dataframe(pd.DataFrame(rows).set_index('Symbol').sort_values('ADX', ascending=False))
+
+        st.write(f"Screened {len(rows)} of {len(symbols)} symbols.")
+        if failed:
+            with st.expander(f"{len(failed)} symbols could not be screened", expanded=False):
+                st.dataframe(pd.DataFrame(failed, columns=['Symbol', 'Error']))
+    st.stop()
+
 ticker_input = st.sidebar.text_input("Enter the Indian stock symbol (e.g., RELIANCE)", value="RELIANCE")
 time_interval = st.sidebar.selectbox(
     "Select Time Interval",
@@ -29,6 +78,17 @@ time_period = st.sidebar.selectbox(
 )
 start_date = st.sidebar.date_input("Start Date", datetime(2022, 1, 1))
 end_date = st.sidebar.date_input("End Date", datetime.today())
+max_points = st.sidebar.slider("Chart point budget", min_value=200, max_value=5000, value=downsample.DEFAULT_MAX_POINTS, step=100)
+zoom_to_dates = st.sidebar.checkbox("Zoom charts to Start/End Date", value=False)
+sentiment_scorer = st.sidebar.selectbox("Sentiment scorer", options=["textblob", "lexicon"], index=0,
+                                        help="'lexicon' is a vectorized fast path over the same TextBlob lexicon")
+# With ANALYZER_SERVICE_URL set, prices, indicators and analysis come from a running service.py
+# and its shared warm cache instead of being fetched and computed in this process
+service_url = os.getenv('ANALYZER_SERVICE_URL')
+use_service = bool(service_url) and st.sidebar.checkbox("Use analyzer service", value=True, help=service_url)
+record_spans = st.sidebar.checkbox("Record timing spans", value=os.getenv('ANALYZER_TRACE') == '1',
+                                   help="Times fetches, each indicator, analysis, charts, news and sentiment "
+                                        "and appends the spans to data/spans.jsonl")
 
 if not ticker_input.endswith('.NS'):
     ticker = ticker_input.upper() + '.NS'
@@ -38,478 +98,663 @@ else:
 st.title("📈 Comprehensive Indian Stock Analyzer")
 
 
-if "api_key" in st.secrets:
-    api_key = st.secrets["api_key"]
-else:
-    load_dotenv()
-    api_key = os.getenv('api_key')
+# Initialize NewsAPI with the API key from the TOML file, once per process and only when news is needed
+@st.cache_resource
+def get_newsapi_client():
+    from newsapi import NewsApiClient
 
-# Initialize NewsAPI with the API key from the TOML file
-newsapi = NewsApiClient(api_key=api_key)
+    if "api_key" in st.secrets:
+        api_key = st.secrets["api_key"]
+    else:
+        from dotenv import load_dotenv
+        load_dotenv()
+        api_key = os.getenv('api_key')
+    return NewsApiClient(api_key=api_key)
 
-# Main execution flow
-if st.sidebar.button("Analyze"):
-    stock_info, historical_data = stock_data.get_stock_data(ticker, time_period)
-    if stock_info is not None and historical_data is not None:
-        # Calculate indicators
-        historical_data = stock_functions.calculate_indicators(historical_data)
-
-        # Display historical data
-        st.subheader(f"Historical Data for {ticker}")
-        st.dataframe(historical_data)
-
-        # Analyze and display insights
-        analysis_result = stock_functions.analyze_stock(ticker, stock_info, historical_data)
-        st.markdown(analysis_result)
-
-        # Plotting with Plotly
-
-        # 1. Candlestick Chart with SMAs and EMAs
-        st.subheader("Candlestick Chart with Moving Averages")
-
-        # Creating an expander for 50 and 200 days Moving Averages
-        with st.expander("Read more about 50-day and 200-day Moving Averages", expanded=False):
-            # Content inside the expander
-            st.write("""
-            **Moving Averages** are commonly used indicators in technical analysis that help smooth out price data by creating 
-            a constantly updated average price. The **50-day Moving Average (MA)** and the **200-day Moving Average (MA)** 
-            are two of the most widely used moving averages.
-
-            ### 50-day Moving Average (50-MA)
-            - The **50-day Moving Average** is the average of a security's closing prices over the last 50 days. It is used 
-            to identify the short-term trend of a stock or asset.
-            - **Interpretation**:
-            - **Bullish Signal**: When the price crosses above the 50-MA, it may indicate an upward trend.
-            - **Bearish Signal**: When the price crosses below the 50-MA, it may suggest a downward trend.
-
-            ### 200-day Moving Average (200-MA)
-            - The **200-day Moving Average** is the average of a security's closing prices over the last 200 days. It is often 
-            used to identify the long-term trend and assess the overall market direction.
-            - **Interpretation**:
-            - **Bullish Signal**: When the price crosses above the 200-MA, it may indicate a strong upward trend.
-            - **Bearish Signal**: When the price crosses below the 200-MA, it may suggest a significant downward trend.
-
-            ### Moving Average Crossovers
-            - **Golden Cross**: When the 50-MA crosses above the 200-MA, it is known as a "Golden Cross," signaling a potential 
-            bullish market.
-            - **Death Cross**: When the 50-MA crosses below the 200-MA, it is known as a "Death Cross," signaling a potential 
-            bearish market.
-
-            ### Limitations
-            - **Lagging Indicator**: Both moving averages are lagging indicators, meaning they are based on past prices and 
-            may not react quickly to sudden market changes.
-            - **Whipsaws**: In a volatile market, moving averages can produce false signals or "whipsaws," requiring traders 
-            to use additional indicators for confirmation.
-            """)
-
-        fig_candlestick = go.Figure()
-
-        # Candlestick plot (Price movements)
-        fig_candlestick.add_trace(go.Candlestick(x=historical_data.index,
-                                                 open=historical_data['Open'],
-                                                 high=historical_data['High'],
-                                                 low=historical_data['Low'],
-                                                 close=historical_data['Close'],
-                                                 name="Candlestick"))
-
-        # SMA and EMA plots
-        fig_candlestick.add_trace(go.Scatter(x=historical_data.index, y=historical_data['SMA_50'], mode='lines', name='SMA 50', line=dict(color='blue')))
-        fig_candlestick.add_trace(go.Scatter(x=historical_data.index, y=historical_data['SMA_200'], mode='lines', name='SMA 200', line=dict(color='red')))
-        fig_candlestick.add_trace(go.Scatter(x=historical_data.index, y=historical_data['EMA_50'], mode='lines', name='EMA 50', line=dict(color='green')))
-        fig_candlestick.add_trace(go.Scatter(x=historical_data.index, y=historical_data['EMA_50'], mode='lines', name='EMA 200', line=dict(color='orange')))
-
-        fig_candlestick.update_layout(title=f"{ticker} Price Analysis",
-                                      xaxis_title="Date",
-                                      yaxis_title="Price",
-                                      legend=dict(x=0, y=1, traceorder='normal', orientation='h'))
-
-        st.plotly_chart(fig_candlestick)
-
-        # Explanation for Candlestick Chart
-        st.write("**Candlestick Chart** shows the price movements of the stock over time. Each candle represents the opening, highest, lowest, and closing prices in a given period.")
-
-        # Current Interpretation for Candlestick Chart
-        current_price = historical_data['Close'].iloc[-1]
-        sma_50 = historical_data['SMA_50'].iloc[-1]
-        sma_200 = historical_data['SMA_200'].iloc[-1]
-        ema_15 = historical_data['EMA_15'].iloc[-1]
-        ema_50 = historical_data['EMA_50'].iloc[-1]
-
-        if current_price < sma_50 and current_price < sma_200:
-            trend = "bearish"
-        elif current_price > sma_50 and current_price > sma_200:
-            trend = "bullish"
-        else:
-            trend = "mixed"
+# Price and fundamentals fetches are shared across sessions for an hour. The stages run on
+# orchestrator worker threads, where st.cache_data must not be called, so they go through
+# fetch_cache, a thread-safe process-wide cache that keeps stock_data free of Streamlit.
+def cached_stock_info(ticker):
+    import fetch_cache
 
-        st.write(
-            f"**Current Interpretation**: The stock is trading below its 50-day and 200-day SMAs, indicating a {trend} trend. The EMA lines suggest recent price trends, where the stock is currently below the shorter-term EMA values, reflecting bearish momentum.")
+    return fetch_cache.stock_info(ticker)
 
-        # 2. MACD Chart
-        st.subheader("MACD (Moving Average Convergence Divergence) Analysis")
 
-        # Creating an expander for MACD
-        with st.expander("Read more about MACD (Moving Average Convergence Divergence)", expanded=False):
-            # Content inside the expander
-            st.write("""
-            **MACD** (Moving Average Convergence Divergence) is a trend-following momentum indicator that shows the relationship 
-            between two moving averages of a security's price. It helps traders identify potential buy and sell signals.
+# With ANALYZER_SHARED_OHLCV=1 each price history is published once to shared memory and every
+# session maps the same read-only columns instead of holding its own copy
+SHARED_OHLCV = os.getenv('ANALYZER_SHARED_OHLCV') == '1'
 
-            ### Calculation of MACD
-            The MACD is calculated by subtracting the 26-period Exponential Moving Average (EMA) from the 12-period EMA:
 
-            \[
-            \text{MACD} = \text{EMA}_{12} - \text{EMA}_{26}
-            \]
+def cached_historical_data(ticker, time_period):
+    import fetch_cache
 
-            The MACD line is typically plotted along with a 9-day EMA of the MACD, called the **Signal Line**:
+    if SHARED_OHLCV:
+        import shared_ohlcv
 
-            \[
-            \text{Signal Line} = \text{EMA}_{9}(\text{MACD})
-            \]
+        return shared_ohlcv.get_or_publish((ticker, time_period),
+                                           lambda: fetch_cache.historical_data(ticker, time_period))
+    return fetch_cache.historical_data(ticker, time_period)
 
-            ### Interpretation of MACD
-            - **Bullish Signal**: When the MACD crosses above the Signal Line, it may indicate a buy signal.
-            - **Bearish Signal**: When the MACD crosses below the Signal Line, it may indicate a sell signal.
 
-            ### Divergence
-            - **Bullish Divergence**: Occurs when the price makes a lower low while the MACD makes a higher low, suggesting potential upward momentum.
-            - **Bearish Divergence**: Occurs when the price makes a higher high while the MACD makes a lower high, suggesting potential downward momentum.
+# Data behind each section. On a fresh analysis these run as orchestrator stages on worker
+# threads; on a cached analysis they run inline only when a value is missing (e.g. a new scorer).
+def fetch_news(client):
+    import news_store
+    import symbol_master
 
-            ### Limitations
-            - **Lagging Indicator**: The MACD is based on historical price data and may lag in rapidly changing markets.
-            - **False Signals**: In volatile markets, MACD can produce false signals, requiring confirmation from other indicators.
-            """)
+    # Articles come from the local store; NewsAPI is asked only for articles newer than the
+    # last stored one, at most once per TTL window per ticker. Known symbols are searched by
+    # company name and aliases, and articles are tagged with every ticker they mention.
+    matcher = symbol_master.default_matcher()
+    known_symbol = matcher.knows(ticker)
+    return news_store.refresh_ticker(client, ticker, matcher.news_query(ticker) if known_symbol else ticker_input,
+                                     tagger=matcher.article_tickers if known_symbol else None)
 
-        fig_macd = go.Figure()
-        fig_macd.add_trace(go.Scatter(x=historical_data.index, y=historical_data['MACD'], mode='lines', name='MACD', line=dict(color='green')))
-        fig_macd.add_trace(go.Scatter(x=historical_data.index, y=historical_data['Signal'], mode='lines', name='Signal', line=dict(color='orange')))
-        fig_macd.add_trace(go.Bar(x=historical_data.index, y=historical_data['MACD_Histogram'], name='MACD Histogram', marker_color='lightblue'))
 
-        fig_macd.update_layout(title=f"{ticker} MACD Analysis",
-                               xaxis_title="Date",
-                               yaxis_title="MACD",
-                               legend=dict(x=0, y=1, traceorder='normal', orientation='h'))
+# Function to get the sentiment polarity of each title; scores are memoized on disk by content hash
+def score_headlines(articles):
+    import sentiment
 
-        st.plotly_chart(fig_macd)
+    return sentiment.score_texts([article['title'] for article in articles], scorer=sentiment_scorer)
 
-        # Explanation for MACD Chart
-        st.write("**MACD (Moving Average Convergence Divergence)** measures momentum by comparing two moving averages. The MACD line and the Signal line show the direction and strength of the trend.")
 
-        # Current Interpretation for MACD
-        macd_value = historical_data['MACD'].iloc[-1]
-        signal_value = historical_data['Signal'].iloc[-1]
+# Function to bucket every stored headline for the ticker to the bar spacing and as-of join it onto the bars
+def build_sentiment_bars(historical_data):
+    import news_store
+    import sentiment_series
 
-        if macd_value < signal_value:
-            macd_trend = "bearish"
-        else:
-            macd_trend = "bullish"
+    history = news_store.sentiment_history(ticker, scorer=sentiment_scorer)
+    bar_interval = sentiment_series.infer_interval(historical_data.index)
+    series = sentiment_series.sentiment_series(history, bar_interval)
+    return sentiment_series.merge_sentiment(historical_data[['Close']], series, bar_interval)
 
-        st.write(f"**Current Interpretation**: The MACD is below the Signal line, indicating {macd_trend} momentum. The negative histogram bars further confirm the downward trend.")
 
-        # 3. RSI Chart
-        st.subheader("RSI (Relative Strength Index) Analysis")
+# Function to turn the price frame and fundamentals into the analysis report
+def analyze_prices(stock_info, historical_data):
+    import analysis_result
+    import stock_functions
 
-        # Creating an expander for RSI
-        # Creating an expander
-        with st.expander("Read more about RSI (Relative Strength Index)", expanded=False):
-            # Content inside the expander
+    return analysis_result.render_markdown(stock_functions.compute_analysis(ticker, stock_info, historical_data))
 
-            st.write("""
-            **RSI** (Relative Strength Index) is a momentum oscillator that measures the speed and change of price movements. 
-            It is primarily used to identify overbought or oversold conditions in a market, helping traders assess the strength 
-            of a price trend and potential reversal points.
 
-            ### Calculation of RSI
-            RSI is calculated using the following formula:
+# Stages of one analysis: fetches start together and indicators start as soon as prices land
+def analysis_stages(client):
+    from orchestrator import Stage
+    import stock_functions
 
+    news_stages = [
+        Stage('news', lambda: fetch_news(client)),
+        Stage('sentiments', score_headlines, ('news',)),
+        Stage('sentiment_bars', lambda articles, historical_data: build_sentiment_bars(historical_data),
+              ('news', 'historical_data')),
+    ]
+    if use_service:
+        import service_client
+
+        return [
+            Stage('historical_data', lambda: service_client.indicators(service_url, ticker, time_period)),
+            Stage('analysis_markdown', lambda: service_client.analysis(service_url, ticker, time_period)['markdown']),
+        ] + news_stages
+
+    # Outputs of last night's scheduler.py run are served as they are, without any fetch
+    import precompute_store
+
+    precomputed = precompute_store.read_result(ticker, time_period)
+    if precomputed is not None:
+        frame, payload = precomputed
+        return [
+            Stage('historical_data', lambda: frame),
+            Stage('analysis_markdown', lambda: payload['markdown']),
+        ] + news_stages
+    return [
+        Stage('stock_info', lambda: cached_stock_info(ticker)),
+        Stage('prices', lambda: cached_historical_data(ticker, time_period)),
+        Stage('historical_data', stock_functions.calculate_indicators, ('prices',)),
+        Stage('analysis_markdown', analyze_prices, ('stock_info', 'historical_data')),
+    ] + news_stages
+
+
+# Stage values that depend on the sentiment scorer are cached per scorer
+def stage_key(name):
+    return (name, sentiment_scorer) if name in ('sentiments', 'sentiment_bars') else name
+
+
+# Function to render the historical data table
+def render_table(entry):
+    import table_view
+
+    historical_data = entry['historical_data']
+
+    # Display historical data
+    st.subheader(f"Historical Data for {ticker}")
+    table_view.render_table(historical_data, entry, file_name=f"{ticker}_{time_period}")
+
+
+# Function to render the analysis report
+def render_analysis(entry):
+    # Analyze and display insights
+    st.markdown(entry['analysis_markdown'])
+
+
+# Function to render the dashboard figure and the per-indicator explanations
+def render_charts(entry):
+    import charts
+
+    historical_data = entry['historical_data']
+
+    # Plotting with Plotly: a single multi-panel figure with a shared x-axis
+    st.subheader("Technical Charts")
+    # Zooming re-slices the full-resolution frame, so the visible range gets the whole point budget
+    chart_window = (start_date, end_date) if zoom_to_dates else None
+    chart_data = historical_data
+    if chart_window is not None:
+        chart_data = charts.visible_window(historical_data, start_date, end_date)
+        if chart_data.empty:
+            st.warning("No bars between the selected Start and End Date, showing the full period.")
+            chart_data = historical_data
+    fig_dashboard = session_cache.memo(entry, ('figure', max_points, chart_window),
+                                       lambda: charts.build_dashboard_figure(chart_data, ticker, max_points=max_points))
+    st.plotly_chart(fig_dashboard, use_container_width=True)
+
+    # 1. Candlestick Chart with SMAs and EMAs
+    st.subheader("Candlestick Chart with Moving Averages")
+
+    # Creating an expander for 50 and 200 days Moving Averages
+    with st.expander("Read more about 50-day and 200-day Moving Averages", expanded=False):
+        # Content inside the expander
+        st.write("""
+        **Moving Averages** are commonly used indicators in technical analysis that help smooth out price data by creating 
+        a constantly updated average price. The **50-day Moving Average (MA)** and the **200-day Moving Average (MA)** 
+        are two of the most widely used moving averages.
+
+        ### 50-day Moving Average (50-MA)
+        - The **50-day Moving Average** is the average of a security's closing prices over the last 50 days. It is used 
+        to identify the short-term trend of a stock or asset.
+        - **Interpretation**:
+        - **Bullish Signal**: When the price crosses above the 50-MA, it may indicate an upward trend.
+        - **Bearish Signal**: When the price crosses below the 50-MA, it may suggest a downward trend.
+
+        ### 200-day Moving Average (200-MA)
+        - The **200-day Moving Average** is the average of a security's closing prices over the last 200 days. It is often 
+        used to identify the long-term trend and assess the overall market direction.
+        - **Interpretation**:
+        - **Bullish Signal**: When the price crosses above the 200-MA, it may indicate a strong upward trend.
+        - **Bearish Signal**: When the price crosses below the 200-MA, it may suggest a significant downward trend.
+
+        ### Moving Average Crossovers
+        - **Golden Cross**: When the 50-MA crosses above the 200-MA, it is known as a "Golden Cross," signaling a potential 
+        bullish market.
+        - **Death Cross**: When the 50-MA crosses below the 200-MA, it is known as a "Death Cross," signaling a potential 
+        bearish market.
+
+        ### Limitations
+        - **Lagging Indicator**: Both moving averages are lagging indicators, meaning they are based on past prices and 
+        may not react quickly to sudden market changes.
+        - **Whipsaws**: In a volatile market, moving averages can produce false signals or "whipsaws," requiring traders 
+        to use additional indicators for confirmation.
+        """)
+
+    # Explanation for Candlestick Chart
+    st.write("**Candlestick Chart** shows the price movements of the stock over time. Each candle represents the opening, highest, lowest, and closing prices in a given period.")
+
+    # Current Interpretation for Candlestick Chart
+    current_price = historical_data['Close'].iloc[-1]
+    sma_50 = historical_data['SMA_50'].iloc[-1]
+    sma_200 = historical_data['SMA_200'].iloc[-1]
+    ema_15 = historical_data['EMA_15'].iloc[-1]
+    ema_50 = historical_data['EMA_50'].iloc[-1]
+
+    if current_price < sma_50 and current_price < sma_200:
+        trend = "bearish"
+    elif current_price > sma_50 and current_price > sma_200:
+        trend = "bullish"
+    else:
+        trend = "mixed"
+
+    st.write(
+        f"**Current Interpretation**: The stock is trading below its 50-day and 200-day SMAs, indicating a {trend} trend. The EMA lines suggest recent price trends, where the stock is currently below the shorter-term EMA values, reflecting bearish momentum.")
+
+    # 2. MACD Chart
+    st.subheader("MACD (Moving Average Convergence Divergence) Analysis")
+
+    # Creating an expander for MACD
+    with st.expander("Read more about MACD (Moving Average Convergence Divergence)", expanded=False):
+        # Content inside the expander
+        st.write("""
+        **MACD** (Moving Average Convergence Divergence) is a trend-following momentum indicator that shows the relationship 
+        between two moving averages of a security's price. It helps traders identify potential buy and sell signals.
+
+        ### Calculation of MACD
+        The MACD is calculated by subtracting the 26-period Exponential Moving Average (EMA) from the 12-period EMA:
+
+        \[
+        \text{MACD} = \text{EMA}_{12} - \text{EMA}_{26}
+        \]
+
+        The MACD line is typically plotted along with a 9-day EMA of the MACD, called the **Signal Line**:
+
+        \[
+        \text{Signal Line} = \text{EMA}_{9}(\text{MACD})
+        \]
+
+        ### Interpretation of MACD
+        - **Bullish Signal**: When the MACD crosses above the Signal Line, it may indicate a buy signal.
+        - **Bearish Signal**: When the MACD crosses below the Signal Line, it may indicate a sell signal.
+
+        ### Divergence
+        - **Bullish Divergence**: Occurs when the price makes a lower low while the MACD makes a higher low, suggesting potential upward momentum.
+        - **Bearish Divergence**: Occurs when the price makes a higher high while the MACD makes a lower high, suggesting potential downward momentum.
+
+        ### Limitations
+        - **Lagging Indicator**: The MACD is based on historical price data and may lag in rapidly changing markets.
+        - **False Signals**: In volatile markets, MACD can produce false signals, requiring confirmation from other indicators.
+        """)
+
+    # Explanation for MACD Chart
+    st.write("**MACD (Moving Average Convergence Divergence)** measures momentum by comparing two moving averages. The MACD line and the Signal line show the direction and strength of the trend.")
+
+    # Current Interpretation for MACD
+    macd_value = historical_data['MACD'].iloc[-1]
+    signal_value = historical_data['Signal'].iloc[-1]
+
+    if macd_value < signal_value:
+        macd_trend = "bearish"
+    else:
+        macd_trend = "bullish"
+
+    st.write(f"**Current Interpretation**: The MACD is below the Signal line, indicating {macd_trend} momentum. The negative histogram bars further confirm the downward trend.")
+
+    # 3. RSI Chart
+    st.subheader("RSI (Relative Strength Index) Analysis")
+
+    # Creating an expander for RSI
+    # Creating an expander
+    with st.expander("Read more about RSI (Relative Strength Index)", expanded=False):
+        # Content inside the expander
+
+        st.write("""
+        **RSI** (Relative Strength Index) is a momentum oscillator that measures the speed and change of price movements. 
+        It is primarily used to identify overbought or oversold conditions in a market, helping traders assess the strength 
+        of a price trend and potential reversal points.
+
+        ### Calculation of RSI
+        RSI is calculated using the following formula:
+
+        \[
+        \text{RSI} = 100 - \left( \frac{100}{1 + RS} \right)
+        \]
+
+        Where:
+        - **RS (Relative Strength)** is the average of *x* days' up closes divided by the average of *x* days' down closes. 
+        Typically, *x* is set to 14 days.
+
+        ### Interpretation of RSI
+        - **Overbought Condition**: An RSI above 70 indicates that a security may be overbought.
+        - **Oversold Condition**: An RSI below 30 indicates that a security may be oversold.
+
+        ### Divergence
+        - **Bullish Divergence**: Occurs when the price makes a lower low while the RSI makes a higher low.
+        - **Bearish Divergence**: Occurs when the price makes a higher high while the RSI makes a lower high.
+
+        ### Limitations
+        - **False Signals**: In trending markets, the RSI can remain overbought or oversold for extended periods.
+        - **Lagging Indicator**: RSI is based on historical price data and may not always predict future movements accurately.
+
+         https://en.wikipedia.org/wiki/Relative_strength_index
+
+        """)
+
+    # Explanation for RSI Chart
+    st.write("**RSI (Relative Strength Index)** measures the speed and change of price movements, typically used to identify overbought or oversold conditions.")
+
+    # Current Interpretation for RSI
+    rsi_value = historical_data['RSI'].iloc[-1]
+
+    if rsi_value < 30:
+        rsi_trend = "oversold"
+    elif rsi_value > 70:
+        rsi_trend = "overbought"
+    else:
+        rsi_trend = "neutral"
+
+    st.write(f"**Current Interpretation**: The RSI is currently {rsi_trend}, suggesting potential price movement in the opposite direction.")
+
+    # 4. Stochastic Oscillator
+    st.subheader("Stochastic Oscillator")
+
+    # Creating an expander for Stochastic Oscillator
+    with st.expander("Read more about Stochastic Oscillator", expanded=False):
+        # Content inside the expander
+        st.write("""
+        The **Stochastic Oscillator** is a momentum indicator used in technical analysis that compares a security's 
+        closing price to its price range over a specific period of time. It is designed to identify overbought or 
+        oversold conditions in a market.
+
+        ### Components
+        - **%K Line**: This is the main line of the stochastic oscillator, representing the current closing price in 
+        relation to the price range over a specified period.
+        - **%D Line**: This is a moving average of the %K line, often used to signal potential buy or sell opportunities.
+
+        ### Calculation
+        The Stochastic Oscillator is calculated using the formula:
+
+        \[
+        \%K = \frac{(Current\: Close - Lowest\: Low)}{(Highest\: High - Lowest\: Low)} \times 100
+        \]
+
+        Where:
+        - **Current Close** is the most recent closing price.
+        - **Lowest Low** is the lowest price over the specified period.
+        - **Highest High** is the highest price over the specified period.
+
+        The **%D** line is typically a 3-period simple moving average of the %K line.
+
+        ### Interpretation
+        - **Overbought Condition**: A Stochastic reading above 80 indicates that the security may be overbought and 
+        could be due for a price correction.
+        - **Oversold Condition**: A reading below 20 suggests that the security may be oversold and could be poised 
+        for a price rebound.
+        - **Crossovers**: When the %K line crosses above the %D line, it may signal a buy opportunity, while a 
+        crossover below may signal a sell opportunity.
+
+        ### Limitations
+        - **False Signals**: The Stochastic Oscillator can produce false signals during strong trends, so it is 
+        often used in conjunction with other indicators.
+        - **Sensitivity**: Short periods can lead to more sensitivity and frequent signals, while longer periods 
+        may provide smoother results but may lag.
+
+        The Stochastic Oscillator is a valuable tool for traders looking to gauge momentum and potential reversal points 
+        in the market.
+        """)
+
+    # Current Interpretation for Stochastic Oscillator
+    stochastic_k = historical_data['Stochastic_%K'].iloc[-1]
+    stochastic_d = historical_data['Stochastic_%D'].iloc[-1]
+
+    if stochastic_k > stochastic_d:
+        stochastic_trend = "bullish"
+    else:
+        stochastic_trend = "bearish"
+
+    st.write(f"**Current Interpretation**: The %K is crossing {'above' if stochastic_k > stochastic_d else 'below'} the %D line, suggesting {stochastic_trend} momentum.")
+
+    # 5. ADX Analysis
+    st.subheader("ADX (Average Directional Index) Analysis")
+
+    # Creating an expander for ADX
+    with st.expander("Read more about ADX (Average Directional Index)", expanded=False):
+        # Content inside the expander
+        st.write("""
+        The **Average Directional Index (ADX)** is a technical analysis indicator used to quantify the strength of a 
+        trend in a market. Developed by J. Welles Wilder, the ADX helps traders identify whether a market is trending 
+        or ranging, aiding in the decision-making process for entering or exiting trades.
+
+        ### Components
+        - **ADX Line**: Measures the strength of the trend but does not indicate its direction.
+        - **+DI (Positive Directional Indicator)**: Indicates the strength of upward movement.
+        - **-DI (Negative Directional Indicator)**: Indicates the strength of downward movement.
+
+        ### Calculation
+        The ADX is calculated using the following steps:
+        1. Calculate the True Range (TR).
+        2. Determine the +DI and -DI:
             \[
-            \text{RSI} = 100 - \left( \frac{100}{1 + RS} \right)
+            +DI = \frac{(Current\: High - Previous\: High)}{TR} \times 100
+            \]
+            \[
+            -DI = \frac{(Previous\: Low - Current\: Low)}{TR} \times 100
+            \]
+        3. Smooth the +DI and -DI values.
+        4. Calculate the ADX using the smoothed values of +DI and -DI:
+            \[
+            ADX = \frac{(Difference\: between\: +DI\: and\: -DI)}{(+DI + -DI)} \times 100
             \]
 
-            Where:
-            - **RS (Relative Strength)** is the average of *x* days' up closes divided by the average of *x* days' down closes. 
-            Typically, *x* is set to 14 days.
-
-            ### Interpretation of RSI
-            - **Overbought Condition**: An RSI above 70 indicates that a security may be overbought.
-            - **Oversold Condition**: An RSI below 30 indicates that a security may be oversold.
-
-            ### Divergence
-            - **Bullish Divergence**: Occurs when the price makes a lower low while the RSI makes a higher low.
-            - **Bearish Divergence**: Occurs when the price makes a higher high while the RSI makes a lower high.
-
-            ### Limitations
-            - **False Signals**: In trending markets, the RSI can remain overbought or oversold for extended periods.
-            - **Lagging Indicator**: RSI is based on historical price data and may not always predict future movements accurately.
-
-             https://en.wikipedia.org/wiki/Relative_strength_index
-
-            """)
-
-        fig_rsi = go.Figure()
-        fig_rsi.add_trace(go.Scatter(x=historical_data.index, y=historical_data['RSI'], mode='lines', name='RSI', line=dict(color='purple')))
-        fig_rsi.add_shape(type="line", x0=historical_data.index[0], y0=70, x1=historical_data.index[-1], y1=70, line=dict(color="red", dash="dash"))
-        fig_rsi.add_shape(type="line", x0=historical_data.index[0], y0=30, x1=historical_data.index[-1], y1=30, line=dict(color="green", dash="dash"))
-
-        fig_rsi.update_layout(title=f"{ticker} RSI Analysis",
-                              xaxis_title="Date",
-                              yaxis_title="RSI",
-                              legend=dict(x=0, y=1, traceorder='normal', orientation='h'))
-
-        st.plotly_chart(fig_rsi)
+        ### Interpretation
+        - **ADX Value Above 20-25**: Indicates a strong trend, whether upward or downward.
+        - **ADX Value Below 20**: Suggests a weak or non-trending market.
+        - **Crossovers**: 
+            - When +DI crosses above -DI, it indicates a potential buy signal.
+            - When -DI crosses above +DI, it indicates a potential sell signal.
 
-        # Explanation for RSI Chart
-        st.write("**RSI (Relative Strength Index)** measures the speed and change of price movements, typically used to identify overbought or oversold conditions.")
+        ### Limitations
+        - **Lagging Indicator**: The ADX is based on past price data, which means it can lag behind current price movements.
+        - **Does Not Indicate Direction**: While ADX shows trend strength, it does not provide information about trend direction, making it essential to use it alongside other indicators.
 
-        # Current Interpretation for RSI
-        rsi_value = historical_data['RSI'].iloc[-1]
+        The ADX is a useful tool for traders to assess the strength of a trend and make informed decisions about their trades.
+        """)
 
-        if rsi_value < 30:
-            rsi_trend = "oversold"
-        elif rsi_value > 70:
-            rsi_trend = "overbought"
-        else:
-            rsi_trend = "neutral"
+    # Current Interpretation for ADX
+    adx_value = historical_data['ADX'].iloc[-1]
 
-        st.write(f"**Current Interpretation**: The RSI is currently {rsi_trend}, suggesting potential price movement in the opposite direction.")
+    if adx_value > 30:
+        adx_trend = "strong"
+    else:
+        adx_trend = "weak"
 
-        # 4. Stochastic Oscillator
-        st.subheader("Stochastic Oscillator")
+    st.write(f"**Current Interpretation**: The ADX value is {adx_value}, indicating a {adx_trend} trend.")
 
-        # Creating an expander for Stochastic Oscillator
-        with st.expander("Read more about Stochastic Oscillator", expanded=False):
-            # Content inside the expander
-            st.write("""
-            The **Stochastic Oscillator** is a momentum indicator used in technical analysis that compares a security's 
-            closing price to its price range over a specific period of time. It is designed to identify overbought or 
-            oversold conditions in a market.
+    # 6. OBV Analysis
+    st.subheader("OBV (On-Balance Volume) Analysis")
 
-            ### Components
-            - **%K Line**: This is the main line of the stochastic oscillator, representing the current closing price in 
-            relation to the price range over a specified period.
-            - **%D Line**: This is a moving average of the %K line, often used to signal potential buy or sell opportunities.
+    # Creating an expander for OBV
+    with st.expander("Read more about OBV (On-Balance Volume) Analysis", expanded=False):
+        # Content inside the expander
+        st.write("""
+        **On-Balance Volume (OBV)** is a technical analysis indicator that uses volume flow to predict changes in stock price. 
+        Developed by Joseph Granville, the OBV provides insights into the strength of price movements based on volume trends.
 
-            ### Calculation
-            The Stochastic Oscillator is calculated using the formula:
+        ### How OBV Works
+        - The core principle of OBV is that volume precedes price movement. Thus, if a security is seeing an increase in volume 
+        without a corresponding change in price, it suggests that the price will eventually move in the direction of the volume.
 
+        ### Calculation
+        The OBV is calculated using the following formula:
+        - If the closing price is higher than the previous closing price:
             \[
-            \%K = \frac{(Current\: Close - Lowest\: Low)}{(Highest\: High - Lowest\: Low)} \times 100
+            OBV = Previous\: OBV + Current\: Volume
+            \]
+        - If the closing price is lower than the previous closing price:
+            \[
+            OBV = Previous\: OBV - Current\: Volume
+            \]
+        - If the closing price is the same:
+            \[
+            OBV = Previous\: OBV
             \]
 
-            Where:
-            - **Current Close** is the most recent closing price.
-            - **Lowest Low** is the lowest price over the specified period.
-            - **Highest High** is the highest price over the specified period.
-
-            The **%D** line is typically a 3-period simple moving average of the %K line.
-
-            ### Interpretation
-            - **Overbought Condition**: A Stochastic reading above 80 indicates that the security may be overbought and 
-            could be due for a price correction.
-            - **Oversold Condition**: A reading below 20 suggests that the security may be oversold and could be poised 
-            for a price rebound.
-            - **Crossovers**: When the %K line crosses above the %D line, it may signal a buy opportunity, while a 
-            crossover below may signal a sell opportunity.
-
-            ### Limitations
-            - **False Signals**: The Stochastic Oscillator can produce false signals during strong trends, so it is 
-            often used in conjunction with other indicators.
-            - **Sensitivity**: Short periods can lead to more sensitivity and frequent signals, while longer periods 
-            may provide smoother results but may lag.
-
-            The Stochastic Oscillator is a valuable tool for traders looking to gauge momentum and potential reversal points 
-            in the market.
-            """)
-
-        fig_stochastic = go.Figure()
-        fig_stochastic.add_trace(go.Scatter(x=historical_data.index, y=historical_data['Stochastic_%K'], mode='lines', name='Stochastic %K', line=dict(color='blue')))
-        fig_stochastic.add_trace(go.Scatter(x=historical_data.index, y=historical_data['Stochastic_%D'], mode='lines', name='Stochastic %D', line=dict(color='orange')))
-        fig_stochastic.add_shape(type="line", x0=historical_data.index[0], y0=20, x1=historical_data.index[-1], y1=20, line=dict(color="red", dash="dash"))
-        fig_stochastic.add_shape(type="line", x0=historical_data.index[0], y0=80, x1=historical_data.index[-1], y1=80, line=dict(color="green", dash="dash"))
-
-        fig_stochastic.update_layout(title=f"{ticker} Stochastic Oscillator",
-                                     xaxis_title="Date",
-                                     yaxis_title="Stochastic Values",
-                                     legend=dict(x=0, y=1, traceorder='normal', orientation='h'))
-
-        st.plotly_chart(fig_stochastic)
-
-        # Current Interpretation for Stochastic Oscillator
-        stochastic_k = historical_data['Stochastic_%K'].iloc[-1]
-        stochastic_d = historical_data['Stochastic_%D'].iloc[-1]
-
-        if stochastic_k > stochastic_d:
-            stochastic_trend = "bullish"
-        else:
-            stochastic_trend = "bearish"
-
-        st.write(f"**Current Interpretation**: The %K is crossing {'above' if stochastic_k > stochastic_d else 'below'} the %D line, suggesting {stochastic_trend} momentum.")
-
-        # 5. ADX Analysis
-        st.subheader("ADX (Average Directional Index) Analysis")
-
-        # Creating an expander for ADX
-        with st.expander("Read more about ADX (Average Directional Index)", expanded=False):
-            # Content inside the expander
-            st.write("""
-            The **Average Directional Index (ADX)** is a technical analysis indicator used to quantify the strength of a 
-            trend in a market. Developed by J. Welles Wilder, the ADX helps traders identify whether a market is trending 
-            or ranging, aiding in the decision-making process for entering or exiting trades.
-
-            ### Components
-            - **ADX Line**: Measures the strength of the trend but does not indicate its direction.
-            - **+DI (Positive Directional Indicator)**: Indicates the strength of upward movement.
-            - **-DI (Negative Directional Indicator)**: Indicates the strength of downward movement.
-
-            ### Calculation
-            The ADX is calculated using the following steps:
-            1. Calculate the True Range (TR).
-            2. Determine the +DI and -DI:
-                \[
-                +DI = \frac{(Current\: High - Previous\: High)}{TR} \times 100
-                \]
-                \[
-                -DI = \frac{(Previous\: Low - Current\: Low)}{TR} \times 100
-                \]
-            3. Smooth the +DI and -DI values.
-            4. Calculate the ADX using the smoothed values of +DI and -DI:
-                \[
-                ADX = \frac{(Difference\: between\: +DI\: and\: -DI)}{(+DI + -DI)} \times 100
-                \]
-
-            ### Interpretation
-            - **ADX Value Above 20-25**: Indicates a strong trend, whether upward or downward.
-            - **ADX Value Below 20**: Suggests a weak or non-trending market.
-            - **Crossovers**: 
-                - When +DI crosses above -DI, it indicates a potential buy signal.
-                - When -DI crosses above +DI, it indicates a potential sell signal.
-
-            ### Limitations
-            - **Lagging Indicator**: The ADX is based on past price data, which means it can lag behind current price movements.
-            - **Does Not Indicate Direction**: While ADX shows trend strength, it does not provide information about trend direction, making it essential to use it alongside other indicators.
-
-            The ADX is a useful tool for traders to assess the strength of a trend and make informed decisions about their trades.
-            """)
-
-        fig_adx = go.Figure()
-        fig_adx.add_trace(go.Scatter(x=historical_data.index, y=historical_data['ADX'], mode='lines', name='ADX', line=dict(color='blue')))
-        fig_adx.add_shape(type="line", x0=historical_data.index[0], y0=30, x1=historical_data.index[-1], y1=30, line=dict(color="red", dash="dash"))
-
-        fig_adx.update_layout(title=f"{ticker} ADX Analysis",
-                              xaxis_title="Date",
-                              yaxis_title="ADX",
-                              legend=dict(x=0, y=1, traceorder='normal', orientation='h'))
-
-        st.plotly_chart(fig_adx)
-
-        # Current Interpretation for ADX
-        adx_value = historical_data['ADX'].iloc[-1]
-
-        if adx_value > 30:
-            adx_trend = "strong"
+        ### Interpretation
+        - **Rising OBV**: Indicates that volume is increasing on up days, suggesting buying pressure and potential price increases.
+        - **Falling OBV**: Indicates that volume is increasing on down days, suggesting selling pressure and potential price declines.
+        - **Divergences**: A divergence between OBV and price can signal potential reversals. For example, if the price is making new highs while OBV is not, it may indicate weakening momentum.
+
+        ### Limitations
+        - **Lagging Indicator**: OBV is based on historical volume data, meaning it can lag behind current price movements.
+        - **Market Conditions**: The effectiveness of OBV can vary in different market conditions, making it essential to use it in conjunction with other indicators.
+
+        OBV is a valuable tool for traders seeking to understand the relationship between volume and price movements, helping them make informed trading decisions.
+        """)
+
+    # Current Interpretation for OBV
+    obv_value = historical_data['OBV'].iloc[-1]
+    previous_obv_value = historical_data['OBV'].iloc[-2]
+
+    if obv_value > previous_obv_value:
+        obv_trend = "accumulation"
+    else:
+        obv_trend = "distribution"
+
+    st.write(f"**Current Interpretation**: The OBV trend indicates {obv_trend}, suggesting the sentiment of investors regarding buying or selling the stock.")
+
+
+# Function to render the latest articles
+def render_news(entry):
+    import news
+
+    # News Section
+    st.subheader("Latest News")
+    articles = session_cache.memo(entry, 'news', lambda: fetch_news(get_newsapi_client()))
+    for article in news.latest_articles(articles, 5):  # Display top 5 articles
+        st.markdown(f"### [{article['title']}]({article['url']})")
+        st.markdown(f"**Source:** {article['source']['name']} | **Published At:** {article['publishedAt']}")
+        st.markdown(f"{article['description']}\n")
+
+
+# Function to render the headline sentiment summary and the sentiment series
+def render_sentiment(entry):
+    import sentiment
+
+    # Sentiment Analysis
+    st.subheader("Sentiment Analysis")
+    articles = session_cache.memo(entry, 'news', lambda: fetch_news(get_newsapi_client()))
+
+    sentiments = session_cache.memo(entry, stage_key('sentiments'), lambda: score_headlines(articles))
+
+    # Display average sentiment score
+    average_sentiment = sentiment.average_sentiment(sentiments)
+    sentiment_label = "Positive" if average_sentiment > 0 else "Negative" if average_sentiment < 0 else "Neutral"
+
+    # Display the average sentiment score and label
+    st.write(f"Average Sentiment Score: {average_sentiment:.2f} ({sentiment_label})")
+
+    # Add specific messages based on sentiment score
+    if average_sentiment > 0.1:
+        st.write(f"The overall sentiment is strongly positive, indicating optimistic news about {ticker}.")
+    elif 0 < average_sentiment <= 0.1:
+        st.write(f"The overall sentiment is slightly positive, suggesting a generally favorable outlook on {ticker}.")
+    elif average_sentiment < -0.1:
+        st.write(f"The overall sentiment is strongly negative, indicating pessimistic news about {ticker}.")
+    elif -0.1 < average_sentiment < 0:
+        st.write(f"The overall sentiment is slightly negative, suggesting some concerns regarding {ticker}.")
+    else:
+        st.write(f"The sentiment is neutral, indicating mixed or no significant sentiment about {ticker}.")
+
+    # Sentiment over time, as-of joined onto the price bars
+    sentiment_bars = session_cache.memo(entry, stage_key('sentiment_bars'),
+                                        lambda: build_sentiment_bars(entry['historical_data']))
+    if sentiment_bars['Article_Count'].any():
+        import charts
+
+        st.plotly_chart(charts.build_sentiment_figure(sentiment_bars, ticker), use_container_width=True)
+
+
+# Page sections top to bottom, the stage values each one needs, and the stages whose errors it shows
+SECTIONS = {
+    'table': (render_table, ['historical_data'], ['stock_info', 'prices', 'historical_data']),
+    'analysis': (render_analysis, ['analysis_markdown'], ['analysis_markdown']),
+    'charts': (render_charts, ['historical_data'], []),
+    'news': (render_news, ['news'], ['news']),
+    'sentiment': (render_sentiment, ['sentiments', 'sentiment_bars'], ['sentiments', 'sentiment_bars']),
+}
+ERROR_LABELS = {'stock_info': "fetching stock data", 'prices': "fetching stock data",
+                'historical_data': "calculating indicators", 'analysis_markdown': "analysis",
+                'news': "fetching news", 'sentiments': "scoring sentiment", 'sentiment_bars': "building the sentiment series"}
+
+
+# Function to render one section, reporting a failure the way a failed stage is reported; a section
+# whose inputs failed is left to the stage errors, which a cached analysis shows again on rerun
+def render_section(name, entry, show_errors=True):
+    render, inputs, error_stages = SECTIONS[name]
+    failed = entry.get('failed', {})
+    for stage in error_stages if show_errors else ():
+        if failed.get(stage):
+            st.error(f"Error {ERROR_LABELS[stage]}: {failed[stage]}")
+    if any(key in failed for key in inputs):
+        return
+    try:
+        render(entry)
+    except Exception as e:
+        label = ERROR_LABELS[error_stages[-1]] if error_stages else f"rendering the {name} section"
+        st.error(f"Error {label}: {e}")
+
+
+# Function to run a fresh analysis, rendering each section into its placeholder as its data lands;
+# with span recording on, the spans of the fetches, stages and renders are kept in the entry
+def run_analysis(placeholders):
+    import instrumentation
+    import memory_accounting
+
+    with memory_accounting.PeakRSS() as rss, metrics.ANALYSIS_SECONDS.time(mode='service' if use_service else 'local'):
+        if not record_spans:
+            entry = _run_analysis(placeholders)
         else:
-            adx_trend = "weak"
-
-        st.write(f"**Current Interpretation**: The ADX value is {adx_value}, indicating a {adx_trend} trend.")
-
-        # 6. OBV Analysis
-        st.subheader("OBV (On-Balance Volume) Analysis")
-
-        # Creating an expander for OBV
-        with st.expander("Read more about OBV (On-Balance Volume) Analysis", expanded=False):
-            # Content inside the expander
-            st.write("""
-            **On-Balance Volume (OBV)** is a technical analysis indicator that uses volume flow to predict changes in stock price. 
-            Developed by Joseph Granville, the OBV provides insights into the strength of price movements based on volume trends.
-
-            ### How OBV Works
-            - The core principle of OBV is that volume precedes price movement. Thus, if a security is seeing an increase in volume 
-            without a corresponding change in price, it suggests that the price will eventually move in the direction of the volume.
-
-            ### Calculation
-            The OBV is calculated using the following formula:
-            - If the closing price is higher than the previous closing price:
-                \[
-                OBV = Previous\: OBV + Current\: Volume
-                \]
-            - If the closing price is lower than the previous closing price:
-                \[
-                OBV = Previous\: OBV - Current\: Volume
-                \]
-            - If the closing price is the same:
-                \[
-                OBV = Previous\: OBV
-                \]
-
-            ### Interpretation
-            - **Rising OBV**: Indicates that volume is increasing on up days, suggesting buying pressure and potential price increases.
-            - **Falling OBV**: Indicates that volume is increasing on down days, suggesting selling pressure and potential price declines.
-            - **Divergences**: A divergence between OBV and price can signal potential reversals. For example, if the price is making new highs while OBV is not, it may indicate weakening momentum.
-
-            ### Limitations
-            - **Lagging Indicator**: OBV is based on historical volume data, meaning it can lag behind current price movements.
-            - **Market Conditions**: The effectiveness of OBV can vary in different market conditions, making it essential to use it in conjunction with other indicators.
-
-            OBV is a valuable tool for traders seeking to understand the relationship between volume and price movements, helping them make informed trading decisions.
-            """)
-
-        fig_obv = go.Figure()
-        fig_obv.add_trace(go.Scatter(x=historical_data.index, y=historical_data['OBV'], mode='lines', name='OBV', line=dict(color='green')))
-
-        fig_obv.update_layout(title=f"{ticker} OBV Analysis",
-                              xaxis_title="Date",
-                              yaxis_title="OBV",
-                              legend=dict(x=0, y=1, traceorder='normal', orientation='h'))
-
-        st.plotly_chart(fig_obv)
-
-        # Current Interpretation for OBV
-        obv_value = historical_data['OBV'].iloc[-1]
-        previous_obv_value = historical_data['OBV'].iloc[-2]
-
-        if obv_value > previous_obv_value:
-            obv_trend = "accumulation"
+            with instrumentation.recording() as recorder:
+                entry = _run_analysis(placeholders)
+            entry['spans'] = recorder.summary()
+    # Resident memory of the whole server process before, after and at its peak during this run
+    entry['memory'] = rss.summary()
+    return entry
+
+
+def _run_analysis(placeholders):
+    import instrumentation
+    import orchestrator
+
+    run = orchestrator.Run(analysis_stages(get_newsapi_client())).start()
+    # Stages that failed (with their error) or were skipped after an upstream failure (None)
+    entry, rendered = {'failed': {}}, set()
+    for result in run.as_completed():
+        if result.ok:
+            entry[stage_key(result.name)] = result.value
+        elif result.skipped:
+            entry['failed'][result.name] = None
         else:
-            obv_trend = "distribution"
-
-        st.write(f"**Current Interpretation**: The OBV trend indicates {obv_trend}, suggesting the sentiment of investors regarding buying or selling the stock.")
-
-        # News Section
-        st.subheader("Latest News")
-        news = newsapi.get_everything(q=ticker_input, language='en', sort_by='publishedAt')
-        for article in news['articles'][:5]:  # Display top 5 articles
-            st.markdown(f"### [{article['title']}]({article['url']})")
-            st.markdown(f"**Source:** {article['source']['name']} | **Published At:** {article['publishedAt']}")
-            st.markdown(f"{article['description']}\n")
-
-        # Sentiment Analysis
-        st.subheader("Sentiment Analysis")
-        news_articles = newsapi.get_everything(q=ticker_input, language='en', sort_by='relevancy')
-        sentiments = []
-
-        for article in news_articles['articles']:
-            analysis = TextBlob(article['title'])
-            sentiments.append(analysis.sentiment.polarity)  # Get sentiment polarity
-
-        # Display average sentiment score
-        average_sentiment = np.mean(sentiments) if sentiments else 0
-        sentiment_label = "Positive" if average_sentiment > 0 else "Negative" if average_sentiment < 0 else "Neutral"
-
-        # Display the average sentiment score and label
-        st.write(f"Average Sentiment Score: {average_sentiment:.2f} ({sentiment_label})")
-
-        # Add specific messages based on sentiment score
-        if average_sentiment > 0.1:
-            st.write(f"The overall sentiment is strongly positive, indicating optimistic news about {ticker}.")
-        elif 0 < average_sentiment <= 0.1:
-            st.write(f"The overall sentiment is slightly positive, suggesting a generally favorable outlook on {ticker}.")
-        elif average_sentiment < -0.1:
-            st.write(f"The overall sentiment is strongly negative, indicating pessimistic news about {ticker}.")
-        elif -0.1 < average_sentiment < 0:
-            st.write(f"The overall sentiment is slightly negative, suggesting some concerns regarding {ticker}.")
-        else:
-            st.write(f"The sentiment is neutral, indicating mixed or no significant sentiment about {ticker}.")
+            entry['failed'][result.name] = str(result.error)
+            section = next(name for name, (_, _, errors) in SECTIONS.items() if result.name in errors)
+            with placeholders[section]:
+                st.error(f"Error {ERROR_LABELS[result.name]}: {result.error}")
+        for name, (_, inputs, _) in SECTIONS.items():
+            if name not in rendered and all(stage_key(key) in entry for key in inputs):
+                with placeholders[name], instrumentation.span(f"render.{name}"):
+                    render_section(name, entry, show_errors=False)
+                rendered.add(name)
+
+    entry['timings'] = run.timings()
+    # A partial analysis is cached with its errors too, so reruns re-render it without refetching;
+    # only pressing Analyze again retries it
+    session_cache.put_entry(analysis_key, entry)
+    return entry
+
+
+# Main execution flow
+analysis_key = session_cache.make_key(ticker, time_period, time_interval) + (('service',) if use_service else ())
+analyze_clicked = st.sidebar.button("Analyze")
+if analyze_clicked:
+    session_cache.activate(analysis_key)
 
 if st.sidebar.button("Clear Analysis"):
-    st.session_state.clear()
+    session_cache.clear()
+
+# Results stay on screen across reruns (widget changes, expanders) until the inputs change;
+# a rerun with unchanged inputs re-renders from the session cache without refetching.
+if session_cache.is_active(analysis_key):
+    placeholders = {name: st.container() for name in SECTIONS}
+    entry = session_cache.get_entry(analysis_key)
+    if entry is None or (analyze_clicked and entry.get('failed')):
+        entry = run_analysis(placeholders)
+    else:
+        for name in SECTIONS:
+            with placeholders[name]:
+                render_section(name, entry)
+
+    # Per-stage timings of the fetch that produced these results, critical path flagged
+    with st.sidebar.expander("Stage timings", expanded=False):
+        import pandas as pd
+        st.dataframe(pd.DataFrame(entry['timings']), hide_index=True)
+    if 'spans' in entry:
+        with st.sidebar.expander("Timing spans", expanded=False):
+            st.dataframe(pd.DataFrame(entry['spans']), hide_index=True)
+
+    # Bytes this session's cached analyses hold and the process-wide total against the budget
+    with st.sidebar.expander("Memory", expanded=False):
+        process = session_cache.process_report()
+        st.caption(f"Process: {process['tracked_bytes'] / 2 ** 20:.1f} MB cached across {process['sessions']} "
+                   f"sessions (budget {process['budget_bytes'] / 2 ** 20:.1f} MB, {process['evictions']} evictions)")
+        if 'memory' in entry:
+            st.dataframe(pd.DataFrame([entry['memory']]), hide_index=True)
+        st.dataframe(pd.DataFrame(session_cache.session_report()), hide_index=True)
+        if SHARED_OHLCV:
+            import shared_ohlcv
+
+            st.caption("Shared OHLCV segments (mapped by every session and worker, not counted above)")
+            st.dataframe(pd.DataFrame(shared_ohlcv.report()), hide_index=True)
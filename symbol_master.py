@@ -0,0 +1,163 @@
+import csv
+import os
+import re
+from collections import deque
+
+# NSE symbol, company name and the aliases news uses for it; company names double as aliases
+SYMBOL_MASTER_PATH = os.getenv('SYMBOL_MASTER', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                             'symbol_master.csv'))
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[&'][a-z0-9]+)*")
+# Trailing words dropped from company names so "Infosys Ltd." and "Infosys" are one pattern
+NAME_SUFFIXES = {'ltd', 'limited', 'co', 'company', 'corp', 'corporation', 'inc', 'plc'}
+
+
+# Function to lowercase text and split it into word tokens ("L&T" and "Dr. Reddy's" stay whole)
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+# Function to turn an alias into the token sequence the matcher looks for
+def alias_tokens(alias):
+    tokens = tokenize(alias)
+    while len(tokens) > 1 and tokens[-1] in NAME_SUFFIXES:
+        tokens.pop()
+    return tuple(tokens)
+
+
+# Function to read the symbol master into {symbol: [aliases]}
+def load_master(path=None):
+    master = {}
+    with open(path or SYMBOL_MASTER_PATH, encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            symbol = row['symbol'].strip().upper()
+            aliases = [row.get('company_name') or ''] + (row.get('aliases') or '').split(';')
+            master.setdefault(symbol, []).extend(a.strip() for a in aliases if a.strip())
+    return master
+
+
+# Function to build master rows from an NSE list (EQUITY_L.csv or an index constituent CSV)
+def master_from_nse_list(path_or_buffer):
+    import pandas as pd
+
+    listing = pd.read_csv(path_or_buffer, dtype=str)
+    listing.columns = [c.strip().upper() for c in listing.columns]
+    name_column = 'NAME OF COMPANY' if 'NAME OF COMPANY' in listing else 'COMPANY NAME'
+    return {row['SYMBOL'].strip().upper(): [row[name_column].strip()]
+            for _, row in listing.dropna(subset=['SYMBOL', name_column]).iterrows()}
+
+
+# Function to write {symbol: [aliases]} back out in the symbol master format
+def save_master(master, path):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['symbol', 'company_name', 'aliases'])
+        for symbol, aliases in sorted(master.items()):
+            writer.writerow([symbol, aliases[0] if aliases else '', ';'.join(aliases[1:])])
+
+
+class TickerMatcher:
+    """Aho-Corasick automaton over word tokens, mapping alias mentions to NSE tickers.
+
+    Every alias of every symbol is one pattern, so a text is tagged with all the tickers it
+    mentions in a single left-to-right pass over its tokens. Matching whole tokens rather than
+    characters keeps "TCS" from matching inside "ETCS", and a match nested inside a longer one
+    is dropped so "SBI Life" does not also tag SBI.
+    """
+
+    def __init__(self, master):
+        self.symbols = sorted(master)
+        self.aliases = master
+        # State 0 is the root; goto[s] maps a token to the next state, output[s] holds the
+        # (ticker id, alias length in tokens) of every alias ending at s
+        self.goto = [{}]
+        self.output = [set()]
+        for ticker_id, symbol in enumerate(self.symbols):
+            for alias in master[symbol]:
+                tokens = alias_tokens(alias)
+                if tokens:
+                    self._add(tokens, ticker_id)
+        self.tickers = [symbol + '.NS' for symbol in self.symbols]
+        self._build_failure_links()
+
+    def _add(self, tokens, ticker_id):
+        state = 0
+        for token in tokens:
+            next_state = self.goto[state].get(token)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][token] = next_state
+                self.goto.append({})
+                self.output.append(set())
+            state = next_state
+        self.output[state].add((ticker_id, len(tokens)))
+
+    def _build_failure_links(self):
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and token not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(token, 0)
+                # A state also reports everything its longest proper suffix reports
+                self.output[next_state] |= self.output[self.fail[next_state]]
+        self.output = [frozenset(ids) for ids in self.output]
+
+    # Function to find the ids of every ticker mentioned in a token sequence
+    def match_ids(self, tokens):
+        goto, fail, output = self.goto, self.fail, self.output
+        spans = []
+        state = 0
+        for end, token in enumerate(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if output[state]:
+                spans.extend((end - length + 1, -length, ticker_id) for ticker_id, length in output[state])
+        if len(spans) < 2:
+            return {span[2] for span in spans}
+
+        # Sorted by start then longest first, a span is nested iff it ends no later than one before
+        # it; the same alias registered for two symbols is one span and tags both
+        found, reach, kept = set(), -1, None
+        for start, negative_length, ticker_id in sorted(spans):
+            end = start - negative_length - 1
+            if end > reach or (start, end) == kept:
+                found.add(ticker_id)
+                kept = (start, end)
+            reach = max(reach, end)
+        return found
+
+    # Function to list the tickers mentioned in a text
+    def match(self, text):
+        return sorted(self.tickers[i] for i in self.match_ids(tokenize(text)))
+
+    # Function to list the tickers an article mentions in its title or description
+    def article_tickers(self, article):
+        return self.match(f"{article.get('title') or ''}\n{article.get('description') or ''}")
+
+    # Function to check whether a ticker has any aliases in the master
+    def knows(self, ticker):
+        return ticker in self.tickers
+
+    # Function to build a NewsAPI query that searches a ticker's company names instead of its raw symbol
+    def news_query(self, ticker):
+        symbol = ticker.upper().removesuffix('.NS')
+        # The first entry is the registered company name; its aliases are what headlines use
+        names = self.aliases.get(symbol, [])
+        aliases = dict.fromkeys(alias.replace('"', '') for alias in (names[1:] or names[:1]))
+        return ' OR '.join(f'"{alias}"' for alias in aliases) or symbol
+
+
+_default = None
+
+
+# Function to compile the bundled symbol master into a matcher once per process
+def default_matcher():
+    global _default
+    if _default is None:
+        _default = TickerMatcher(load_master())
+    return _default
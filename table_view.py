@@ -0,0 +1,99 @@
+import io
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import session_cache
+
+PAGE_SIZES = [25, 50, 100, 250]
+INDEX_COLUMN = 'Date'
+NO_FILTER = 'None'
+
+
+# Function to compute the row order for a sort column; positions index into the full frame
+def sort_order(df, column, ascending):
+    if column == INDEX_COLUMN:
+        order = np.arange(len(df))
+        return order if ascending else order[::-1]
+    values = pd.Series(df[column].to_numpy())
+    return values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+
+
+# Function to find the positional range of bars between two dates on the sorted index
+def date_range_positions(index, start_date, end_date):
+    start = pd.Timestamp(start_date)
+    end = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+    if index.tz is not None:
+        start, end = start.tz_localize(index.tz), end.tz_localize(index.tz)
+    return index.searchsorted(start), index.searchsorted(end)
+
+
+# Function to flag the rows whose value in a column lies within [low, high]; NaN never matches
+def value_range_mask(df, column, low, high):
+    values = df[column].to_numpy(dtype=float)
+    return (values >= low) & (values <= high)
+
+
+# Function to select the rows of one page without copying the rest of the frame
+def page_slice(df, order, page, page_size):
+    start = (page - 1) * page_size
+    return df.iloc[order[start:start + page_size]]
+
+
+# Function to serialize the frame for download; only called when the user asks for a file
+def export_bytes(df, file_format):
+    if file_format == 'Parquet':
+        buffer = io.BytesIO()
+        df.to_parquet(buffer)
+        return buffer.getvalue()
+    return df.to_csv().encode('utf-8')
+
+
+# Function to render a paginated, server-side sorted and filtered view of a cached frame
+def render_table(df, entry, file_name):
+    first_date, last_date = df.index[0].date(), df.index[-1].date()
+
+    controls = st.columns(4)
+    sort_column = controls[0].selectbox("Sort by", options=[INDEX_COLUMN] + list(df.columns), key='table_sort_column')
+    ascending = controls[1].selectbox("Order", options=["Ascending", "Descending"], key='table_sort_order') == "Ascending"
+    page_size = controls[2].selectbox("Rows per page", options=PAGE_SIZES, index=1, key='table_page_size')
+    date_filter = controls[3].date_input("Date range", value=(first_date, last_date),
+                                         min_value=first_date, max_value=last_date, key='table_date_range')
+
+    # Sorting is done once per column/direction and filtering works on positions, so only the
+    # visible page is ever materialized and sent to the browser.
+    order = session_cache.memo(entry, ('table_order', sort_column, ascending),
+                               lambda: sort_order(df, sort_column, ascending))
+    if isinstance(date_filter, (tuple, list)) and len(date_filter) == 2:
+        lo, hi = date_range_positions(df.index, *date_filter)
+        if lo > 0 or hi < len(df):
+            order = order[(order >= lo) & (order < hi)]
+
+    numeric = [column for column in df.columns if pd.api.types.is_numeric_dtype(df[column])]
+    filters = st.columns(3)
+    filter_column = filters[0].selectbox("Filter column", options=[NO_FILTER] + numeric, key='table_filter_column')
+    if filter_column != NO_FILTER:
+        values = df[filter_column]
+        column_min = float(values.min()) if values.notna().any() else 0.0
+        column_max = float(values.max()) if values.notna().any() else 0.0
+        low = filters[1].number_input("Min", value=column_min, key=f'table_filter_min_{filter_column}')
+        high = filters[2].number_input("Max", value=column_max, key=f'table_filter_max_{filter_column}')
+        if low > column_min or high < column_max:
+            order = order[value_range_mask(df, filter_column, low, high)[order]]
+
+    page_count = max(math.ceil(len(order) / page_size), 1)
+    page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1, key='table_page')
+    page = min(int(page), page_count)
+    st.dataframe(page_slice(df, order, page, page_size))
+    st.caption(f"Rows {(page - 1) * page_size + min(len(order), 1)}–{min(page * page_size, len(order))} "
+               f"of {len(order)} ({len(df)} bars in total), page {page} of {page_count}")
+
+    # The export is built only when asked for and is not kept once the download button is gone
+    download = st.columns(2)
+    file_format = download[0].selectbox("Download format", options=["CSV", "Parquet"], key='table_download_format')
+    if download[1].button(f"Prepare {file_format} download", key='table_prepare_download'):
+        download[1].download_button(f"Download as {file_format}", data=export_bytes(df, file_format),
+                                    file_name=f"{file_name}.{file_format.lower()}",
+                                    mime='text/csv' if file_format == 'CSV' else 'application/octet-stream')
@@ -0,0 +1,22 @@
+import news
+
+
+def article(url, title='Sensex closes higher'):
+    return {'url': url, 'title': title, 'publishedAt': '2024-05-20T09:00:00Z'}
+
+
+def test_dedupe_keeps_first_of_each_url():
+    articles = [article('https://a.example/1'), article('https://a.example/1', 'Later copy'), article('https://a.example/2')]
+    assert [a['title'] for a in news.dedupe_articles(articles)] == ['Sensex closes higher', 'Sensex closes higher']
+    assert [a['url'] for a in news.dedupe_articles(articles)] == ['https://a.example/1', 'https://a.example/2']
+
+
+def test_dedupe_drops_removed_placeholders():
+    articles = [
+        article(news.REMOVED_URL, news.REMOVED_TITLE),
+        article('https://a.example/1', news.REMOVED_TITLE),
+        article(news.REMOVED_URL),
+        article('https://a.example/2'),
+        article('https://a.example/3', title=None),
+    ]
+    assert [a['url'] for a in news.dedupe_articles(articles)] == ['https://a.example/2']
@@ -0,0 +1,50 @@
+import pytest
+
+import news_store
+
+
+class FakeNewsApi:
+    def __init__(self, articles):
+        self.articles = articles
+        self.calls = 0
+
+    def get_everything(self, **params):
+        self.calls += 1
+        return {'articles': self.articles}
+
+
+def article(i, title):
+    return {'url': f"https://news.example.in/{i}", 'title': title, 'description': None,
+            'source': {'name': 'Example'}, 'publishedAt': f"2024-05-20T0{i}:00:00Z"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    news_store.init_store(str(tmp_path / 'articles.db'))
+    yield news_store
+    news_store.database.close()
+
+
+def mentions(article):
+    return [ticker for name, ticker in (('Reliance', 'RELIANCE.NS'), ('TCS', 'TCS.NS')) if name in article['title']]
+
+
+def test_refresh_tags_every_fetched_article_with_the_queried_ticker(store):
+    client = FakeNewsApi([
+        article(1, 'Reliance and TCS lead the Sensex higher'),
+        article(2, 'TCS wins a large deal'),
+        article(3, 'Oil prices ease'),
+    ])
+    articles = store.refresh_ticker(client, 'RELIANCE.NS', 'Reliance Industries', tagger=mentions)
+    assert [a['url'] for a in articles] == [f"https://news.example.in/{i}" for i in (3, 2, 1)]
+    # Articles mentioning other companies are filed under them as well
+    assert [a['url'] for a in store.ticker_articles('TCS.NS')] == [f"https://news.example.in/{i}" for i in (2, 1)]
+
+    # Within the TTL the stored set is served without another NewsAPI call
+    assert len(store.refresh_ticker(client, 'RELIANCE.NS', 'Reliance Industries', tagger=mentions)) == 3
+    assert client.calls == 1
+
+
+def test_refresh_without_tagger_tags_the_queried_ticker(store):
+    client = FakeNewsApi([article(1, 'Oil prices ease')])
+    assert len(store.refresh_ticker(client, 'ONGC.NS', 'ONGC')) == 1
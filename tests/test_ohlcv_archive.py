@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import ohlcv_archive
+import precompute_store
+from benchmarks.synthetic_ohlcv import make_ohlcv
+
+
+def bars(n, seed, start='2024-01-01'):
+    return make_ohlcv(n, seed=seed, start=start)
+
+
+def assert_same_bars(archived, expected):
+    expected = expected.dropna(subset=['Close'])
+    assert list(archived.index.date) == list(expected.index.date)
+    for field in ('Open', 'High', 'Low', 'Close'):
+        np.testing.assert_allclose(archived[field], expected[field], rtol=1e-6)
+    np.testing.assert_array_equal(archived['Volume'], expected['Volume'].astype(np.int64))
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'archive')
+
+
+def test_appends_and_compact_round_trip(path):
+    full = {'AAA.NS': bars(300, 1), 'BBB.NS': bars(250, 2, start='2024-02-01')}
+    full['BBB.NS'].iloc[40:45] = np.nan
+    # Daily-style appends: an initial load, then a few bars at a time for each ticker
+    ohlcv_archive.append({ticker: frame.iloc[:200] for ticker, frame in full.items()}, path)
+    for end in range(210, 310, 10):
+        summary = ohlcv_archive.append({ticker: frame.iloc[:end] for ticker, frame in full.items()}, path)
+        assert summary['skipped'] == 0
+    # Bars already archived are not appended again
+    assert ohlcv_archive.append(full, path)['bars'] == 0
+
+    archive = ohlcv_archive.Archive(path)
+    for ticker, frame in full.items():
+        assert_same_bars(archive.frame(ticker), frame)
+    window = archive.frame('AAA.NS', start=full['AAA.NS'].index[195], end=full['AAA.NS'].index[215])
+    assert_same_bars(window, full['AAA.NS'].iloc[195:216])
+    assert archive.info('AAA.NS')['extents'] > 1
+
+    assert ohlcv_archive.compact(path)['generation'] == 1
+    archive = ohlcv_archive.Archive(path)
+    for ticker, frame in full.items():
+        assert archive.info(ticker)['extents'] == 1
+        assert_same_bars(archive.frame(ticker), frame)
+
+
+def test_replace_rewrites_a_ticker(path):
+    aaa, bbb = bars(100, 1), bars(100, 2)
+    ohlcv_archive.append({'AAA.NS': aaa, 'BBB.NS': bbb}, path)
+    adjusted = aaa / 5
+    summary = ohlcv_archive.replace({'AAA.NS': adjusted}, path)
+    assert summary['replaced'] == 1
+
+    archive = ohlcv_archive.Archive(path)
+    assert_same_bars(archive.frame('AAA.NS'), adjusted)
+    assert_same_bars(archive.frame('BBB.NS'), bbb)
+    assert archive.matches('AAA.NS', adjusted) and not archive.matches('AAA.NS', aaa)
+    # The old rows are dropped by the next compaction
+    ohlcv_archive.compact(path)
+    assert ohlcv_archive.Archive(path).index['rows'] == 200
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(precompute_store, 'PRECOMPUTE_DIR', str(tmp_path / 'precomputed'))
+    return precompute_store
+
+
+def test_split_rewrites_archived_history(store, path):
+    history = bars(300, 3)
+    store.write_ohlcv('SPLIT.NS', history.iloc[:250])
+    store.write_ohlcv('PLAIN.NS', bars(250, 4))
+    ohlcv_archive.build_from_store(['SPLIT.NS', 'PLAIN.NS'], path)
+
+    # A 1:5 split: the refetched history comes back re-adjusted, with five new sessions after it
+    adjusted = history.iloc[:255].copy()
+    adjusted[['Open', 'High', 'Low', 'Close']] /= 5
+    adjusted['Volume'] *= 5
+    store.write_ohlcv('SPLIT.NS', adjusted)
+    summary = ohlcv_archive.append_from_store(['SPLIT.NS', 'PLAIN.NS'], path)
+    assert summary['replaced'] == 1 and summary['skipped'] == 0
+
+    archive = ohlcv_archive.Archive(path)
+    assert_same_bars(archive.frame('SPLIT.NS'), adjusted)
+    assert_same_bars(archive.frame('PLAIN.NS'), bars(250, 4))
+
+
+def test_refetched_ticker_is_rewritten_even_if_it_matches(store, path):
+    history = bars(105, 1)
+    store.write_ohlcv('AAA.NS', history.iloc[:100])
+    ohlcv_archive.build_from_store(['AAA.NS'], path)
+    store.write_ohlcv('AAA.NS', history)
+    assert ohlcv_archive.append_from_store(['AAA.NS'], path)['replaced'] == 0
+    assert ohlcv_archive.append_from_store(['AAA.NS'], path, refetched={'AAA.NS'})['replaced'] == 1
+    assert_same_bars(ohlcv_archive.Archive(path).frame('AAA.NS'), history)
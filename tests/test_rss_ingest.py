@@ -0,0 +1,119 @@
+import os
+import shutil
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import news_store
+import rss_ingest
+from benchmarks import rss_stand_in
+
+FIXTURE_FEEDS = sorted(os.listdir(rss_stand_in.FEED_DIR))
+# Items across the fixture feeds; one story is syndicated by two of them
+FIXTURE_ITEMS = 27
+FIXTURE_ARTICLES = 26
+SHARED_URL = 'https://wire.example.in/story/42.html'
+
+
+@pytest.fixture
+def feed_dir(tmp_path):
+    directory = tmp_path / 'feeds'
+    shutil.copytree(rss_stand_in.FEED_DIR, directory)
+    return directory
+
+
+@pytest.fixture
+def serve(feed_dir):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), rss_stand_in.make_handler(str(feed_dir), 0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    yield lambda *names: {name: f"{base}/{name}" for name in names or FIXTURE_FEEDS}
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def store(tmp_path):
+    rss_ingest.init_store(str(tmp_path / 'articles.db'))
+    yield news_store
+    news_store.database.close()
+
+
+def by_name(results):
+    return {result.name: result for result in results}
+
+
+def test_first_pass_stores_every_feed(serve, store):
+    results = rss_ingest.ingest(serve())
+    assert all(result.status == 200 and not result.error for result in results)
+    assert sum(result.items for result in results) == FIXTURE_ITEMS
+    assert sum(result.stored for result in results) == FIXTURE_ARTICLES
+    assert store.Article.select().count() == FIXTURE_ARTICLES
+
+
+def test_shared_story_is_stored_once(serve, store):
+    results = rss_ingest.ingest(serve())
+    # Both feeds parse the syndicated story as fresh; the store keeps a single row for its URL
+    assert sum(result.fresh for result in results) == FIXTURE_ITEMS
+    assert store.Article.select().where(store.Article.url == SHARED_URL).count() == 1
+
+
+def test_second_pass_is_all_304_via_etag(serve, store):
+    feeds = serve()
+    rss_ingest.ingest(feeds)
+    states = list(rss_ingest.FeedState.select())
+    assert len(states) == len(FIXTURE_FEEDS) and all(state.etag and state.modified for state in states)
+
+    results = rss_ingest.ingest(feeds)
+    assert [result.status for result in results] == [304] * len(FIXTURE_FEEDS)
+    assert sum(result.stored for result in results) == 0
+    assert store.Article.select().count() == FIXTURE_ARTICLES
+
+
+def test_last_modified_alone_gets_304(serve, store):
+    feeds = serve()
+    rss_ingest.ingest(feeds)
+    # A server that sends no ETag leaves only If-Modified-Since on the next poll
+    rss_ingest.FeedState.update(etag=None).execute()
+
+    results = rss_ingest.ingest(feeds)
+    assert [result.status for result in results] == [304] * len(FIXTURE_FEEDS)
+
+
+def test_changed_feed_refetches_and_skips_seen_entries(serve, store, feed_dir):
+    feeds = serve()
+    rss_ingest.ingest(feeds)
+    path = feed_dir / 'street_notes.atom'
+    body = path.read_text(encoding='utf-8').replace('<entry>', """<entry>
+    <title>Infosys upgrades revenue guidance</title>
+    <link href="https://streetnotes.example.in/notes/new"/>
+    <id>tag:streetnotes.example.in,2024:new</id>
+    <updated>2024-05-20T10:00:00Z</updated>
+    <summary>Infosys upgrades revenue guidance.</summary>
+  </entry>
+  <entry>""", 1)
+    path.write_text(body, encoding='utf-8')
+    os.utime(path, (path.stat().st_atime, path.stat().st_mtime + 60))
+
+    results = by_name(rss_ingest.ingest(feeds))
+    assert results['street_notes.atom'].status == 200
+    assert (results['street_notes.atom'].items, results['street_notes.atom'].fresh) == (7, 1)
+    assert results['street_notes.atom'].stored == 1
+    assert results['bourse_wire.xml'].status == 304
+
+
+def test_malformed_and_missing_feeds_are_reported(serve, store, feed_dir):
+    (feed_dir / 'broken.xml').write_text('<html><body>502 Bad Gateway', encoding='utf-8')
+    feeds = serve('broken.xml', 'missing.xml', 'bourse_wire.xml')
+
+    results = by_name(rss_ingest.ingest(feeds))
+    assert results['broken.xml'].status == 200 and results['broken.xml'].error
+    assert results['broken.xml'].stored == 0
+    assert results['missing.xml'].status == 404 and results['missing.xml'].error
+    # One bad feed does not hold back the others
+    assert results['bourse_wire.xml'].stored == 9
+
+    # No validators are kept from a failed poll, so the next poll fetches the feed in full again
+    state = rss_ingest.FeedState.get_by_id(feeds['broken.xml'])
+    assert state.etag is None and state.modified is None and state.last_status == 200
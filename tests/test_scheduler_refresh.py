@@ -0,0 +1,104 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+import precompute_store
+import scheduler
+import stock_data
+
+TZ = precompute_store.EXCHANGE_TZ
+
+
+def bars(start, periods, close=100.0, **columns):
+    index = pd.bdate_range(start, periods=periods, tz=TZ, name='Date')
+    frame = pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 1000.0},
+                         index=index)
+    for name, value in columns.items():
+        frame[name] = value
+    return frame
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(precompute_store, 'PRECOMPUTE_DIR', str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    calls = []
+
+    def history_since(ticker, start):
+        calls.append(('since', start))
+        return recent
+
+    def historical_data(ticker, period):
+        calls.append(('period', period))
+        return full
+
+    monkeypatch.setattr(stock_data, 'fetch_history_since', history_since)
+    monkeypatch.setattr(stock_data, 'fetch_historical_data', historical_data)
+    recent = full = None
+
+    def set_data(since, history):
+        nonlocal recent, full
+        recent, full = since, history
+        return calls
+
+    return set_data
+
+
+def stored_history():
+    # Friday 2025-10-03 to Friday 2026-10-09, just over a year
+    return bars('2025-10-03', len(pd.bdate_range('2025-10-03', '2026-10-09')))
+
+
+def test_clean_slice_is_spliced(store, fetches):
+    stored = stored_history()
+    precompute_store.write_ohlcv('TEST.NS', stored)
+    calls = fetches(bars('2026-10-09', 3, close=101.0, Dividends=0.0, **{'Stock Splits': 0.0}), None)
+    result, new_bars, refetched = scheduler.refresh_ohlcv('TEST.NS', ['1y'])
+    assert [kind for kind, _ in calls] == ['since']
+    assert new_bars == 2 and not refetched
+    assert result['Close'].iloc[0] == 100.0
+
+
+@pytest.mark.parametrize('action', ['Dividends', 'Stock Splits'])
+def test_corporate_action_refetches_full_history(store, fetches, action):
+    stored = stored_history()
+    precompute_store.write_ohlcv('TEST.NS', stored)
+    since = bars('2026-10-09', 3, close=50.0, Dividends=0.0, **{'Stock Splits': 0.0})
+    since.loc[since.index[-1], action] = 2.0
+    adjusted = bars(stored.index[0], len(stored) + 2, close=50.0)
+    calls = fetches(since, adjusted)
+    result, _, refetched = scheduler.refresh_ohlcv('TEST.NS', ['1y'])
+    assert [kind for kind, _ in calls] == ['since', 'period']
+    assert refetched
+    # Nothing from the old adjustment basis survives
+    assert (result['Close'] == 50.0).all()
+    assert (precompute_store.read_ohlcv('TEST.NS')['Close'] == 50.0).all()
+
+
+def test_action_on_refetched_last_bar_is_not_new(store, fetches):
+    stored = stored_history()
+    precompute_store.write_ohlcv('TEST.NS', stored)
+    since = bars('2026-10-09', 2, close=100.0, Dividends=0.0)
+    since.loc[since.index[0], 'Dividends'] = 1.0
+    calls = fetches(since, None)
+    scheduler.refresh_ohlcv('TEST.NS', ['1y'])
+    assert [kind for kind, _ in calls] == ['since']
+
+
+def test_covering_period_reaches_back_to_stored_start():
+    now = pd.Timestamp('2026-10-19 16:15', tz=TZ)
+    assert precompute_store.covering_period(bars('2025-10-15', 10), '6mo', now=now) == '1y'
+    assert precompute_store.covering_period(bars('2023-01-02', 10), '1y', now=now) == '5y'
+    assert precompute_store.covering_period(bars('1990-01-01', 10), '1y', now=now) == 'max'
+
+
+def test_result_missing_the_session_bar_is_stale(store):
+    frame = bars('2026-10-12', 4)  # last bar Thursday 2026-10-15
+    precompute_store.write_result('TEST.NS', '1y', frame, {}, '', as_of=date(2026, 10, 16))
+    assert precompute_store.read_result('TEST.NS', '1y', as_of=date(2026, 10, 16)) is None
+    assert precompute_store.read_result('TEST.NS', '1y', as_of=date(2026, 10, 15)) is not None
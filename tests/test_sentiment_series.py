@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+
+import sentiment_series
+
+TZ = sentiment_series.EXCHANGE_TZ
+
+
+def daily_bars(start, periods):
+    index = pd.bdate_range(start, periods=periods, tz=TZ, name='Date')
+    return pd.DataFrame({'Close': range(periods)}, index=index, dtype=float)
+
+
+def headlines(*stamps):
+    return pd.DataFrame({
+        'published_at': [pd.Timestamp(stamp, tz=TZ) for stamp in stamps],
+        'title': [f"headline {i}" for i in range(len(stamps))],
+        'source': 'test',
+        'polarity': [0.1 * (i + 1) for i in range(len(stamps))],
+    })
+
+
+def merged_counts(bars, history, interval='1D'):
+    series = sentiment_series.sentiment_series(history, interval)
+    merged = sentiment_series.merge_sentiment(bars, series, interval)
+    return {day.date().isoformat(): count for day, count in merged['Article_Count'].items() if count}
+
+
+def test_daily_bar_ends_at_session_close():
+    bars = daily_bars('2026-10-05', 2)
+    ends = sentiment_series.bar_ends(bars.index, '1D')
+    assert list(ends) == [pd.Timestamp('2026-10-05 15:30', tz=TZ), pd.Timestamp('2026-10-06 15:30', tz=TZ)]
+
+
+@pytest.mark.parametrize('stamp, session', [
+    ('2026-10-05 09:00', '2026-10-05'),  # before the open
+    ('2026-10-05 15:29', '2026-10-05'),  # just before the close
+    ('2026-10-05 15:30', '2026-10-06'),  # at the close, not known by it
+    ('2026-10-05 20:00', '2026-10-06'),  # after hours
+    ('2026-10-09 18:00', '2026-10-12'),  # Friday evening
+    ('2026-10-10 12:00', '2026-10-12'),  # Saturday
+    ('2026-10-11 23:00', '2026-10-12'),  # Sunday night
+])
+def test_daily_headline_counts_toward_first_session_closing_after_it(stamp, session):
+    bars = daily_bars('2026-10-05', 6)
+    assert merged_counts(bars, headlines(stamp)) == {session: 1}
+
+
+def test_decayed_sentiment_excludes_news_after_the_close():
+    bars = daily_bars('2026-10-05', 2)
+    series = sentiment_series.sentiment_series(headlines('2026-10-05 20:00'), '1D')
+    merged = sentiment_series.merge_sentiment(bars, series, '1D')
+    assert pd.isna(merged['Sentiment_Decayed'].iloc[0])
+    assert merged['Sentiment_Decayed'].iloc[1] == pytest.approx(0.1)
+
+
+def test_weekly_bar_closes_with_friday_session():
+    index = pd.DatetimeIndex([pd.Timestamp('2026-10-05', tz=TZ), pd.Timestamp('2026-10-12', tz=TZ)], name='Date')
+    bars = pd.DataFrame({'Close': [1.0, 2.0]}, index=index)
+    assert sentiment_series.bar_ends(index, '1W')[0] == pd.Timestamp('2026-10-09 15:30', tz=TZ)
+    counts = merged_counts(bars, headlines('2026-10-08 11:00', '2026-10-09 16:00', '2026-10-10 10:00'), '1W')
+    assert counts == {'2026-10-05': 1, '2026-10-12': 2}
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import threading
+
+import pandas as pd
+import pytest
+import requests
+from tornado.httpserver import HTTPServer
+from tornado.testing import bind_unused_port
+
+import service
+import service_client
+
+
+class StubAnalyzer:
+    def __init__(self):
+        self.limits = []
+
+    async def history(self, ticker, period):
+        if period == '1d':
+            index = pd.date_range('2026-10-16 09:15', periods=3, freq='5min', tz='Asia/Kolkata', name='Datetime')
+        else:
+            index = pd.bdate_range('2026-10-12', periods=3, tz='Asia/Kolkata', name='Date')
+        return pd.DataFrame({'Close': [1.0, 2.0, 3.0], 'Note': ['', 'a},{b', '{"x": 1}']}, index=index)
+
+    async def news(self, ticker, limit):
+        self.limits.append(limit)
+        return []
+
+
+@pytest.fixture
+def server(monkeypatch):
+    # An intraday period keeps its 'Datetime' index through the round trip
+    monkeypatch.setattr(service, 'PERIODS', set(service.PERIODS) | {'1d'})
+    analyzer = StubAnalyzer()
+    started = threading.Event()
+    sock, port = bind_unused_port()
+    state = {}
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+        async def start():
+            state['server'] = HTTPServer(service.make_app(analyzer))
+            state['server'].add_sockets([sock])
+
+        loop.run_until_complete(start())
+        state['loop'] = loop
+        started.set()
+        loop.run_forever()
+        loop.close()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    started.wait(5)
+    yield f"http://127.0.0.1:{port}", analyzer
+    state['loop'].call_soon_threadsafe(state['server'].stop)
+    state['loop'].call_soon_threadsafe(state['loop'].stop)
+    thread.join(5)
+
+
+@pytest.mark.parametrize('limit', ['abc', '0', '-5', '2.5', ''])
+def test_bad_news_limit_is_400(server, limit):
+    base_url, analyzer = server
+    response = requests.get(f"{base_url}/v1/tickers/RELIANCE/news", params={'limit': limit}, timeout=5)
+    assert response.status_code == 400
+    assert 'limit' in response.json()['error']
+    assert analyzer.limits == []
+
+
+def test_news_limit_is_passed_through(server):
+    base_url, analyzer = server
+    assert service_client.news(base_url, 'RELIANCE', limit=5) == []
+    requests.get(f"{base_url}/v1/tickers/RELIANCE/news", timeout=5).raise_for_status()
+    assert analyzer.limits == [5, 20]
+
+
+@pytest.mark.parametrize('period, index_name', [('1y', 'Date'), ('1d', 'Datetime')])
+def test_history_keeps_its_index_name(server, period, index_name):
+    base_url, _ = server
+    frame = service_client.history(base_url, 'RELIANCE', period)
+    assert frame.index.name == index_name
+    assert str(frame.index.tz) == 'Asia/Kolkata'
+    assert frame['Close'].tolist() == [1.0, 2.0, 3.0]
+    assert frame['Note'].tolist() == ['', 'a},{b', '{"x": 1}']
+
+
+def test_json_and_ndjson_streams_agree(server, monkeypatch):
+    monkeypatch.setattr(service, 'STREAM_CHUNK_ROWS', 2)
+    base_url, _ = server
+    url = f"{base_url}/v1/tickers/RELIANCE/history"
+    records = requests.get(url, timeout=5).json()
+    lines = requests.get(url, params={'format': 'ndjson'}, timeout=5).text.splitlines()
+    assert len(records) == 3
+    assert [json.loads(line) for line in lines] == records